@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import TeacherProfile
+
+@admin.register(TeacherProfile)
+class TeacherProfileAdmin(admin.ModelAdmin):
+    list_display = ['full_name', 'department', 'mentor_capacity']
+    list_editable = ['mentor_capacity']
+    list_filter = ['department']
+    search_fields = ['full_name', 'email_id']
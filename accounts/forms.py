@@ -33,4 +33,4 @@ class StudentProfileForm(forms.ModelForm):
 class TeacherProfileForm(forms.ModelForm):
     class Meta:
         model = TeacherProfile
-        exclude = ['user']
\ No newline at end of file
+        exclude = ['user', 'mentor_capacity']
\ No newline at end of file
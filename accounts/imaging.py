@@ -0,0 +1,58 @@
+import io
+
+from PIL import Image, ImageOps, features
+
+
+# name -> (box size, mode). 'crop' fills the box exactly; 'fit' scales the
+# whole photo down to fit inside it.
+DERIVATIVE_SIZES = {
+    'thumb': ((96, 96), 'crop'),
+    'preview': ((480, 300), 'fit'),
+}
+
+# WebP for browsers that take it, JPEG as the universal fallback
+FORMATS = ('webp', 'jpeg') if features.check('webp') else ('jpeg',)
+
+SAVE_OPTIONS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+
+def _flatten(image):
+    """Return an RGB copy, compositing any transparency onto white."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render_derivatives(data):
+    """Render every derivative of an image given as bytes.
+
+    Runs in a worker process, so it takes and returns plain bytes and does
+    not touch Django. Returns ``{'thumb.webp': b'...', ...}``. The outputs
+    are re-encoded from pixels only, so EXIF and other metadata (including
+    GPS tags from phone cameras) are dropped; the EXIF orientation is
+    applied first so the result is the right way up.
+    """
+    largest = max(size for size, _ in DERIVATIVE_SIZES.values())
+    with Image.open(io.BytesIO(data)) as image:
+        # Let the JPEG decoder downscale while decoding; full-resolution
+        # photos are far larger than anything we render
+        image.draft('RGB', (largest[0] * 2, largest[1] * 2))
+        image = _flatten(ImageOps.exif_transpose(image))
+
+    rendered = {}
+    for name, (size, mode) in DERIVATIVE_SIZES.items():
+        if mode == 'crop':
+            resized = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+        else:
+            resized = ImageOps.contain(image, size, Image.Resampling.LANCZOS)
+        for fmt in FORMATS:
+            buffer = io.BytesIO()
+            resized.save(buffer, **SAVE_OPTIONS[fmt])
+            rendered[f'{name}.{fmt}'] = buffer.getvalue()
+    return rendered
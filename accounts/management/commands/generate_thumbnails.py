@@ -0,0 +1,56 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.imaging import render_derivatives
+from accounts.models import StudentProfile
+from accounts.thumbnails import needs_derivatives, read_photo, store_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Render thumbnails for ID card photos that do not have them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=max(settings.THUMBNAIL_WORKERS, 1),
+                            help='Number of processes rendering images')
+        parser.add_argument('--force', action='store_true',
+                            help='Re-render thumbnails that are already up to date')
+
+    def handle(self, *args, **options):
+        profiles = StudentProfile.objects.exclude(id_card_photo='').only(
+            'user_id', 'id_card_photo', 'id_card_derivatives'
+        ).order_by('user_id')
+        pending = (p for p in profiles.iterator() if options['force'] or needs_derivatives(p))
+
+        workers = options['workers']
+        done = failed = 0
+        in_flight = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while True:
+                # Keep a couple of photos queued per worker without reading them all into memory
+                while len(in_flight) < workers * 2:
+                    profile = next(pending, None)
+                    if profile is None:
+                        break
+                    try:
+                        data = read_photo(profile)
+                    except OSError:
+                        failed += 1
+                        self.stderr.write(f'Missing photo: {profile.id_card_photo.name}')
+                        continue
+                    in_flight[executor.submit(render_derivatives, data)] = profile
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    profile = in_flight.pop(future)
+                    try:
+                        store_derivatives(profile.pk, profile.id_card_photo.name, future.result())
+                        done += 1
+                    except Exception as exc:
+                        failed += 1
+                        self.stderr.write(f'{profile.id_card_photo.name}: {exc}')
+
+        self.stdout.write(self.style.SUCCESS(f'Rendered thumbnails for {done} photo(s), {failed} failed'))
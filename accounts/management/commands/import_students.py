@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.roster import IMPORT_BATCH_SIZE, RosterError, import_students, plan_import, read_roster
+
+
+class Command(BaseCommand):
+    help = 'Create student accounts and profiles from a CSV or XLSX roster'
+
+    def add_arguments(self, parser):
+        parser.add_argument('roster', help='Path to a .csv or .xlsx file with a header row')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report what would be imported and every conflict, without writing')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Processes hashing passwords (default: one per CPU)')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help='Rows inserted per transaction')
+
+    def handle(self, *args, **options):
+        try:
+            plan = plan_import(read_roster(options['roster']))
+        except (OSError, RosterError) as exc:
+            raise CommandError(str(exc))
+
+        for conflict in plan.conflicts:
+            self.stderr.write(f'Conflict: {conflict}')
+        summary = (f'{len(plan.create)} to create, {len(plan.existing)} already imported, '
+                   f'{len(plan.conflicts)} conflict(s)')
+
+        if options['dry_run']:
+            self.stdout.write(f'Dry run: {summary}')
+            return
+
+        start = time.perf_counter()
+        created = import_students(plan, workers=options['workers'], batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {created} student(s) in {elapsed:.1f}s; {summary}'
+        ))
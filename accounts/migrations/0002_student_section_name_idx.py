@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentprofile',
+            index=models.Index(fields=['section', 'full_name', 'user'], name='student_section_name_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_student_section_name_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentprofile',
+            name='id_card_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
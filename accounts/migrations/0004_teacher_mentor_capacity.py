@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_id_card_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teacherprofile',
+            name='mentor_capacity',
+            field=models.PositiveIntegerField(default=8),
+        ),
+    ]
@@ -20,9 +20,36 @@ class StudentProfile(models.Model):
     email_id = models.EmailField()
     abc_id = models.CharField(max_length=20, unique=True)
     id_card_photo = models.ImageField(upload_to='id_cards/')
+    # Names of the rendered thumbnails, keyed like 'thumb.webp', plus the
+    # 'source' photo they were made from; filled in by accounts.thumbnails
+    id_card_derivatives = models.JSONField(default=dict, blank=True, editable=False)
+    
+    class Meta:
+        indexes = [
+            # Keyset pagination order used by the teacher student list
+            models.Index(fields=['section', 'full_name', 'user'], name='student_section_name_idx'),
+        ]
     
     def __str__(self):
         return self.full_name
+    
+    def _derivative_urls(self, name):
+        names = self.id_card_derivatives
+        if not self.id_card_photo or names.get('source') != self.id_card_photo.name:
+            return None
+        storage = self.id_card_photo.storage
+        urls = {fmt: storage.url(names[f'{name}.{fmt}']) for fmt in ('webp', 'jpeg') if f'{name}.{fmt}' in names}
+        return urls or None
+    
+    @property
+    def id_card_thumb(self):
+        """``{'webp': url, 'jpeg': url}`` for the 96x96 thumbnail, or None until it is rendered."""
+        return self._derivative_urls('thumb')
+    
+    @property
+    def id_card_preview(self):
+        """Same as ``id_card_thumb`` for the photo scaled to fit 480x300."""
+        return self._derivative_urls('preview')
 
 class TeacherProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
@@ -30,6 +57,8 @@ class TeacherProfile(models.Model):
     mobile_no = models.CharField(max_length=15)
     email_id = models.EmailField()
     department = models.CharField(max_length=50)
+    # Most groups the mentor allocator may give this teacher; 0 opts out
+    mentor_capacity = models.PositiveIntegerField(default=8)
     
     def __str__(self):
         return self.full_name
\ No newline at end of file
@@ -0,0 +1,218 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from projects.models import DataVersion
+from projects.principal import invalidate_principal
+from .models import StudentProfile, User
+
+
+# Required roster columns; 'username' (defaults to the lower-cased abc_id)
+# and 'password' (blank means sign in through password reset) are optional
+PROFILE_COLUMNS = ('full_name', 'section', 'passing_year', 'branch', 'degree', 'mobile_no', 'email_id', 'abc_id')
+
+IMPORT_BATCH_SIZE = 500
+
+
+class RosterError(Exception):
+    pass
+
+
+class Conflict:
+    def __init__(self, line, abc_id, reason):
+        self.line = line
+        self.abc_id = abc_id
+        self.reason = reason
+
+    def __str__(self):
+        return f'line {self.line} ({self.abc_id or "no abc_id"}): {self.reason}'
+
+
+class ImportPlan:
+    """What an import would do: rows to create, rows already imported, and conflicts."""
+
+    def __init__(self):
+        # (line, row) pairs; row['user'] is set when the account already exists
+        self.create = []
+        self.existing = []
+        self.conflicts = []
+
+
+def _normalise_header(name):
+    return (name or '').strip().lower().replace(' ', '_')
+
+
+def _read_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as roster:
+        reader = csv.reader(roster)
+        yield from reader
+
+
+def _read_xlsx(path):
+    try:
+        import openpyxl
+    except ImportError:
+        raise RosterError('Reading .xlsx rosters needs openpyxl; install it with "pip install openpyxl".')
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for values in workbook.active.iter_rows(values_only=True):
+            yield ['' if value is None else str(value) for value in values]
+    finally:
+        workbook.close()
+
+
+def read_roster(path):
+    """Yield ``(line number, row dict)`` from a CSV or XLSX roster with a header row."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.xlsx', '.xlsm'):
+        rows = _read_xlsx(path)
+    elif extension in ('.csv', '.txt'):
+        rows = _read_csv(path)
+    else:
+        raise RosterError(f'Unsupported roster format "{extension}"; use .csv or .xlsx.')
+
+    header = [_normalise_header(name) for name in next(rows, [])]
+    missing = [column for column in PROFILE_COLUMNS if column not in header]
+    if missing:
+        raise RosterError(f'Roster is missing column(s): {", ".join(missing)}')
+
+    for line, values in enumerate(rows, start=2):
+        if not any(str(value).strip() for value in values):
+            continue
+        row = {name: str(value).strip() for name, value in zip(header, values) if name}
+        yield line, row
+
+
+def _validate(row):
+    profile = StudentProfile(**{column: row.get(column, '') for column in PROFILE_COLUMNS})
+    profile.clean_fields(exclude=['user', 'id_card_photo', 'id_card_derivatives'])
+    User(username=row['username'], email=row['email_id']).clean_fields(
+        exclude=['password', 'last_login', 'date_joined']
+    )
+
+
+def plan_import(rows):
+    """Sort roster rows into new students, already imported ones and conflicts.
+
+    ``abc_id`` is the identity: a row whose ``abc_id`` is already on file
+    for the same username is counted as imported, so running the same
+    roster twice creates nothing the second time.
+    """
+    plan = ImportPlan()
+    rows = list(rows)
+    for _, row in rows:
+        row['username'] = row.get('username') or row.get('abc_id', '').lower()
+
+    abc_ids = {row.get('abc_id') for _, row in rows}
+    usernames = {row['username'] for _, row in rows}
+    on_file = dict(StudentProfile.objects.filter(abc_id__in=abc_ids).values_list('abc_id', 'user__username'))
+    accounts = {
+        user.username: user
+        for user in User.objects.filter(username__in=usernames).select_related('studentprofile')
+    }
+
+    seen_abc_ids, seen_usernames = {}, {}
+    for line, row in rows:
+        abc_id, username = row.get('abc_id', ''), row['username']
+        if abc_id in seen_abc_ids:
+            plan.conflicts.append(Conflict(line, abc_id, f'abc_id repeats line {seen_abc_ids[abc_id]}'))
+            continue
+        seen_abc_ids[abc_id] = line
+        if username in seen_usernames:
+            plan.conflicts.append(Conflict(line, abc_id, f'username "{username}" repeats line {seen_usernames[username]}'))
+            continue
+        seen_usernames[username] = line
+
+        try:
+            _validate(row)
+        except ValidationError as exc:
+            errors = '; '.join(f'{field}: {" ".join(messages)}' for field, messages in exc.message_dict.items())
+            plan.conflicts.append(Conflict(line, abc_id, errors))
+            continue
+
+        if abc_id in on_file:
+            if on_file[abc_id] == username:
+                plan.existing.append((line, row))
+            else:
+                plan.conflicts.append(Conflict(line, abc_id, f'abc_id already belongs to "{on_file[abc_id]}"'))
+            continue
+
+        user = accounts.get(username)
+        if user is not None:
+            # A student who registered but never completed the profile gets it filled in
+            if not user.is_student or hasattr(user, 'studentprofile'):
+                plan.conflicts.append(Conflict(line, abc_id, f'username "{username}" is taken'))
+                continue
+            row['user'] = user
+        plan.create.append((line, row))
+    return plan
+
+
+def _setup_worker():
+    # Workers started with "spawn" import nothing from the parent
+    django.setup()
+
+
+def hash_passwords(passwords, workers=None):
+    """Hash ``passwords`` across a process pool, keeping their order.
+
+    Blank passwords become unusable ones without a trip to the pool; those
+    students sign in through password reset.
+    """
+    hashed = [None if password else make_password(None) for password in passwords]
+    pending = [index for index, password in enumerate(passwords) if password]
+    if not pending:
+        return hashed
+
+    plain = [passwords[index] for index in pending]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        results = [make_password(password) for password in plain]
+    else:
+        # A few chunks per worker balances the load without a round trip per password
+        chunksize = max(1, len(plain) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker) as executor:
+            results = list(executor.map(make_password, plain, chunksize=chunksize))
+    for index, result in zip(pending, results):
+        hashed[index] = result
+    return hashed
+
+
+def import_students(plan, workers=None, batch_size=IMPORT_BATCH_SIZE):
+    """Create the users and profiles in ``plan.create``; return how many students were added."""
+    rows = [row for _, row in plan.create]
+    passwords = hash_passwords([row.get('password', '') for row in rows], workers)
+
+    created = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        hashes = passwords[start:start + batch_size]
+        with transaction.atomic():
+            new_users = User.objects.bulk_create([
+                User(username=row['username'], email=row['email_id'], password=password, is_student=True)
+                for row, password in zip(batch, hashes) if 'user' not in row
+            ], batch_size=batch_size)
+            users = iter(new_users)
+            StudentProfile.objects.bulk_create([
+                StudentProfile(user=row.get('user') or next(users),
+                               **{column: row[column] for column in PROFILE_COLUMNS})
+                for row in batch
+            ], batch_size=batch_size)
+        created += len(batch)
+
+    if created:
+        _after_bulk_import([row['user'].pk for row in rows if 'user' in row])
+    return created
+
+
+def _after_bulk_import(existing_user_ids):
+    # bulk_create skips the post_save signals that keep caches in step
+    DataVersion.bump(DataVersion.STUDENTS)
+    if existing_user_ids:
+        invalidate_principal(*existing_user_ids)
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import StudentProfile
+from .thumbnails import needs_derivatives, schedule_derivatives
+
+
+@receiver(post_save, sender=StudentProfile)
+def id_card_photo_saved(sender, instance, **kwargs):
+    if needs_derivatives(instance):
+        schedule_derivatives(instance)
@@ -1,3 +1,73 @@
+import csv
+import io
+import os
+import tempfile
+
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from projects.models import DataVersion
+from projects.principal import load_principal
+from .models import StudentProfile, User
+from .roster import PROFILE_COLUMNS
+
+
+class RosterImportTests(TestCase):
+    ROWS = [
+        ('Asha Rao', 'A', '2026', 'CSE', 'B.Tech', '9000000001', 'asha@example.com', 'ABC0000001', 'first-pass-1'),
+        ('Ravi Kumar', 'A', '2026', 'ECE', 'B.Tech', '9000000002', 'ravi@example.com', 'ABC0000002', 'second-pass-2'),
+        ('Meera Iyer', 'B', '2027', 'ME', 'B.Tech', '9000000003', 'meera@example.com', 'ABC0000003', 'third-pass-3'),
+        ('Neel Shah', 'B', '2027', 'ME', 'B.Tech', '9000000004', 'neel@example.com', 'ABC0000004', ''),
+    ]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'roster.csv')
+        with open(self.path, 'w', newline='') as roster:
+            writer = csv.writer(roster)
+            writer.writerow([*PROFILE_COLUMNS, 'password'])
+            writer.writerows(self.ROWS)
+
+    def run_import(self, *args):
+        output = io.StringIO()
+        call_command('import_students', self.path, *args, stdout=output, stderr=io.StringIO())
+        return output.getvalue()
+
+    def test_imported_students_can_sign_in(self):
+        # Two workers, so the passwords are hashed in other processes
+        self.assertIn('Imported 4 student(s)', self.run_import('--workers', '2'))
+        for row in self.ROWS:
+            abc_id, password = row[7], row[8]
+            user = User.objects.get(username=abc_id.lower())
+            self.assertTrue(user.is_student)
+            self.assertEqual(user.studentprofile.abc_id, abc_id)
+            if password:
+                self.assertTrue(user.check_password(password))
+                self.assertTrue(self.client.login(username=user.username, password=password))
+                self.client.logout()
+            else:
+                self.assertFalse(user.has_usable_password())
+
+    def test_reimport_is_a_no_op(self):
+        self.run_import('--workers', '1')
+        users = list(User.objects.order_by('pk').values_list('pk', 'username', 'password'))
+        version = DataVersion.current(DataVersion.STUDENTS)
+
+        output = self.run_import('--workers', '1')
+        self.assertIn('Imported 0 student(s)', output)
+        self.assertIn('0 to create, 4 already imported, 0 conflict(s)', output)
+        self.assertEqual(list(User.objects.order_by('pk').values_list('pk', 'username', 'password')), users)
+        self.assertEqual(StudentProfile.objects.count(), len(self.ROWS))
+        self.assertEqual(DataVersion.current(DataVersion.STUDENTS), version)
+
+    def test_import_bumps_the_students_version(self):
+        # An account that registered without a profile gets one from the roster
+        user = User.objects.create_user(username='abc0000001', is_student=True)
+        self.assertIsNone(load_principal(user).student_profile)
+        version = DataVersion.current(DataVersion.STUDENTS)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.run_import('--workers', '1')
+        self.assertGreater(DataVersion.current(DataVersion.STUDENTS), version)
+        self.assertEqual(load_principal(user).student_profile.abc_id, 'ABC0000001')
@@ -0,0 +1,112 @@
+import logging
+import posixpath
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+
+from .imaging import render_derivatives
+from .models import StudentProfile
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the shared process pool, starting it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.THUMBNAIL_WORKERS)
+        return _executor
+
+
+def derivative_name(source, key):
+    """``id_cards/photo.png`` + ``thumb.webp`` -> ``id_cards/thumbs/photo_thumb.webp``."""
+    directory, filename = posixpath.split(source)
+    stem = posixpath.splitext(filename)[0]
+    name, fmt = key.split('.')
+    return posixpath.join(directory, 'thumbs', f'{stem}_{name}.{fmt}')
+
+
+def needs_derivatives(profile):
+    return bool(profile.id_card_photo) and profile.id_card_derivatives.get('source') != profile.id_card_photo.name
+
+
+def read_photo(profile):
+    with profile.id_card_photo.open('rb') as photo:
+        return photo.read()
+
+
+def store_derivatives(user_id, source, rendered):
+    """Save rendered derivatives next to the original and record them on the profile.
+
+    If the student replaced the photo while this one was rendering, the
+    results are thrown away.
+    """
+    storage = StudentProfile._meta.get_field('id_card_photo').storage
+    names = {'source': source}
+    for key, data in rendered.items():
+        names[key] = storage.save(derivative_name(source, key), ContentFile(data))
+
+    with transaction.atomic():
+        profile = StudentProfile.objects.select_for_update().only(
+            'user_id', 'id_card_photo', 'id_card_derivatives'
+        ).filter(pk=user_id).first()
+        if profile is None or profile.id_card_photo.name != source:
+            stale, names = names, None
+        else:
+            stale = profile.id_card_derivatives
+            # update() rather than save(): nothing a report shows has changed
+            StudentProfile.objects.filter(pk=user_id).update(id_card_derivatives=names)
+
+    for key, name in stale.items():
+        if key != 'source' and (names is None or name not in names.values()):
+            storage.delete(name)
+
+    if names is not None:
+        from projects.principal import invalidate_principal
+        invalidate_principal(user_id)
+    return names
+
+
+def _finish(user_id, source, future):
+    # Runs on the pool's management thread, which has its own connections
+    try:
+        store_derivatives(user_id, source, future.result())
+    except Exception:
+        logger.exception('Could not render ID card derivatives for user %s', user_id)
+    finally:
+        connections.close_all()
+
+
+def schedule_derivatives(profile):
+    """Render a profile's thumbnails in the process pool once the save commits.
+
+    The request only reads the original back; decoding and encoding happen
+    in the pool. With ``THUMBNAIL_WORKERS = 0`` they are rendered inline.
+    """
+    user_id, source = profile.pk, profile.id_card_photo.name
+
+    def submit():
+        try:
+            data = read_photo(profile)
+        except OSError:
+            logger.warning('ID card photo %s is missing; no derivatives rendered', source)
+            return
+        if not settings.THUMBNAIL_WORKERS:
+            try:
+                store_derivatives(user_id, source, render_derivatives(data))
+            except Exception:
+                logger.exception('Could not render ID card derivatives for user %s', user_id)
+            return
+        future = get_executor().submit(render_derivatives, data)
+        future.add_done_callback(lambda done: _finish(user_id, source, done))
+
+    transaction.on_commit(submit)
+
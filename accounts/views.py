@@ -29,19 +29,15 @@ def dashboard(request):
     groups = None
     
     if request.user.is_student:
-        try:
-            profile = StudentProfile.objects.get(user=request.user)
+        profile = request.principal.student_profile
+        if profile is not None:
             has_profile = True
-            groups = ProjectGroup.objects.filter(members__student=profile)
-        except StudentProfile.DoesNotExist:
-            pass
+            groups = ProjectGroup.objects.with_summary().filter(id__in=request.principal.group_ids)
     elif request.user.is_teacher:
-        try:
-            profile = TeacherProfile.objects.get(user=request.user)
+        profile = request.principal.teacher_profile
+        if profile is not None:
             has_profile = True
-            groups = ProjectGroup.objects.filter(mentor=profile)
-        except TeacherProfile.DoesNotExist:
-            pass
+            groups = ProjectGroup.objects.with_summary().for_mentor(profile)
     
     return render(request, 'dashboard.html', {
         'has_profile': has_profile,
@@ -53,13 +49,10 @@ def complete_student_profile(request):
     if not request.user.is_student:
         return redirect('dashboard')
     
-    try:
-        # Check if profile already exists
-        StudentProfile.objects.get(user=request.user)
+    # Check if profile already exists
+    if request.principal.student_profile is not None:
         messages.info(request, 'Your profile is already completed.')
         return redirect('profile')
-    except StudentProfile.DoesNotExist:
-        pass
     
     if request.method == 'POST':
         form = StudentProfileForm(request.POST, request.FILES)
@@ -78,13 +71,10 @@ def complete_teacher_profile(request):
     if not request.user.is_teacher:
         return redirect('dashboard')
     
-    try:
-        # Check if profile already exists
-        TeacherProfile.objects.get(user=request.user)
+    # Check if profile already exists
+    if request.principal.teacher_profile is not None:
         messages.info(request, 'Your profile is already completed.')
         return redirect('profile')
-    except TeacherProfile.DoesNotExist:
-        pass
     
     if request.method == 'POST':
         form = TeacherProfileForm(request.POST)
@@ -100,23 +90,19 @@ def complete_teacher_profile(request):
 
 @login_required
 def profile(request):
-    try:
-        if request.user.is_student:
-            profile = StudentProfile.objects.get(user=request.user)
-            groups = ProjectGroup.objects.filter(members__student=profile)
-        elif request.user.is_teacher:
-            profile = TeacherProfile.objects.get(user=request.user)
-            groups = ProjectGroup.objects.filter(mentor=profile)
-        else:
-            profile = None
-            groups = None
-    except (StudentProfile.DoesNotExist, TeacherProfile.DoesNotExist):
-        if request.user.is_student:
+    if request.user.is_student:
+        profile = request.principal.student_profile
+        if profile is None:
             return redirect('complete_student_profile')
-        elif request.user.is_teacher:
+        groups = ProjectGroup.objects.with_summary().filter(id__in=request.principal.group_ids)
+    elif request.user.is_teacher:
+        profile = request.principal.teacher_profile
+        if profile is None:
             return redirect('complete_teacher_profile')
-        else:
-            return redirect('dashboard')
+        groups = ProjectGroup.objects.with_summary().for_mentor(profile)
+    else:
+        profile = None
+        groups = None
     
     return render(request, 'accounts/profile.html', {
         'profile': profile,
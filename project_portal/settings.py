@@ -51,6 +51,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'projects.middleware.PrincipalMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -59,9 +60,39 @@ LOGIN_REDIRECT_URL='dashboard'
 LOGOUT_REDIRECT_URL='login'
 
 
+# Background report generation
+REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR', os.path.join(BASE_DIR, 'report_cache'))
+REPORT_JOB_TIMEOUT = 15 * 60
+
+# Chunked, resumable submission uploads
+UPLOAD_TEMP_DIR = os.environ.get('UPLOAD_TEMP_DIR', os.path.join(BASE_DIR, 'upload_tmp'))
+UPLOAD_CHUNK_SIZE = 2 * 1024 * 1024
+UPLOAD_CHUNK_MAX_SIZE = 8 * 1024 * 1024
+UPLOAD_MAX_SIZE = 200 * 1024 * 1024
+UPLOAD_SESSION_MAX_AGE = 2 * 24 * 60 * 60
+
+
 STATIC_URL='/static/'
 STATICFILIES_DIRS=[os.path.join(BASE_DIR,'static')]
 
+# Uploaded files are stored once per distinct content and shared by name
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+MEDIA_URL = '/media/'
+STORAGES = {
+    'default': {'BACKEND': 'projects.storage.DedupFileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# How submission downloads are sent once Django has checked permissions:
+# 'django' streams them from Python, 'nginx' hands off with X-Accel-Redirect
+# to an internal location at SENDFILE_URL_PREFIX aliased to MEDIA_ROOT, and
+# 'xsendfile' sets X-Sendfile (Apache mod_xsendfile, lighttpd)
+SENDFILE_BACKEND = os.environ.get('SENDFILE_BACKEND', 'django')
+SENDFILE_URL_PREFIX = '/protected/'
+
+# Processes rendering ID card thumbnails; 0 renders them inline on save
+THUMBNAIL_WORKERS = int(os.environ.get('THUMBNAIL_WORKERS', 2))
+
 ROOT_URLCONF = 'project_portal.urls'
 
 TEMPLATES = [
@@ -85,12 +116,68 @@ WSGI_APPLICATION = 'project_portal.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_ENGINE picks the profile: 'sqlite' (default) or 'postgresql'.
+# Both keep connections open for DATABASE_CONN_MAX_AGE seconds between
+# requests (0 closes them after each one) and check them before reuse.
+
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DATABASE_NAME', 'project_portal'),
+            'USER': os.environ.get('DATABASE_USER', ''),
+            'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+            'HOST': os.environ.get('DATABASE_HOST', ''),
+            'PORT': os.environ.get('DATABASE_PORT', ''),
+            'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    # DATABASE_POOL_SIZE > 0 switches to a psycopg connection pool shared by
+    # the threads of each process (needs "psycopg[pool]"); a pool replaces
+    # persistent connections, so CONN_MAX_AGE must then be 0
+    DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE', 0))
+    if DATABASE_POOL_SIZE:
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': min(2, DATABASE_POOL_SIZE),
+            'max_size': DATABASE_POOL_SIZE,
+            'timeout': 10,
+        }
+else:
+    # WAL lets readers carry on while one connection writes; IMMEDIATE takes
+    # the write lock at BEGIN so a transaction that reads before it writes
+    # waits for busy_timeout instead of failing with "database is locked".
+    # transaction_mode applies to every atomic() block, which is fine here:
+    # requests are not wrapped in transactions (no ATOMIC_REQUESTS), so reads
+    # run in autocommit and never BEGIN, and the app only opens atomic()
+    # around writes. The one read-only exception is the admin's change form,
+    # which Django opens in a transaction even for GET; it briefly queues
+    # behind writers, which staff traffic can afford. Keep new read paths out
+    # of atomic() so they do not serialise on the write lock.
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA busy_timeout=20000;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA mmap_size=268435456;'
+                    'PRAGMA cache_size=-20000;'
+                    'PRAGMA temp_store=MEMORY;'
+                ),
+            },
+        }
     }
-}
 
 
 # Password validation
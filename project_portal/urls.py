@@ -22,8 +22,11 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from projects.views import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('accounts.urls')),
     path('projects/', include('projects.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path('api/v1/', include('projects.api_urls')),
+] + static(settings.MEDIA_URL, view=serve_media, document_root=settings.MEDIA_ROOT)
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import ProjectGroup, GroupMember, ProjectSubmission
+from .models import (
+    DataVersion, ProgressRollup, ProjectGroup, GroupMember, ProjectSubmission, ReportJob, SubmissionVersion
+)
+from .rollups import schedule_refresh
 
 @admin.register(ProjectGroup)
 class ProjectGroupAdmin(admin.ModelAdmin):
@@ -9,7 +12,9 @@ class ProjectGroupAdmin(admin.ModelAdmin):
     actions = ['approve_groups']
 
     def approve_groups(self, request, queryset):
-        queryset.update(is_approved=True)
+        queryset.touch(is_approved=True)
+        DataVersion.bump(DataVersion.GROUPS)
+        schedule_refresh(*queryset.values_list('id', flat=True))
     approve_groups.short_description = "Approve selected groups"
 
 @admin.register(GroupMember)
@@ -20,4 +25,28 @@ class GroupMemberAdmin(admin.ModelAdmin):
 @admin.register(ProjectSubmission)
 class ProjectSubmissionAdmin(admin.ModelAdmin):
     list_display = ['group', 'submitted_at']
-    readonly_fields = ['submitted_at', 'updated_at']
\ No newline at end of file
+    readonly_fields = ['submitted_at', 'updated_at']
+
+@admin.register(SubmissionVersion)
+class SubmissionVersionAdmin(admin.ModelAdmin):
+    list_display = ['group', 'doc_type', 'number', 'filename', 'size', 'submitted_by', 'created_at']
+    list_filter = ['doc_type']
+    search_fields = ['group__name', 'filename', 'sha256']
+
+    # The history is append-only
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'report_type', 'status', 'data_version', 'requested_by', 'created_at', 'finished_at']
+    list_filter = ['report_type', 'status']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+@admin.register(ProgressRollup)
+class ProgressRollupAdmin(admin.ModelAdmin):
+    list_display = ['section', 'branch', 'passing_year', 'groups', 'approved', 'mentored', 'submitted']
+    list_filter = ['section', 'branch', 'passing_year']
@@ -0,0 +1,225 @@
+import heapq
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+
+from accounts.models import TeacherProfile
+from .models import DataVersion, GroupMember, ProjectGroup
+from .rollups import schedule_refresh
+
+
+# Cost of giving a group to a teacher from another department, against the
+# load-balancing cost below. Large enough that a matching mentor with spare
+# capacity is always preferred, so affinity is only given up when every
+# matching teacher is full.
+AFFINITY_PENALTY = 1_000_000
+
+# A teacher's k-th group costs LOAD_SCALE * k / capacity, so marginal cost
+# grows with load relative to capacity and the flow spreads groups evenly.
+LOAD_SCALE = 1000
+
+
+class Assignment:
+    def __init__(self, group_id, group_name, branch, teacher):
+        self.group_id = group_id
+        self.group_name = group_name
+        self.branch = branch
+        self.teacher = teacher
+
+    @property
+    def affinity(self):
+        return self.branch is not None and self.branch == self.teacher.department
+
+
+class AllocationPlan:
+    def __init__(self, assignments, unassigned, loads_before, teachers):
+        self.assignments = assignments
+        # (group id, name, branch) left without a mentor for lack of capacity
+        self.unassigned = unassigned
+        self.loads_before = loads_before
+        self.teachers = teachers
+
+    @property
+    def loads_after(self):
+        loads = Counter(self.loads_before)
+        loads.update(assignment.teacher.pk for assignment in self.assignments)
+        return loads
+
+
+def group_branches(groups):
+    """Return ``{group id: branch}`` using the branch most of its members study."""
+    counts = defaultdict(Counter)
+    rows = GroupMember.objects.filter(group__in=groups.values('id')).values_list('group_id', 'student__branch')
+    for group_id, branch in rows.iterator():
+        counts[group_id][branch] += 1
+    return {group_id: branch_counts.most_common(1)[0][0] for group_id, branch_counts in counts.items()}
+
+
+def _slot_cost(load, capacity):
+    return LOAD_SCALE * load // capacity
+
+
+class _FlowNetwork:
+    """Min-cost flow over branches -> teachers with convex teacher costs.
+
+    Groups only differ by branch, so they are collapsed into one source arc
+    per branch; the network is branches x teachers however many groups
+    there are. Each teacher's arc to the sink carries a convex cost (the
+    k-th unit costs ``_slot_cost(k)``), which is what makes the result
+    balanced rather than merely feasible. Flow is pushed one unit at a
+    time along shortest paths found with Dijkstra on potential-reduced
+    costs (successive shortest paths), so the final assignment has the
+    minimum total cost.
+    """
+
+    def __init__(self, demand, teachers, loads, capacities, pair_cost):
+        self.branches = list(demand)
+        self.teachers = teachers
+        self.demand = dict(demand)
+        self.loads = dict(loads)
+        self.capacities = capacities
+        self.pair_cost = pair_cost
+        self.by_pk = {teacher.pk: teacher for teacher in teachers}
+        # (branch, teacher pk) -> units of flow
+        self.flow = Counter()
+
+    def _teacher_arc(self, teacher):
+        """Marginal cost of one more unit into the sink, or None if full."""
+        load = self.loads[teacher.pk]
+        if load >= self.capacities[teacher.pk]:
+            return None
+        return _slot_cost(load + 1, self.capacities[teacher.pk])
+
+    def _shortest_path(self, potential):
+        # Nodes: 's', ('b', branch), ('t', pk), 'z'
+        distance = {'s': 0}
+        previous = {}
+        queue = [(0, 0, 's')]
+        counter = 1
+        while queue:
+            dist, _, node = heapq.heappop(queue)
+            if dist > distance.get(node, float('inf')):
+                continue
+            for neighbour, cost in self._arcs(node):
+                reduced = dist + cost + potential.get(node, 0) - potential.get(neighbour, 0)
+                if reduced < distance.get(neighbour, float('inf')):
+                    distance[neighbour] = reduced
+                    previous[neighbour] = node
+                    heapq.heappush(queue, (reduced, counter, neighbour))
+                    counter += 1
+        return distance, previous
+
+    def _arcs(self, node):
+        if node == 's':
+            for branch in self.branches:
+                if self.demand[branch]:
+                    yield ('b', branch), 0
+        elif node == 'z':
+            return
+        elif node[0] == 'b':
+            for teacher in self.teachers:
+                yield ('t', teacher.pk), self.pair_cost(node[1], teacher)
+        else:
+            pk = node[1]
+            teacher = self.by_pk[pk]
+            cost = self._teacher_arc(teacher)
+            if cost is not None:
+                yield 'z', cost
+            # Residual arcs back to branches that already send flow here
+            for branch in self.branches:
+                if self.flow[branch, pk]:
+                    yield ('b', branch), -self.pair_cost(branch, teacher)
+
+    def solve(self):
+        potential = {}
+        while any(self.demand.values()):
+            distance, previous = self._shortest_path(potential)
+            if 'z' not in distance:
+                break
+            for node, dist in distance.items():
+                potential[node] = potential.get(node, 0) + dist
+
+            path = ['z']
+            while path[-1] != 's':
+                path.append(previous[path[-1]])
+            path.reverse()
+            for tail, head in zip(path, path[1:]):
+                if tail == 's':
+                    self.demand[head[1]] -= 1
+                elif head == 'z':
+                    self.loads[tail[1]] += 1
+                elif tail[0] == 'b':
+                    self.flow[tail[1], head[1]] += 1
+                else:
+                    self.flow[head[1], tail[1]] -= 1
+        return self.flow
+
+
+def plan_allocation(groups=None):
+    """Work out mentors for every group that has none.
+
+    Existing assignments are kept and count towards each teacher's load;
+    teachers never go over ``mentor_capacity``. Returns an
+    ``AllocationPlan``; nothing is written.
+    """
+    if groups is None:
+        groups = ProjectGroup.objects.all()
+    groups = groups.filter(mentor__isnull=True)
+    pending = list(groups.order_by('id').values_list('id', 'name'))
+    teachers = list(TeacherProfile.objects.filter(mentor_capacity__gt=0).order_by('user_id'))
+
+    loads_before = Counter(dict(
+        ProjectGroup.objects.filter(mentor__isnull=False).values_list('mentor_id')
+        .annotate(count=Count('id')).values_list('mentor_id', 'count')
+    ))
+    loads = {teacher.pk: loads_before.get(teacher.pk, 0) for teacher in teachers}
+    capacities = {teacher.pk: teacher.mentor_capacity for teacher in teachers}
+
+    branches = group_branches(groups)
+    by_branch = defaultdict(list)
+    for group_id, name in pending:
+        by_branch[branches.get(group_id)].append((group_id, name))
+
+    def pair_cost(branch, teacher):
+        return 0 if branch is not None and branch == teacher.department else AFFINITY_PENALTY
+
+    network = _FlowNetwork({branch: len(rows) for branch, rows in by_branch.items()},
+                           teachers, loads, capacities, pair_cost)
+    flow = network.solve()
+
+    teachers_by_pk = {teacher.pk: teacher for teacher in teachers}
+    assignments, unassigned = [], []
+    for branch, rows in by_branch.items():
+        rows = iter(rows)
+        for (flow_branch, pk), units in sorted(flow.items(), key=lambda item: item[0][1]):
+            if flow_branch != branch:
+                continue
+            for _ in range(units):
+                group_id, name = next(rows)
+                assignments.append(Assignment(group_id, name, branch, teachers_by_pk[pk]))
+        unassigned.extend((group_id, name, branch) for group_id, name in rows)
+
+    assignments.sort(key=lambda assignment: assignment.group_id)
+    return AllocationPlan(assignments, unassigned, loads_before, teachers)
+
+
+def apply_allocation(plan):
+    """Write the plan with one UPDATE per teacher; return the number of groups assigned.
+
+    Groups someone assigned by hand since the plan was made are left alone.
+    """
+    by_teacher = defaultdict(list)
+    for assignment in plan.assignments:
+        by_teacher[assignment.teacher.pk].append(assignment.group_id)
+
+    assigned = 0
+    with transaction.atomic():
+        for teacher_pk, group_ids in by_teacher.items():
+            assigned += ProjectGroup.objects.filter(id__in=group_ids, mentor__isnull=True).touch(mentor_id=teacher_pk)
+        if assigned:
+            # touch() skips the signals that invalidate cached facets and
+            # refresh the progress rollup
+            DataVersion.bump(DataVersion.GROUPS)
+            schedule_refresh(*[assignment.group_id for assignment in plan.assignments])
+    return assigned
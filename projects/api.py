@@ -0,0 +1,264 @@
+import hashlib
+from collections import namedtuple
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.db.models import Prefetch
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views.decorators.http import require_GET
+
+from accounts.models import StudentProfile
+from .listings import GROUP_FILTERS, STUDENT_FILTERS, filter_groups, filter_students
+from .models import DataVersion, GroupMember, ProjectGroup, ProjectSubmission
+from .pagination import DEFAULT_PAGE_SIZE, cursor_filters, paginate_keyset
+from .submissions import DOCUMENT_FIELDS
+
+
+API_MAX_PAGE_SIZE = 200
+
+SUBMISSION_FILTERS = ['section', 'group']
+SUBMISSION_ORDERING = ['id']
+
+# ``get`` reads the value from a row, ``columns`` are the model fields it
+# needs loaded and ``related`` names the join or prefetch it relies on
+ApiField = namedtuple('ApiField', ['get', 'columns', 'related'], defaults=[(), None])
+
+
+def _column(name):
+    return ApiField(lambda row: getattr(row, name), (name,))
+
+
+def _timestamp(name):
+    return ApiField(lambda row: getattr(row, name).isoformat(), (name,))
+
+
+def _members(group):
+    return [
+        {'student': member.student_id, 'full_name': member.student.full_name, 'role': member.role}
+        for member in group.members.all()
+    ]
+
+
+def _membership(student, attribute):
+    memberships = student.groupmember_set.all()
+    return getattr(memberships[0], attribute) if memberships else None
+
+
+def _document_url(submission, doc_type):
+    if not getattr(submission, DOCUMENT_FIELDS[doc_type]):
+        return None
+    return reverse('download_submission', args=[submission.id, doc_type])
+
+
+GROUP_FIELDS = {
+    'id': _column('id'),
+    'name': _column('name'),
+    'section': _column('section'),
+    'project_title': _column('project_title'),
+    'problem_statement': _column('problem_statement'),
+    'project_explanation': _column('project_explanation'),
+    'is_approved': _column('is_approved'),
+    'created_at': _timestamp('created_at'),
+    'mentor': _column('mentor_id'),
+    'mentor_name': ApiField(lambda group: group.mentor.full_name if group.mentor else None, ('mentor',), 'mentor'),
+    'member_count': ApiField(lambda group: len(group.members.all()), (), 'members'),
+    'members': ApiField(_members, (), 'members'),
+}
+
+STUDENT_FIELDS = {
+    'id': _column('user_id'),
+    'full_name': _column('full_name'),
+    'section': _column('section'),
+    'branch': _column('branch'),
+    'degree': _column('degree'),
+    'passing_year': _column('passing_year'),
+    'abc_id': _column('abc_id'),
+    'email_id': _column('email_id'),
+    'mobile_no': _column('mobile_no'),
+    'group': ApiField(lambda student: _membership(student, 'group_id'), (), 'membership'),
+    'role': ApiField(lambda student: _membership(student, 'role'), (), 'membership'),
+}
+
+SUBMISSION_FIELDS = {
+    'id': _column('id'),
+    'group': _column('group_id'),
+    'group_name': ApiField(lambda submission: submission.group.name, ('group',), 'group'),
+    'github_link': _column('github_link'),
+    'ppt': ApiField(lambda submission: _document_url(submission, 'ppt'), ('ppt_file',)),
+    'synopsis': ApiField(lambda submission: _document_url(submission, 'synopsis'), ('synopsis_report',)),
+    'srs': ApiField(lambda submission: _document_url(submission, 'srs'), ('srs_report',)),
+    'submitted_at': _timestamp('submitted_at'),
+    'updated_at': _timestamp('updated_at'),
+}
+
+DEFAULT_GROUP_FIELDS = ['id', 'name', 'section', 'project_title', 'is_approved', 'mentor', 'mentor_name', 'member_count']
+DEFAULT_STUDENT_FIELDS = ['id', 'full_name', 'section', 'branch', 'passing_year', 'abc_id', 'group', 'role']
+DEFAULT_SUBMISSION_FIELDS = list(SUBMISSION_FIELDS)
+
+
+class ApiError(Exception):
+    pass
+
+
+def api_teacher_required(view):
+    """Like ``login_required`` for the teacher pages, but answering in JSON."""
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required.'}, status=401)
+        if not request.user.is_teacher:
+            return JsonResponse({'error': 'Only teachers can use the API.'}, status=403)
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        except Http404 as exc:
+            return JsonResponse({'error': str(exc)}, status=404)
+    return require_GET(wrapped)
+
+
+def requested_fields(request, available, default):
+    """Parse ``?fields=a,b`` against the fields a resource offers."""
+    names = [name.strip() for name in request.GET.get('fields', '').split(',') if name.strip()]
+    if not names:
+        return default
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ApiError(f'Unknown field(s): {", ".join(unknown)}. Available: {", ".join(available)}.')
+    return list(dict.fromkeys(names))
+
+
+def page_size(request):
+    limit = request.GET.get('limit', '')
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    if not limit.isdigit() or not 1 <= int(limit) <= API_MAX_PAGE_SIZE:
+        raise ApiError(f'"limit" must be between 1 and {API_MAX_PAGE_SIZE}.')
+    return int(limit)
+
+
+def sparse(queryset, spec, fields, ordering):
+    """Load only the columns and relations the requested fields use."""
+    columns = {column for name in fields for column in spec[name].columns}
+    columns.update(field for field in ordering if field != 'search_rank')
+    related = {spec[name].related for name in fields}
+    if 'mentor' in related:
+        queryset = queryset.select_related('mentor')
+        columns.add('mentor__full_name')
+    if 'group' in related:
+        queryset = queryset.select_related('group')
+        columns.add('group__name')
+    if 'members' in related:
+        queryset = queryset.prefetch_related(
+            Prefetch('members', queryset=GroupMember.objects.select_related('student').order_by('role'))
+        )
+    if 'membership' in related:
+        queryset = queryset.prefetch_related('groupmember_set')
+    return queryset.only(*columns)
+
+
+def serialize(row, spec, fields):
+    return {name: spec[name].get(row) for name in fields}
+
+
+def etag_for(request, resource, version_keys):
+    """A strong ETag from the data versions the resource reads and the query string.
+
+    Every write to those tables bumps one of the versions, so the same
+    query with the same versions is guaranteed to produce the same body.
+    """
+    versions = DataVersion.current_many(*version_keys)
+    query = sorted((key, value) for key in request.GET for value in request.GET.getlist(key))
+    digest = hashlib.sha256(repr((resource, list(versions.items()), query)).encode('utf-8')).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def conditional(request, etag, build):
+    """Answer 304 when the client's copy is current, otherwise ``build()`` the body."""
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(build())
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ['Cookie'])
+    return response
+
+
+def page_links(request, page):
+    def link(cursor):
+        if cursor is None:
+            return None
+        params = {'cursor': cursor}
+        for name in ('fields', 'limit'):
+            if request.GET.get(name):
+                params[name] = request.GET[name]
+        return f'{request.path}?{urlencode(params)}'
+    return link(page.next_cursor), link(page.previous_cursor)
+
+
+def list_response(request, resource, version_keys, queryset, ordering, filters, spec, fields):
+    size = page_size(request)
+
+    def build():
+        page = paginate_keyset(sparse(queryset, spec, fields, ordering), ordering, filters,
+                               request.GET.get('cursor'), page_size=size)
+        next_link, previous_link = page_links(request, page)
+        return {
+            'results': [serialize(row, spec, fields) for row in page],
+            'next': next_link,
+            'previous': previous_link,
+        }
+
+    return conditional(request, etag_for(request, resource, version_keys), build)
+
+
+GROUP_VERSIONS = [DataVersion.GROUPS, DataVersion.MEMBERS, DataVersion.STUDENTS, DataVersion.TEACHERS]
+STUDENT_VERSIONS = [DataVersion.STUDENTS, DataVersion.MEMBERS]
+SUBMISSION_VERSIONS = [DataVersion.SUBMISSIONS, DataVersion.GROUPS]
+
+
+@api_teacher_required
+def group_list(request):
+    """Groups with the ``view_all_groups`` filters: section, status, mentor and search."""
+    fields = requested_fields(request, GROUP_FIELDS, DEFAULT_GROUP_FIELDS)
+    filters = cursor_filters(request, GROUP_FILTERS)
+    groups, ordering = filter_groups(ProjectGroup.objects.all(), filters)
+    return list_response(request, 'groups', GROUP_VERSIONS, groups, ordering, filters, GROUP_FIELDS, fields)
+
+
+@api_teacher_required
+def group_detail(request, group_id):
+    fields = requested_fields(request, GROUP_FIELDS, list(GROUP_FIELDS))
+
+    def build():
+        group = sparse(ProjectGroup.objects.filter(id=group_id), GROUP_FIELDS, fields, ['id']).first()
+        if group is None:
+            raise Http404('Group not found')
+        return serialize(group, GROUP_FIELDS, fields)
+
+    return conditional(request, etag_for(request, f'group:{group_id}', GROUP_VERSIONS), build)
+
+
+@api_teacher_required
+def student_list(request):
+    """Students with the ``view_students`` filters: section, branch and search."""
+    fields = requested_fields(request, STUDENT_FIELDS, DEFAULT_STUDENT_FIELDS)
+    filters = cursor_filters(request, STUDENT_FILTERS)
+    students, ordering = filter_students(StudentProfile.objects.all(), filters)
+    return list_response(request, 'students', STUDENT_VERSIONS, students, ordering, filters, STUDENT_FIELDS, fields)
+
+
+@api_teacher_required
+def submission_list(request):
+    """Submissions, filtered by the group's section or by group id."""
+    fields = requested_fields(request, SUBMISSION_FIELDS, DEFAULT_SUBMISSION_FIELDS)
+    filters = cursor_filters(request, SUBMISSION_FILTERS)
+    submissions = ProjectSubmission.objects.all()
+    if filters['section']:
+        submissions = submissions.filter(group__section=filters['section'])
+    if filters['group'].isdigit():
+        submissions = submissions.filter(group_id=filters['group'])
+    return list_response(request, 'submissions', SUBMISSION_VERSIONS, submissions, SUBMISSION_ORDERING,
+                         filters, SUBMISSION_FIELDS, fields)
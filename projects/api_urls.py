@@ -0,0 +1,9 @@
+from django.urls import path
+from . import api
+
+urlpatterns = [
+    path('groups/', api.group_list, name='api_group_list'),
+    path('groups/<int:group_id>/', api.group_detail, name='api_group_detail'),
+    path('students/', api.student_list, name='api_student_list'),
+    path('submissions/', api.submission_list, name='api_submission_list'),
+]
@@ -0,0 +1,44 @@
+from collections import namedtuple
+
+from django.core.cache import cache
+
+from accounts.models import StudentProfile
+from .models import DataVersion, GroupMember
+
+
+AVAILABILITY_CACHE_TIMEOUT = 60 * 60
+
+AvailableStudent = namedtuple('AvailableStudent', ['user_id', 'full_name', 'abc_id', 'section'])
+
+
+def section_version_key(section):
+    return f'available:{section}'
+
+
+def bump_sections(*sections):
+    """Mark the cached availability of ``sections`` as stale."""
+    DataVersion.bump(*[section_version_key(section) for section in set(sections)])
+
+
+def available_students(section):
+    """Return the students in ``section`` who are not in any group, by name.
+
+    The list is cached under the section's membership version and the
+    student data version, so it is only rebuilt after someone joins or
+    leaves a group in the section or a student profile changes. Both
+    versions are read in one query.
+    """
+    versions = DataVersion.current_many(DataVersion.STUDENTS, section_version_key(section))
+    cache_key = 'available:{}:{}:{}'.format(section, *versions.values())
+
+    students = cache.get(cache_key)
+    if students is None:
+        students = [
+            AvailableStudent(*row)
+            for row in StudentProfile.objects.filter(section=section)
+            .exclude(user_id__in=GroupMember.objects.values('student_id'))
+            .order_by('full_name', 'user_id')
+            .values_list('user_id', 'full_name', 'abc_id', 'section')
+        ]
+        cache.set(cache_key, students, AVAILABILITY_CACHE_TIMEOUT)
+    return students
@@ -0,0 +1,382 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User, StudentProfile, TeacherProfile
+from .models import ProjectGroup, GroupMember, ProjectSubmission, ReportJob, SubmissionVersion, UploadSession
+from .report_jobs import report_path
+
+
+BUDGET_PATH = os.path.join(os.path.dirname(__file__), 'benchmark_budget.json')
+
+DEFAULT_DATASET = {'students': 80, 'groups': 20, 'submissions': 10}
+
+SECTIONS = ('A', 'B', 'C')
+BRANCHES = ('CSE', 'IT', 'ECE')
+
+# Contents of the file behind the seeded upload session (64 KiB)
+UPLOAD_BODY = b'%PDF-1.4\n' + b'1' * 65527
+
+# (url name, role, HTTP method, URL kwargs filled in from the seeded fixtures)
+ROUTES = [
+    # accounts
+    ('login', 'anonymous', 'get', ()),
+    ('logout', 'student', 'post', ()),
+    ('register', 'anonymous', 'get', ()),
+    ('dashboard', 'student', 'get', ()),
+    ('dashboard', 'teacher', 'get', ()),
+    ('profile', 'student', 'get', ()),
+    ('profile', 'teacher', 'get', ()),
+    ('complete_student_profile', 'student', 'get', ()),
+    ('complete_teacher_profile', 'teacher', 'get', ()),
+    ('edit_profile', 'student', 'get', ()),
+    ('edit_profile', 'teacher', 'get', ()),
+    ('password_reset', 'anonymous', 'get', ()),
+    ('password_reset_done', 'anonymous', 'get', ()),
+    ('password_reset_confirm', 'anonymous', 'get', ('uidb64', 'token')),
+    ('password_reset_complete', 'anonymous', 'get', ()),
+
+    # projects, student side
+    ('create_group', 'student', 'get', ()),
+    ('my_groups', 'student', 'get', ()),
+    ('group_detail', 'student', 'get', ('group_id',)),
+    ('add_members', 'student', 'get', ('group_id',)),
+    ('remove_member', 'student', 'get', ('group_id', 'member_id')),
+    ('submit_project', 'student', 'get', ('group_id',)),
+    ('edit_group', 'student', 'get', ('group_id',)),
+    ('delete_group', 'student', 'get', ('group_id',)),
+    ('submit_document', 'student', 'get', ('group_id', 'doc_type')),
+    ('start_upload', 'student', 'post', ('group_id',)),
+    ('upload_chunk', 'student', 'put', ('upload_id',)),
+    ('download_submission', 'student', 'get', ('submission_id', 'file_type')),
+    ('submission_history', 'student', 'get', ('group_id', 'file_type')),
+    ('download_submission_version', 'student', 'get', ('version_id',)),
+    ('delete_submission', 'student', 'get', ('submission_id', 'file_type')),
+
+    # projects, teacher side
+    ('teacher_dashboard', 'teacher', 'get', ()),
+    ('view_students', 'teacher', 'get', ()),
+    ('view_all_groups', 'teacher', 'get', ()),
+    ('download_student_data', 'teacher', 'get', ()),
+    ('report_status', 'teacher', 'get', ('job_id',)),
+    ('download_report', 'teacher', 'get', ('job_id',)),
+    ('approve_group', 'teacher', 'get', ('group_id',)),
+    ('assign_mentor', 'teacher', 'post', ('group_id',)),
+    ('batch_approve_groups', 'teacher', 'post', ()),
+    ('batch_assign_mentor', 'teacher', 'post', ()),
+    ('allocate_mentors', 'teacher', 'get', ()),
+    ('download_submission_bundle', 'teacher', 'get', ()),
+    ('teacher_analytics', 'teacher', 'get', ()),
+    ('teacher_group_view', 'teacher', 'get', ('group_id',)),
+    ('teacher_all_submissions', 'teacher', 'get', ()),
+    ('group_detail', 'teacher', 'get', ('group_id',)),
+
+    # JSON API
+    ('api_group_list', 'teacher', 'get', ()),
+    ('api_group_detail', 'teacher', 'get', ('group_id',)),
+    ('api_student_list', 'teacher', 'get', ()),
+    ('api_submission_list', 'teacher', 'get', ()),
+]
+
+# Request bodies for the write routes, built from the fixtures, so they are
+# measured going through their real write path rather than a 400
+ROUTE_REQUESTS = {
+    'start_upload': lambda fixtures: {'data': {'doc_type': 'srs', 'filename': 'srs.pdf', 'size': 4096}},
+    # The whole file in one chunk, so the upload is also verified and attached
+    'upload_chunk': lambda fixtures: {
+        'data': UPLOAD_BODY, 'content_type': 'application/octet-stream',
+        'headers': {'Content-Range': f'bytes 0-{len(UPLOAD_BODY) - 1}/{len(UPLOAD_BODY)}'},
+    },
+    'assign_mentor': lambda fixtures: {'data': {'mentor': fixtures['other_mentor_id']}},
+    'batch_approve_groups': lambda fixtures: {
+        'data': {'group_ids': fixtures['mentored_group_ids'], 'action': 'reject'},
+    },
+    'batch_assign_mentor': lambda fixtures: {
+        'data': {'group_ids': fixtures['mentored_group_ids'], 'mentor': fixtures['other_mentor_id']},
+    },
+}
+
+
+@contextmanager
+def benchmark_environment():
+    """Point media, chunked uploads and the report cache at a scratch directory.
+
+    DEBUG is switched off as under the test runner; the debug error page
+    would otherwise evaluate querysets while rendering a crashed view.
+    """
+    root = tempfile.mkdtemp(prefix='apms-benchmark-')
+    try:
+        with override_settings(DEBUG=False, MEDIA_ROOT=os.path.join(root, 'media'),
+                               UPLOAD_TEMP_DIR=os.path.join(root, 'uploads'),
+                               REPORT_CACHE_DIR=os.path.join(root, 'reports')):
+            yield root
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def seed_dataset(students=DEFAULT_DATASET['students'], groups=DEFAULT_DATASET['groups'],
+                 submissions=DEFAULT_DATASET['submissions']):
+    """Create a synthetic dataset and return the fixtures the routes need."""
+    password = make_password('benchmark')
+
+    teacher_users = User.objects.bulk_create([
+        User(username=f'bench_teacher_{i}', password=password, is_teacher=True) for i in range(2)
+    ])
+    teachers = TeacherProfile.objects.bulk_create([
+        TeacherProfile(user=user, full_name=f'Teacher {i}', mobile_no='9000000000',
+                       email_id=f'teacher{i}@example.com', department=BRANCHES[i % len(BRANCHES)])
+        for i, user in enumerate(teacher_users)
+    ])
+
+    student_users = User.objects.bulk_create([
+        User(username=f'bench_student_{i}', password=password, is_student=True) for i in range(students)
+    ])
+    profiles = StudentProfile.objects.bulk_create([
+        StudentProfile(
+            user=user, full_name=f'Student {i:05d}', section=SECTIONS[i % len(SECTIONS)],
+            passing_year=2026, branch=BRANCHES[i % len(BRANCHES)], degree='B.Tech',
+            mobile_no='9000000000', email_id=f'student{i}@example.com', abc_id=f'ABC{i:07d}',
+            id_card_photo=f'id_cards/student_{i}.png',
+        )
+        for i, user in enumerate(student_users)
+    ])
+
+    pools = {section: [p for p in profiles if p.section == section] for section in SECTIONS}
+    project_groups = ProjectGroup.objects.bulk_create([
+        ProjectGroup(
+            name=f'Group {i:04d}', section=SECTIONS[i % len(SECTIONS)],
+            project_title=f'Project {i}', problem_statement='Problem statement',
+            project_explanation='Project explanation', is_approved=i % 2 == 0,
+            mentor=teachers[0] if i % 3 != 2 else None,
+        )
+        for i in range(groups)
+    ])
+
+    roles = [role for role, _ in GroupMember.ROLE_CHOICES]
+    members = []
+    for group in project_groups:
+        pool = pools[group.section]
+        for role in roles:
+            if not pool:
+                break
+            members.append(GroupMember(group=group, student=pool.pop(0), role=role))
+    members = GroupMember.objects.bulk_create(members)
+
+    deck = b'%PDF-1.4\n' + b'0' * 4096
+    submission_rows = []
+    for group in project_groups[:submissions]:
+        submission = ProjectSubmission(group=group, github_link='https://github.com/example/project')
+        submission.ppt_file.save(f'group_{group.id}.pdf', ContentFile(deck), save=False)
+        submission_rows.append(submission)
+    submission_rows = ProjectSubmission.objects.bulk_create(submission_rows)
+    versions = SubmissionVersion.objects.bulk_create([
+        SubmissionVersion(group=submission.group, doc_type='ppt', number=1, file=submission.ppt_file.name,
+                          filename=os.path.basename(submission.ppt_file.name),
+                          sha256=hashlib.sha256(deck).hexdigest(), size=len(deck))
+        for submission in submission_rows
+    ])
+    for version in versions:
+        ProjectGroup.objects.filter(pk=version.group_id).update(current_ppt=version)
+
+    job = ReportJob.objects.create(params={'section': '', 'branch': ''}, params_key='benchmark',
+                                   cache_key='benchmark', data_version=0, status='done')
+    os.makedirs(os.path.dirname(report_path(job)), exist_ok=True)
+    with open(report_path(job), 'wb') as report:
+        report.write(b'%PDF-1.4\n')
+
+    group = project_groups[0]
+    group_members = [member for member in members if member.group_id == group.id]
+    lead = next(member for member in group_members if member.role == 'lead')
+    member = next((member for member in group_members if member.role != 'lead'), lead)
+
+    upload = UploadSession.objects.create(group=group, doc_type='ppt', filename='slides.pdf',
+                                          size=len(UPLOAD_BODY), created_by=lead.student.user)
+
+    return {
+        'users': {
+            'anonymous': None,
+            'student': lead.student.user,
+            'teacher': teacher_users[0],
+        },
+        'group_id': group.id,
+        'member_id': member.id,
+        'mentored_group_ids': [g.id for g in project_groups if g.mentor_id == teachers[0].pk],
+        'other_mentor_id': teachers[1].pk,
+        'submission_id': submission_rows[0].id if submission_rows else 0,
+        'version_id': versions[0].id if versions else 0,
+        'file_type': 'ppt',
+        'doc_type': 'presentation',
+        'job_id': job.id,
+        'upload_id': upload.id,
+        'uidb64': 'MQ',
+        'token': 'set-password',
+    }
+
+
+def _measure(client, method, url, request):
+    """Make one request inside a rolled-back transaction; return (response, queries, seconds).
+
+    The request never commits, so the work it defers with ``on_commit``
+    (rollup refreshes, cache invalidation, thumbnails) is run and counted
+    before the rollback, as it would be after a real commit.
+    """
+    with transaction.atomic():
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            with TestCase.captureOnCommitCallbacks(execute=True):
+                response = getattr(client, method)(url, **request)
+                if response.streaming:
+                    for _ in response.streaming_content:
+                        pass
+            elapsed = time.perf_counter() - start
+        transaction.set_rollback(True)
+    response.close()
+    return response, len(queries), elapsed
+
+
+def run_benchmark(fixtures, routes=ROUTES):
+    """Request every route and record status, query counts and wall time.
+
+    Each route is requested twice, first with an empty cache and then with
+    whatever the first request cached. Requests run inside a transaction
+    that is rolled back, so routes with side effects do not change the data
+    seen by the ones after them; their ``on_commit`` callbacks still run
+    and count towards the route.
+    """
+    results = []
+    request_logger = logging.getLogger('django.request')
+    previous_level = request_logger.level
+    request_logger.setLevel(logging.CRITICAL)
+    try:
+        for name, role, method, params in routes:
+            client = Client(raise_request_exception=False)
+            user = fixtures['users'][role]
+            if user is not None:
+                client.force_login(user)
+            url = reverse(name, kwargs={param: fixtures[param] for param in params})
+            request = ROUTE_REQUESTS[name](fixtures) if name in ROUTE_REQUESTS else {}
+
+            cache.clear()
+            response, queries, elapsed = _measure(client, method, url, request)
+            _, warm_queries, _ = _measure(client, method, url, request)
+
+            results.append({
+                'view': f'{name}:{role}',
+                'status': response.status_code,
+                'queries': queries,
+                'warm_queries': warm_queries,
+                'ms': round(elapsed * 1000, 2),
+            })
+    finally:
+        request_logger.setLevel(previous_level)
+    return results
+
+
+def load_budget(path=BUDGET_PATH):
+    with open(path) as budget_file:
+        return json.load(budget_file)
+
+
+def merge_budget(results, budget, allow_increase=()):
+    """Fold ``results`` into ``budget``; return ``(views, refused)``.
+
+    Query budgets only come down: a view that now needs more queries keeps
+    its old budget and is listed in ``refused`` unless it is named in
+    ``allow_increase``, so an increase is a decision made on purpose rather
+    than a side effect of regenerating the file. Views new to the budget
+    are taken as measured, and wall times are always replaced.
+    """
+    previous = budget['views'] if budget else {}
+    views = {}
+    refused = []
+    for result in results:
+        view = result['view']
+        entry = {
+            'status': result['status'],
+            'queries': result['queries'],
+            'warm_queries': result['warm_queries'],
+            'ms': result['ms'],
+        }
+        old = previous.get(view)
+        if old and view not in allow_increase:
+            for key in ('queries', 'warm_queries'):
+                if entry[key] > old[key]:
+                    refused.append(f'{view}: {key} {old[key]} -> {entry[key]}')
+                    entry[key] = old[key]
+            if entry['status'] != old['status']:
+                refused.append(f"{view}: status {old['status']} -> {entry['status']}")
+        views[view] = entry
+    return views, refused
+
+
+def write_budget(views, dataset, path=BUDGET_PATH):
+    budget = {'dataset': dataset, 'views': views}
+    with open(path, 'w') as budget_file:
+        json.dump(budget, budget_file, indent=2)
+        budget_file.write('\n')
+
+
+def server_errors(results):
+    """Views that answered with a 5xx; a crash is never an acceptable budget."""
+    return [f"{result['view']}: status {result['status']}" for result in results if result['status'] >= 500]
+
+
+def check_budget(results, budget, check_time=False, time_factor=3.0):
+    """Return a message for every view that regressed against the budget."""
+    failures = server_errors(results)
+    for result in results:
+        view = result['view']
+        expected = budget['views'].get(view)
+        if expected is None:
+            failures.append(f'{view}: missing from the budget file')
+            continue
+        if result['status'] != expected['status']:
+            failures.append(f"{view}: status {result['status']}, expected {expected['status']}")
+        if result['queries'] > expected['queries']:
+            failures.append(f"{view}: {result['queries']} queries, budget is {expected['queries']}")
+        if result['warm_queries'] > expected['warm_queries']:
+            failures.append(f"{view}: {result['warm_queries']} warm-cache queries, budget is {expected['warm_queries']}")
+        if check_time and result['ms'] > expected['ms'] * time_factor:
+            failures.append(f"{view}: {result['ms']} ms, budget is {expected['ms']} ms x {time_factor}")
+    return failures
+
+
+def format_report(results, budget=None):
+    """Render the results as a plain-text table, one row per view."""
+    views = budget['views'] if budget else {}
+    rows = [('View', 'Status', 'Queries', 'Budget', 'Warm', 'Budget', 'Time (ms)')]
+    for result in results:
+        expected = views.get(result['view'], {})
+        rows.append((
+            result['view'],
+            str(result['status']),
+            str(result['queries']),
+            str(expected.get('queries', '-')),
+            str(result['warm_queries']),
+            str(expected.get('warm_queries', '-')),
+            f"{result['ms']:.2f}",
+        ))
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    lines = []
+    for index, row in enumerate(rows):
+        lines.append('  '.join(
+            cell.ljust(width) if column == 0 else cell.rjust(width)
+            for column, (cell, width) in enumerate(zip(row, widths))
+        ))
+        if index == 0:
+            lines.append('  '.join('-' * width for width in widths))
+    return '\n'.join(lines)
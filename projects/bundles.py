@@ -0,0 +1,172 @@
+import os
+import re
+import zipfile
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from .downloads import locate
+from .models import ProjectSubmission
+from .submissions import DOCUMENT_FIELDS
+
+
+BUNDLE_BLOCK_SIZE = 256 * 1024
+
+# Reads in flight ahead of the archive writer, and the threads doing them;
+# together they bound the memory a bundle holds to about 2 MB
+READ_AHEAD_BLOCKS = 8
+READ_AHEAD_THREADS = 3
+
+# Formats that are compressed already: deflating them again costs CPU for
+# nothing, so they are stored as they are
+STORED_EXTENSIONS = {
+    '.pdf', '.pptx', '.ppsx', '.docx', '.xlsx', '.odp', '.odt', '.key',
+    '.zip', '.gz', '.7z', '.rar', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.mp4',
+}
+
+BundleEntry = namedtuple('BundleEntry', ['arcname', 'path', 'size', 'mtime'])
+
+UNSAFE_NAME = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+def _folder(name):
+    return UNSAFE_NAME.sub('_', name).strip(' .') or 'group'
+
+
+def bundle_entries(groups):
+    """List the submitted documents of ``groups`` as archive entries.
+
+    Each group gets a folder named after it (with the id added when two
+    groups share a name) holding its documents as ``<type><ext>``. Files
+    missing from storage are left out.
+    """
+    submissions = (
+        ProjectSubmission.objects.filter(group__in=groups)
+        .select_related('group').only('group__name', *DOCUMENT_FIELDS.values())
+        .order_by('group__name', 'group_id')
+    )
+    documents = []
+    folders = set()
+    for submission in submissions:
+        folder = _folder(submission.group.name)
+        if folder in folders:
+            folder = f'{folder} ({submission.group_id})'
+        folders.add(folder)
+        for doc_type, field_name in DOCUMENT_FIELDS.items():
+            field = getattr(submission, field_name)
+            if field:
+                documents.append((folder, doc_type, field))
+
+    # One digest lookup per storage rather than one per file
+    storages = {id(field.storage): field.storage for _, _, field in documents}
+    digests = {}
+    for key, storage in storages.items():
+        lookup = getattr(storage, 'digests', None)
+        names = [field.name for _, _, field in documents if field.storage is storage]
+        digests[key] = lookup(names) if lookup else None
+
+    entries = []
+    for folder, doc_type, field in documents:
+        _, path, _ = locate(field.storage, field.name, digests[id(field.storage)])
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        extension = os.path.splitext(field.name)[1].lower()
+        entries.append(BundleEntry(f'{folder}/{doc_type}{extension}', path, stat.st_size, stat.st_mtime))
+    return entries
+
+
+def _read_block(path, offset):
+    with open(path, 'rb') as source:
+        source.seek(offset)
+        return source.read(BUNDLE_BLOCK_SIZE)
+
+
+def _read_ahead(entries, pool):
+    """Yield ``(entry, block)`` in archive order while the pool reads ahead.
+
+    Up to ``READ_AHEAD_BLOCKS`` reads, possibly spanning several files, are
+    in flight at once, so the disk is busy while the writer compresses and
+    the client drains. Empty files yield a single ``None`` block.
+    """
+    reads = (
+        (entry, offset) for entry in entries
+        for offset in (range(0, entry.size, BUNDLE_BLOCK_SIZE) if entry.size else [None])
+    )
+    pending = deque()
+    try:
+        for entry, offset in reads:
+            pending.append((entry, None if offset is None else pool.submit(_read_block, entry.path, offset)))
+            if len(pending) >= READ_AHEAD_BLOCKS:
+                entry, future = pending.popleft()
+                yield entry, future and future.result()
+        while pending:
+            entry, future = pending.popleft()
+            yield entry, future and future.result()
+    finally:
+        for _, future in pending:
+            if future:
+                future.cancel()
+
+
+class _Sink:
+    """A write-only stream that collects what ``ZipFile`` writes until drained.
+
+    It has no ``seek``, so ``ZipFile`` writes sizes and checksums after
+    each member's data instead of going back to patch the header.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.buffered = 0
+        self.offset = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.buffered += len(data)
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        self.buffered = 0
+        return data
+
+
+def _member(entry):
+    info = zipfile.ZipInfo(entry.arcname, datetime.fromtimestamp(entry.mtime).timetuple()[:6])
+    extension = os.path.splitext(entry.arcname)[1]
+    info.compress_type = zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+    info.file_size = entry.size
+    return info
+
+
+def iter_bundle(entries):
+    """Stream a ZIP of ``entries`` without staging it on disk or in memory."""
+    sink = _Sink()
+    with ThreadPoolExecutor(max_workers=READ_AHEAD_THREADS) as pool:
+        with zipfile.ZipFile(sink, 'w') as archive:
+            current = target = None
+            try:
+                for entry, block in _read_ahead(entries, pool):
+                    if entry is not current:
+                        if target:
+                            target.close()
+                        current = entry
+                        target = archive.open(_member(entry), 'w')
+                    if block:
+                        target.write(block)
+                    if sink.buffered >= BUNDLE_BLOCK_SIZE:
+                        yield sink.drain()
+            finally:
+                if target:
+                    target.close()
+    yield sink.drain()
@@ -0,0 +1,169 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+
+READ_BLOCK_SIZE = 64 * 1024
+
+BYTE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def locate(storage, name, digests=None):
+    """Return ``(relative path, absolute path, sha256)`` for a stored name.
+
+    ``sha256`` is None for storages (or legacy files) without a content hash.
+    ``digests`` is a ``{name: sha256}`` map already fetched for many names.
+    """
+    digest = getattr(storage, 'digest', None)
+    if digests is not None:
+        sha256 = digests.get(name)
+    else:
+        sha256 = digest(name) if digest else None
+    relative = storage.blob_name(sha256) if sha256 else name
+    return relative, safe_join(storage.location, relative), sha256
+
+
+def parse_range(header, size):
+    """Return ``(start, end)`` for a single ``Range: bytes=`` header.
+
+    Returns None when the header is absent or not a single byte range, in
+    which case the whole file is sent, and raises ValueError when the range
+    cannot be satisfied.
+    """
+    match = BYTE_RANGE.match(header or '')
+    if not match or not any(match.groups()):
+        return None
+    if size == 0:
+        # An empty file has no bytes to select, not even a suffix
+        raise ValueError('empty file')
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError('empty suffix range')
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError('range not satisfiable')
+    return start, end
+
+
+def _range_matches(request, etag, last_modified):
+    """Apply ``If-Range``: a stale validator means the client gets the whole file."""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _read_range(path, start, end):
+    with open(path, 'rb') as source:
+        source.seek(start)
+        remaining = end - start + 1
+        while remaining:
+            block = source.read(min(READ_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+async def _aread_range(path, start, end):
+    """``_read_range`` for ASGI: each block is read on a worker thread.
+
+    The event loop only waits on the slow client between blocks, so a
+    transfer holds one open file and one block in memory but no thread.
+    """
+    source = await sync_to_async(open, thread_sensitive=False)(path, 'rb')
+    try:
+        await sync_to_async(source.seek, thread_sensitive=False)(start)
+        remaining = end - start + 1
+        while remaining:
+            block = await sync_to_async(source.read, thread_sensitive=False)(min(READ_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+    finally:
+        await sync_to_async(source.close, thread_sensitive=False)()
+
+
+def serve_file(request, storage, name, filename=None, as_attachment=True, asynchronous=False):
+    """Send a stored file once the caller has checked permissions.
+
+    With ``SENDFILE_BACKEND = 'nginx'`` or ``'xsendfile'`` the response only
+    names the file and the front-end server streams it (handling ranges
+    itself), so no worker is held for the transfer. In ``'django'`` mode the
+    file is streamed here with support for ``Range``, ``If-Range``,
+    ``If-None-Match`` and ``If-Modified-Since``; with ``asynchronous`` the
+    body is an async iterator for the ASGI handler to drive.
+    """
+    relative, path, sha256 = locate(storage, name)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404('File not found')
+
+    etag = f'"{sha256}"' if sha256 else f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = int(stat.st_mtime)
+    filename = filename or os.path.basename(name)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        backend = settings.SENDFILE_BACKEND
+        if backend == 'nginx':
+            response = HttpResponse()
+            response['X-Accel-Redirect'] = settings.SENDFILE_URL_PREFIX + quote(relative)
+        elif backend == 'xsendfile':
+            response = HttpResponse()
+            response['X-Sendfile'] = path
+        else:
+            response = _django_response(request, path, stat.st_size, etag, last_modified, asynchronous)
+
+        if response.status_code != 416:
+            content_type, encoding = mimetypes.guess_type(filename)
+            response['Content-Type'] = content_type if content_type and not encoding else 'application/octet-stream'
+            disposition = 'attachment' if as_attachment else 'inline'
+            response['Content-Disposition'] = f"{disposition}; filename*=UTF-8''{quote(filename)}"
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _django_response(request, path, size, etag, last_modified, asynchronous=False):
+    byte_range = None
+    if _range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range is None and not asynchronous:
+        response = FileResponse(open(path, 'rb'))
+    elif byte_range is None:
+        response = StreamingHttpResponse(_aread_range(path, 0, size - 1))
+        response['Content-Length'] = str(size)
+    else:
+        start, end = byte_range
+        read_range = _aread_range if asynchronous else _read_range
+        response = StreamingHttpResponse(read_range(path, start, end), status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,80 @@
+from django.db import IntegrityError, transaction
+
+from .models import MAX_GROUP_SIZE, ROLES, GroupMember
+
+
+class EnrollmentError(Exception):
+    pass
+
+
+def _free_roles(group):
+    taken = set(GroupMember.objects.filter(group=group).values_list('role', flat=True))
+    return [role for role in ROLES if role != 'lead' and role not in taken]
+
+
+def _explain(group, student, role):
+    """Work out which constraint a failed insert ran into."""
+    if GroupMember.objects.filter(student=student).exists():
+        return 'This student is already in a group.'
+    if role is not None and GroupMember.objects.filter(group=group, role=role).exists():
+        return 'That role is already taken in this group.'
+    return 'This group is already full.'
+
+
+def enroll(group, student, role=None):
+    """Add ``student`` to ``group`` and return the new ``GroupMember``.
+
+    Correctness rests on the database constraints (one group per student,
+    each role once per group) rather than on checking first: the insert is
+    simply attempted and a constraint violation is turned into an
+    ``EnrollmentError``. Two students racing for the last place, or one
+    student clicking twice, therefore cannot both succeed, and the common
+    case costs a single INSERT. With ``role=None`` the first free member
+    role is taken, trying the next one if another request got there first.
+    """
+    if student.section != group.section:
+        raise EnrollmentError(f'Only students from section {group.section} can join this group.')
+
+    attempts = 1 if role is not None else MAX_GROUP_SIZE
+    for _ in range(attempts):
+        chosen = role
+        if chosen is None:
+            free = _free_roles(group)
+            if not free:
+                raise EnrollmentError('This group is already full.')
+            chosen = free[0]
+        try:
+            with transaction.atomic():
+                member = GroupMember.objects.create(group=group, student=student, role=chosen)
+        except IntegrityError:
+            reason = _explain(group, student, role)
+            if role is None and reason == 'This group is already full.':
+                # Another request took the role between the read and the insert
+                continue
+            raise EnrollmentError(reason)
+        return member
+    raise EnrollmentError('This group is already full.')
+
+
+def create_group(group, lead):
+    """Save a new ``group`` with ``lead`` as its team lead, or neither.
+
+    Both rows go in one transaction, so a student who joins another group
+    at the same moment is not left leading an empty one.
+    """
+    group.section = lead.section
+    try:
+        with transaction.atomic():
+            group.save()
+            enroll(group, lead, role='lead')
+    except EnrollmentError:
+        group.pk = None
+        raise
+    return group
+
+
+def withdraw(member):
+    """Remove a member from their group; the team lead cannot be removed."""
+    if member.role == 'lead':
+        raise EnrollmentError('Cannot remove the team lead from the group.')
+    member.delete()
@@ -0,0 +1,74 @@
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from accounts.models import StudentProfile, TeacherProfile
+from .models import DataVersion, ProjectGroup
+
+
+FACET_CACHE_TIMEOUT = 60 * 60
+
+Facet = namedtuple('Facet', ['value', 'count'])
+Mentor = namedtuple('Mentor', ['pk', 'full_name', 'department', 'group_count'])
+
+
+def _cached(name, version_keys, build):
+    """Return ``build()`` cached under the current versions of ``version_keys``.
+
+    A write bumps a version, which changes the key; stale entries are
+    never read again and simply expire.
+    """
+    versions = DataVersion.current_many(*version_keys)
+    cache_key = 'facets:{}:{}'.format(name, ':'.join(str(version) for version in versions.values()))
+    value = cache.get(cache_key)
+    if value is None:
+        value = build()
+        cache.set(cache_key, value, FACET_CACHE_TIMEOUT)
+    return value
+
+
+def _counts(queryset, field):
+    rows = queryset.order_by(field).values_list(field).annotate(count=Count('pk'))
+    return [Facet(value, count) for value, count in rows]
+
+
+def _build_student_facets():
+    students = StudentProfile.objects.all()
+    sections = _counts(students, 'section')
+    return {
+        'sections': sections,
+        'branches': _counts(students, 'branch'),
+        'total': sum(facet.count for facet in sections),
+    }
+
+
+def _build_group_facets():
+    groups = ProjectGroup.objects.all()
+    status = groups.aggregate(
+        approved=Count('pk', filter=Q(is_approved=True)),
+        pending=Count('pk', filter=Q(is_approved=False)),
+    )
+    mentors = TeacherProfile.objects.order_by('full_name', 'user_id').annotate(
+        group_count=Count('projectgroup')
+    ).values_list('user_id', 'full_name', 'department', 'group_count')
+    return {
+        'sections': _counts(groups, 'section'),
+        'status': status,
+        'mentors': [Mentor(*row) for row in mentors],
+        'total': status['approved'] + status['pending'],
+    }
+
+
+def student_facets():
+    """Sections and branches with student counts: ``{'sections': [Facet], 'branches': [Facet], 'total': n}``."""
+    return _cached('students', [DataVersion.STUDENTS], _build_student_facets)
+
+
+def group_facets():
+    """Sections, approval status and mentors with group counts.
+
+    Returns ``{'sections': [Facet], 'status': {'approved': n, 'pending': n},
+    'mentors': [Mentor], 'total': n}``.
+    """
+    return _cached('groups', [DataVersion.GROUPS, DataVersion.TEACHERS], _build_group_facets)
@@ -0,0 +1,158 @@
+from collections import Counter, defaultdict, deque
+
+from django.db import transaction
+
+from accounts.models import StudentProfile
+from .availability import bump_sections
+from .models import MAX_GROUP_SIZE, ROLES, DataVersion, GroupMember, ProjectGroup
+from .principal import invalidate_principal
+from .rollups import schedule_refresh
+
+
+class FormationPlan:
+    def __init__(self, section):
+        self.section = section
+        # [(existing group id, [(student id, branch), ...]), ...]
+        self.fills = []
+        # [[(student id, branch), ...], ...], one list per new group
+        self.new_groups = []
+
+    @property
+    def students_placed(self):
+        return sum(len(added) for _, added in self.fills) + sum(len(group) for group in self.new_groups)
+
+
+def _take_balanced(pools, present, count):
+    """Take ``count`` students, each time from the branch the group has least of.
+
+    Ties go to the branch with the most students still waiting, so the big
+    branches are spread over as many groups as possible.
+    """
+    taken = []
+    present = Counter(present)
+    for _ in range(count):
+        candidates = [branch for branch, pool in pools.items() if pool]
+        if not candidates:
+            break
+        branch = min(candidates, key=lambda name: (present[name], -len(pools[name]), name))
+        taken.append(pools[branch].popleft())
+        present[branch] += 1
+    return taken
+
+
+def plan_section(section, balance_branches=True, fill_partial=True):
+    """Plan groups for every student in ``section`` who is not in one.
+
+    With ``fill_partial``, unapproved groups with free places are topped up
+    first. The rest are split into ``ceil(n / MAX_GROUP_SIZE)`` groups whose
+    sizes differ by at most one, so nobody ends up alone when a few more
+    students would do. With ``balance_branches`` students are dealt out
+    round-robin in branch order, which spreads each branch evenly over the
+    groups; without it, groups are cut from the list in branch order so
+    classmates stay together.
+    """
+    plan = FormationPlan(section)
+    pool = list(
+        StudentProfile.objects.filter(section=section)
+        .exclude(user_id__in=GroupMember.objects.values('student_id'))
+        .order_by('branch', 'full_name', 'user_id')
+        .values_list('user_id', 'branch')
+    )
+    if not pool:
+        return plan
+
+    if fill_partial:
+        pools = defaultdict(deque)
+        for student in pool:
+            pools[student[1]].append(student)
+
+        members = defaultdict(list)
+        rows = GroupMember.objects.filter(
+            group__section=section, group__is_approved=False
+        ).values_list('group_id', 'student__branch')
+        for group_id, branch in rows:
+            members[group_id].append(branch)
+        # Fullest groups first: they need the fewest students to finish
+        for group_id, branches in sorted(members.items(), key=lambda item: (-len(item[1]), item[0])):
+            free = MAX_GROUP_SIZE - len(branches)
+            if free <= 0:
+                continue
+            if balance_branches:
+                added = _take_balanced(pools, branches, free)
+            else:
+                added = []
+                for branch in sorted(pools):
+                    while pools[branch] and len(added) < free:
+                        added.append(pools[branch].popleft())
+            if added:
+                plan.fills.append((group_id, added))
+        pool = [student for branch in sorted(pools) for student in pools[branch]]
+
+    count = -(-len(pool) // MAX_GROUP_SIZE)
+    if balance_branches:
+        plan.new_groups = [pool[index::count] for index in range(count)]
+    else:
+        size, extra = divmod(len(pool), count) if count else (0, 0)
+        start = 0
+        for index in range(count):
+            end = start + size + (1 if index < extra else 0)
+            plan.new_groups.append(pool[start:end])
+            start = end
+    return plan
+
+
+def apply_plan(plan, name_prefix='Auto'):
+    """Write the planned members and groups in bulk; return the new groups."""
+    existing_roles = defaultdict(set)
+    for group_id, role in GroupMember.objects.filter(
+        group_id__in=[group_id for group_id, _ in plan.fills]
+    ).values_list('group_id', 'role'):
+        existing_roles[group_id].add(role)
+
+    taken = ProjectGroup.objects.filter(section=plan.section, name__startswith=f'{name_prefix} {plan.section}-').count()
+    groups = ProjectGroup.objects.bulk_create([
+        ProjectGroup(
+            name=f'{name_prefix} {plan.section}-{taken + index + 1:03d}',
+            section=plan.section,
+            project_title='To be decided',
+            problem_statement='',
+            project_explanation='',
+        )
+        for index in range(len(plan.new_groups))
+    ], batch_size=500)
+
+    members = []
+    for group_id, added in plan.fills:
+        free_roles = [role for role in ROLES if role not in existing_roles[group_id]]
+        members.extend(
+            GroupMember(group_id=group_id, student_id=student_id, role=role)
+            for (student_id, _), role in zip(added, free_roles)
+        )
+    for group, students in zip(groups, plan.new_groups):
+        members.extend(
+            GroupMember(group=group, student_id=student_id, role=role)
+            for (student_id, _), role in zip(students, ROLES)
+        )
+    GroupMember.objects.bulk_create(members, batch_size=1000)
+
+    # bulk_create skips the signals that clear cached principals, the
+    # section's available students, the group facets and API versions,
+    # that bump the filled groups' versions and refresh the progress rollup
+    invalidate_principal(*[member.student_id for member in members])
+    if plan.fills:
+        ProjectGroup.objects.filter(id__in=[group_id for group_id, _ in plan.fills]).touch()
+    bump_sections(plan.section)
+    DataVersion.bump(DataVersion.MEMBERS)
+    if groups:
+        DataVersion.bump(DataVersion.GROUPS)
+    schedule_refresh(*{member.group_id for member in members})
+    return groups
+
+
+def form_groups(section, balance_branches=True, fill_partial=True, dry_run=False):
+    """Plan and, unless ``dry_run``, write groups for one section in one transaction."""
+    with transaction.atomic():
+        plan = plan_section(section, balance_branches=balance_branches, fill_partial=fill_partial)
+        if not dry_run and plan.students_placed:
+            apply_plan(plan)
+    return plan
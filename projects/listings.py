@@ -0,0 +1,61 @@
+from django.db.models import Q
+
+from .search import search_groups, search_students
+
+
+# Keyset orderings for the teacher lists and the API; the last field is unique
+STUDENT_ORDERING = ['section', 'full_name', 'user_id']
+GROUP_ORDERING = ['section', 'name', 'id']
+
+STUDENT_FILTERS = ['section', 'branch', 'search']
+GROUP_FILTERS = ['section', 'status', 'mentor', 'search']
+
+
+def filter_students(students, filters):
+    """Apply the teacher student-list filters; return ``(queryset, ordering)``."""
+    if filters['section']:
+        students = students.filter(section=filters['section'])
+    if filters['branch']:
+        students = students.filter(branch=filters['branch'])
+    ordering = STUDENT_ORDERING
+    search_query = filters['search']
+    if search_query:
+        matches = search_students(students, search_query)
+        if matches is None:
+            students = students.filter(
+                Q(full_name__icontains=search_query) |
+                Q(abc_id__icontains=search_query) |
+                Q(email_id__icontains=search_query)
+            )
+        else:
+            # Best matches first
+            students = matches
+            ordering = ['search_rank', 'user_id']
+    return students, ordering
+
+
+def filter_groups(groups, filters):
+    """Apply the teacher group-list filters; return ``(queryset, ordering)``."""
+    if filters['section']:
+        groups = groups.filter(section=filters['section'])
+    if filters['status'] == 'approved':
+        groups = groups.filter(is_approved=True)
+    elif filters['status'] == 'pending':
+        groups = groups.filter(is_approved=False)
+    if filters['mentor'].isdigit():
+        groups = groups.filter(mentor_id=filters['mentor'])
+    ordering = GROUP_ORDERING
+    search_query = filters['search']
+    if search_query:
+        matches = search_groups(groups, search_query)
+        if matches is None:
+            groups = groups.filter(
+                Q(name__icontains=search_query) |
+                Q(project_title__icontains=search_query)
+            )
+        else:
+            # Best matches first
+            groups = matches
+            ordering = ['search_rank', 'id']
+    return groups, ordering
+
@@ -0,0 +1,407 @@
+import asyncio
+import io
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import close_old_connections, connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from accounts.models import User, StudentProfile
+from .benchmark import seed_dataset
+from .enrollment import EnrollmentError, enroll
+from .models import MAX_GROUP_SIZE, DataVersion, GroupMember, ProjectGroup, ProjectSubmission, UploadSession
+
+
+LOAD_TEST_SECTION = 'L'
+
+
+def seed_enrollment(groups, students):
+    """Create ``groups`` groups that have only a lead, and ``students`` students in no group."""
+    password = make_password(None)
+    users = User.objects.bulk_create([
+        User(username=f'load_student_{i}', password=password, is_student=True) for i in range(groups + students)
+    ])
+    profiles = StudentProfile.objects.bulk_create([
+        StudentProfile(
+            user=user, full_name=f'Load Student {i:05d}', section=LOAD_TEST_SECTION, passing_year=2026,
+            branch='CSE', degree='B.Tech', mobile_no='9000000000', email_id=f'load{i}@example.com',
+            abc_id=f'LOAD{i:07d}',
+        )
+        for i, user in enumerate(users)
+    ])
+    project_groups = ProjectGroup.objects.bulk_create([
+        ProjectGroup(name=f'Load Group {i:04d}', section=LOAD_TEST_SECTION, project_title=f'Project {i}',
+                     problem_statement='Problem statement', project_explanation='Project explanation')
+        for i in range(groups)
+    ])
+    GroupMember.objects.bulk_create([
+        GroupMember(group=group, student=lead, role='lead') for group, lead in zip(project_groups, profiles)
+    ])
+    return project_groups, profiles[groups:]
+
+
+def run_enrollment_load_test(enrollments=200, groups=40, students=160):
+    """Fire ``enrollments`` concurrent ``enroll()`` calls and check the result.
+
+    Request ``i`` asks for student ``i % students`` to join group
+    ``i % groups`` with any free role. With the defaults every group is
+    asked for more places than it has and some students are asked for
+    twice, so the constraints have to turn requests away. Returns a dict
+    of outcomes, timings and any invariant violations.
+    """
+    project_groups, pool = seed_enrollment(groups, students)
+    requests = [(project_groups[i % groups], pool[i % students]) for i in range(enrollments)]
+    start_line = threading.Barrier(enrollments)
+
+    def attempt(group, student):
+        start_line.wait()
+        started = time.perf_counter()
+        try:
+            enroll(group, student)
+            outcome = 'enrolled'
+        except EnrollmentError as exc:
+            outcome = str(exc)
+        except Exception as exc:
+            outcome = f'error: {exc.__class__.__name__}: {exc}'
+        finally:
+            connections.close_all()
+        return outcome, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=enrollments) as executor:
+        results = list(executor.map(lambda request: attempt(*request), requests))
+    elapsed = time.perf_counter() - started
+
+    outcomes = Counter(outcome for outcome, _ in results)
+    latencies = sorted(seconds for _, seconds in results)
+    return {
+        'enrollments': enrollments,
+        'outcomes': outcomes,
+        'seconds': elapsed,
+        'throughput': outcomes['enrolled'] / elapsed if elapsed else 0,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'violations': check_enrollment(outcomes['enrolled'], groups),
+    }
+
+
+def check_enrollment(enrolled, groups):
+    """Return a message for every way the data disagrees with the enrollment rules."""
+    violations = []
+    members = GroupMember.objects.filter(group__section=LOAD_TEST_SECTION)
+    added = members.exclude(role='lead').count()
+    if added != enrolled:
+        violations.append(f'{enrolled} enrollments reported but {added} members added')
+    repeated = members.values('student_id').annotate(count=Count('id')).filter(count__gt=1).count()
+    if repeated:
+        violations.append(f'{repeated} students are in more than one group')
+    overfull = members.values('group_id').annotate(count=Count('id')).filter(count__gt=MAX_GROUP_SIZE).count()
+    if overfull:
+        violations.append(f'{overfull} groups have more than {MAX_GROUP_SIZE} members')
+    places = groups * (MAX_GROUP_SIZE - 1)
+    if enrolled > places:
+        violations.append(f'{enrolled} enrollments for {places} places')
+    return violations
+
+
+def _read_request(index):
+    section = ('A', 'B', 'C')[index % 3]
+    groups = list(ProjectGroup.objects.with_summary().filter(section=section).order_by('name')[:20])
+    StudentProfile.objects.filter(section=section).order_by('full_name')[:20].count()
+    return groups
+
+
+def _write_request(index):
+    # Read then write in one transaction, as the views that change data do
+    with transaction.atomic():
+        group = ProjectGroup.objects.order_by('id')[index % 20:index % 20 + 1].first()
+        ProjectGroup.objects.filter(pk=group.pk).update(is_approved=not group.is_approved)
+        DataVersion.bump('loadtest')
+
+
+def run_database_benchmark(threads=8, requests=200, write_every=5):
+    """Simulate ``threads`` workers each serving ``requests`` requests.
+
+    Every ``write_every``-th request writes, the rest read. Connections are
+    handled as between real requests (``close_old_connections`` before and
+    after each one), so ``CONN_MAX_AGE`` and pooling apply. Returns
+    throughput, latencies, errors and how many connections were opened.
+    """
+    opened = []
+    counter = threading.Lock()
+
+    def count_connection(sender, connection, **kwargs):
+        with counter:
+            opened.append(connection.alias)
+
+    def worker(offset):
+        latencies, errors = [], Counter()
+        for number in range(requests):
+            index = offset * requests + number
+            close_old_connections()
+            started = time.perf_counter()
+            try:
+                if index % write_every == 0:
+                    _write_request(index)
+                else:
+                    _read_request(index)
+            except Exception as exc:
+                errors[f'{exc.__class__.__name__}: {exc}'] += 1
+            latencies.append(time.perf_counter() - started)
+            close_old_connections()
+        connections.close_all()
+        return latencies, errors
+
+    connection_created.connect(count_connection)
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(worker, range(threads)))
+        elapsed = time.perf_counter() - started
+    finally:
+        connection_created.disconnect(count_connection)
+
+    latencies = sorted(seconds for worker_latencies, _ in results for seconds in worker_latencies)
+    errors = sum((worker_errors for _, worker_errors in results), Counter())
+    total = threads * requests
+    return {
+        'requests': total,
+        'seconds': elapsed,
+        'throughput': (total - sum(errors.values())) / elapsed if elapsed else 0,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'connections': len(opened),
+        'errors': errors,
+    }
+
+
+# How much a simulated client sends or drains before it pauses for the
+# bandwidth to catch up: roughly one socket buffer
+SLOW_CLIENT_WINDOW = 64 * 1024
+
+# Any 32 characters will do as a CSRF secret, as long as cookie and header agree
+SLOW_CLIENT_CSRF = 'slowclientbenchmarkcsrf000000000'
+
+SlowRequest = namedtuple('SlowRequest', ['method', 'path', 'cookie', 'headers', 'body'])
+
+
+def _session_cookie(user):
+    client = Client()
+    client.force_login(user)
+    session = client.cookies[settings.SESSION_COOKIE_NAME].value
+    return f'{settings.SESSION_COOKIE_NAME}={session}; {settings.CSRF_COOKIE_NAME}={SLOW_CLIENT_CSRF}'
+
+
+def prepare_slow_clients(direction, clients, size):
+    """Seed the benchmark dataset and return one ``SlowRequest`` per client.
+
+    Downloaders all fetch the same ``size``-byte deck as a teacher.
+    Uploaders each send one ``size``-byte chunk to their own upload session
+    as the group lead; the sessions are declared twice as large so no
+    upload completes and the clients do not contend for the submission.
+    """
+    fixtures = seed_dataset()
+    if direction == 'download':
+        submission = ProjectSubmission.objects.get(pk=fixtures['submission_id'])
+        submission.ppt_file.save('deck.pdf', ContentFile(b'%PDF-1.4\n' + b'0' * (size - 9)))
+        path = reverse('download_submission', args=[submission.pk, 'ppt'])
+        cookie = _session_cookie(fixtures['users']['teacher'])
+        return [SlowRequest('GET', path, cookie, {}, b'') for _ in range(clients)]
+
+    lead = fixtures['users']['student']
+    cookie = _session_cookie(lead)
+    body = b'0' * size
+    headers = {
+        'Content-Range': f'bytes 0-{size - 1}/{size * 2}',
+        'Content-Type': 'application/octet-stream',
+        'X-CSRFToken': SLOW_CLIENT_CSRF,
+    }
+    sessions = UploadSession.objects.bulk_create([
+        UploadSession(group_id=fixtures['group_id'], doc_type='ppt', filename='slides.pdf',
+                      size=size * 2, created_by=lead)
+        for _ in range(clients)
+    ])
+    return [SlowRequest('PUT', reverse('upload_chunk', args=[session.pk]), cookie, headers, body)
+            for session in sessions]
+
+
+class _SlowStream:
+    """A ``wsgi.input`` that delivers ``body`` at ``bandwidth`` bytes per second."""
+
+    def __init__(self, body, bandwidth):
+        self.body = io.BytesIO(body)
+        self.bandwidth = bandwidth
+
+    def read(self, size=-1):
+        block = self.body.read(SLOW_CLIENT_WINDOW if size is None or size < 0 else min(size, SLOW_CLIENT_WINDOW))
+        time.sleep(len(block) / self.bandwidth)
+        return block
+
+    def readline(self, size=-1):
+        return self.body.readline(size)
+
+
+class _Transfers:
+    """Counts transfers in flight and remembers the peak."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def __exit__(self, *exc_info):
+        with self.lock:
+            self.active -= 1
+
+
+def _wsgi_client(handler, request, bandwidth, transfers):
+    environ = {
+        'REQUEST_METHOD': request.method,
+        'PATH_INFO': request.path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'testserver',
+        'HTTP_COOKIE': request.cookie,
+        'CONTENT_LENGTH': str(len(request.body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': _SlowStream(request.body, bandwidth),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in request.headers.items():
+        key = name.upper().replace('-', '_')
+        environ[key if key == 'CONTENT_TYPE' else f'HTTP_{key}'] = value
+
+    status = []
+    with transfers:
+        response = handler(environ, lambda line, headers, exc_info=None: status.append(line))
+        received = pending = 0
+        try:
+            for block in response:
+                received += len(block)
+                pending += len(block)
+                if pending >= SLOW_CLIENT_WINDOW:
+                    time.sleep(pending / bandwidth)
+                    pending = 0
+            time.sleep(pending / bandwidth)
+        finally:
+            close = getattr(response, 'close', None)
+            if close:
+                close()
+    return int(status[0].split()[0]), received
+
+
+async def _asgi_client(handler, request, bandwidth, transfers):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': request.method,
+        'scheme': 'http',
+        'path': request.path,
+        'raw_path': request.path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'cookie', request.cookie.encode()),
+                    (b'content-length', str(len(request.body)).encode())]
+        + [(name.lower().encode(), value.encode()) for name, value in request.headers.items()],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    body = io.BytesIO(request.body)
+    sent_all = False
+    status = []
+    received = 0
+
+    async def receive():
+        nonlocal sent_all
+        if sent_all:
+            # Stay connected until the handler is done with us
+            await asyncio.Future()
+        block = body.read(SLOW_CLIENT_WINDOW)
+        await asyncio.sleep(len(block) / bandwidth)
+        sent_all = body.tell() == len(request.body)
+        return {'type': 'http.request', 'body': block, 'more_body': not sent_all}
+
+    async def send(message):
+        nonlocal received
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+        elif message['type'] == 'http.response.body':
+            received += len(message.get('body', b''))
+            await asyncio.sleep(len(message.get('body', b'')) / bandwidth)
+
+    with transfers:
+        await handler(scope, receive, send)
+    return status[0], received
+
+
+def run_slow_client_benchmark(server, requests, bandwidth, workers=4):
+    """Serve ``requests`` from clients limited to ``bandwidth`` bytes per second.
+
+    ``server='wsgi'`` models a threaded WSGI server with ``workers``
+    threads: every transfer occupies a thread until the client has sent or
+    drained its last byte, so the rest queue. ``server='asgi'`` runs every
+    client concurrently on one event loop through Django's ASGI handler.
+    All clients arrive at once; returns how long each took to be served,
+    the peak number of transfers in flight and the response statuses.
+    """
+    transfers = _Transfers()
+    started = time.perf_counter()
+
+    def timed(client):
+        status, received = client()
+        return status, received, time.perf_counter() - started
+
+    if server == 'wsgi':
+        handler = WSGIHandler()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda request: timed(lambda: _wsgi_client(handler, request, bandwidth, transfers)), requests
+            ))
+    else:
+        handler = ASGIHandler()
+
+        async def timed_async(request):
+            status, received = await _asgi_client(handler, request, bandwidth, transfers)
+            return status, received, time.perf_counter() - started
+
+        async def serve():
+            return await asyncio.gather(*(timed_async(request) for request in requests))
+
+        results = asyncio.run(serve())
+    elapsed = time.perf_counter() - started
+    connections.close_all()
+
+    finished = sorted(seconds for _, _, seconds in results)
+    return {
+        'clients': len(requests),
+        'seconds': elapsed,
+        'p50_s': statistics.median(finished),
+        'p95_s': finished[int(len(finished) * 0.95) - 1] if len(finished) > 1 else finished[0],
+        'peak_transfers': transfers.peak,
+        'bytes': sum(received for _, received, _ in results) + sum(len(request.body) for request in requests),
+        'statuses': Counter(status for status, _, _ in results),
+    }
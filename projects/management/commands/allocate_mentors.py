@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from projects.allocation import apply_allocation, plan_allocation
+from projects.models import ProjectGroup
+
+
+class Command(BaseCommand):
+    help = 'Assign mentors to every group without one, balancing load and matching departments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Print the assignments and load changes without saving them')
+        parser.add_argument('--section', help='Only allocate groups in this section')
+
+    def handle(self, *args, **options):
+        groups = ProjectGroup.objects.all()
+        if options['section']:
+            groups = groups.filter(section=options['section'])
+
+        start = time.perf_counter()
+        plan = plan_allocation(groups)
+        elapsed = time.perf_counter() - start
+
+        for assignment in plan.assignments:
+            marker = '' if assignment.affinity else '  (other department)'
+            self.stdout.write(
+                f'+ {assignment.group_name} [{assignment.branch or "no members"}]: '
+                f'none -> {assignment.teacher.full_name} [{assignment.teacher.department}]{marker}'
+            )
+        for group_id, name, branch in plan.unassigned:
+            self.stdout.write(self.style.WARNING(f'! {name} [{branch or "no members"}]: no teacher has capacity left'))
+
+        before, after = plan.loads_before, plan.loads_after
+        self.stdout.write('\nLoad per teacher (before -> after / capacity):')
+        for teacher in plan.teachers:
+            self.stdout.write(f'  {teacher.full_name:<30} {before.get(teacher.pk, 0):>4} -> '
+                              f'{after.get(teacher.pk, 0):>4} / {teacher.mentor_capacity}')
+
+        matched = sum(1 for assignment in plan.assignments if assignment.affinity)
+        summary = (f'{len(plan.assignments)} group(s) planned in {elapsed:.2f}s, {matched} within the '
+                   f'department, {len(plan.unassigned)} left without capacity')
+        if options['dry_run']:
+            self.stdout.write(f'\nDry run: {summary}')
+            return
+
+        assigned = apply_allocation(plan)
+        self.stdout.write(self.style.SUCCESS(f'\nAssigned {assigned} group(s); {summary}'))
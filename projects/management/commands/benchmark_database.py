@@ -0,0 +1,101 @@
+import copy
+import os
+import tempfile
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from projects.benchmark import benchmark_environment, seed_dataset
+from projects.loadtest import run_database_benchmark
+
+
+def baseline_profile(settings_dict):
+    """The same database with Django's defaults: a connection per request, no tuning."""
+    settings_dict['CONN_MAX_AGE'] = 0
+    settings_dict['CONN_HEALTH_CHECKS'] = False
+    settings_dict['OPTIONS'] = {
+        key: value for key, value in settings_dict['OPTIONS'].items()
+        if key not in ('init_command', 'transaction_mode', 'timeout', 'pool')
+    }
+
+
+PROFILES = {
+    'baseline': baseline_profile,
+    'configured': lambda settings_dict: None,
+}
+
+
+def reset_connection():
+    # A connection reads its options when it is created, so drop this
+    # thread's one and let the next query create it afresh
+    connections.close_all()
+    try:
+        del connections['default']
+    except AttributeError:
+        pass
+
+
+@contextmanager
+def database_profile(name):
+    """Apply a profile to the default database and run on a scratch copy of it."""
+    settings_dict = connections.settings['default']
+    original = copy.deepcopy(settings_dict)
+    scratch = None
+    PROFILES[name](settings_dict)
+    if settings_dict['ENGINE'].endswith('sqlite3'):
+        # Threads cannot share the in-memory test database
+        scratch = tempfile.mkdtemp(prefix='apms-dbbench-')
+        settings_dict['TEST'] = dict(settings_dict.get('TEST', {}), NAME=os.path.join(scratch, f'{name}.sqlite3'))
+    reset_connection()
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        close_pool = getattr(connection, 'close_pool', None)
+        if close_pool:
+            close_pool()
+        settings_dict.clear()
+        settings_dict.update(original)
+        reset_connection()
+        if scratch:
+            for filename in os.listdir(scratch):
+                os.remove(os.path.join(scratch, filename))
+            os.rmdir(scratch)
+
+
+class Command(BaseCommand):
+    help = 'Compare the configured database profile with untuned defaults under concurrent load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent workers')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per worker')
+        parser.add_argument('--write-every', type=int, default=5, help='Every n-th request writes')
+        parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                            help='Profile to run (repeatable; default both)')
+
+    def handle(self, *args, **options):
+        engine = connections.settings['default']['ENGINE'].rsplit('.', 1)[-1]
+        self.stdout.write(
+            f"Engine: {engine}; {options['threads']} threads x {options['requests']} requests, "
+            f"every {options['write_every']}th writes"
+        )
+
+        setup_test_environment()
+        try:
+            for name in options['profile'] or ['baseline', 'configured']:
+                with database_profile(name), benchmark_environment():
+                    seed_dataset()
+                    result = run_database_benchmark(options['threads'], options['requests'], options['write_every'])
+                self.stdout.write(
+                    f"{name:<10}  {result['throughput']:8.1f} req/s  "
+                    f"p50 {result['p50_ms']:7.2f} ms  p95 {result['p95_ms']:7.2f} ms  "
+                    f"{result['connections']:5d} connections  {sum(result['errors'].values()):4d} errors"
+                )
+                for error, count in result['errors'].most_common(3):
+                    self.stdout.write(f'            {count:5d}  {error}')
+        finally:
+            teardown_test_environment()
@@ -0,0 +1,46 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from projects.benchmark import benchmark_environment
+from projects.loadtest import prepare_slow_clients, run_slow_client_benchmark
+from projects.management.commands.benchmark_database import database_profile
+
+
+class Command(BaseCommand):
+    help = 'Compare how many slow downloads or uploads the WSGI and ASGI paths serve at once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--direction', choices=['download', 'upload'], action='append',
+                            help='Transfer to measure (repeatable; default both)')
+        parser.add_argument('--clients', type=int, default=32, help='Concurrent slow clients')
+        parser.add_argument('--workers', type=int, default=4, help='Threads of the WSGI server')
+        parser.add_argument('--size', type=int, default=1024, help='Transfer size in KiB')
+        parser.add_argument('--bandwidth', type=int, default=512, help='Client bandwidth in KiB/s')
+
+    def handle(self, *args, **options):
+        size, bandwidth = options['size'] * 1024, options['bandwidth'] * 1024
+        self.stdout.write(
+            f"{options['clients']} clients at {options['bandwidth']} KiB/s moving {options['size']} KiB each; "
+            f"WSGI with {options['workers']} threads"
+        )
+
+        setup_test_environment()
+        try:
+            for direction in options['direction'] or ['download', 'upload']:
+                for server in ('wsgi', 'asgi'):
+                    with database_profile('configured'), benchmark_environment() as root, \
+                            override_settings(UPLOAD_TEMP_DIR=os.path.join(root, 'uploads')):
+                        requests = prepare_slow_clients(direction, options['clients'], size)
+                        result = run_slow_client_benchmark(server, requests, bandwidth, options['workers'])
+                    statuses = ', '.join(f'{count}x {status}' for status, count in sorted(result['statuses'].items()))
+                    self.stdout.write(
+                        f"{direction:<8}  {server}  {result['seconds']:6.2f}s  "
+                        f"served p50 {result['p50_s']:6.2f}s  p95 {result['p95_s']:6.2f}s  "
+                        f"{result['peak_transfers']:3d} in flight  "
+                        f"{result['bytes'] / result['seconds'] / 1024:8.0f} KiB/s  [{statuses}]"
+                    )
+        finally:
+            teardown_test_environment()
@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from projects.benchmark import (
+    BUDGET_PATH, DEFAULT_DATASET, benchmark_environment, check_budget, format_report,
+    load_budget, merge_budget, run_benchmark, seed_dataset, server_errors, write_budget,
+)
+
+
+class Command(BaseCommand):
+    help = 'Measure query counts and wall time for every URL against a synthetic dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, help='Number of students to seed')
+        parser.add_argument('--groups', type=int, help='Number of groups to seed')
+        parser.add_argument('--submissions', type=int, help='Number of groups with a submission')
+        parser.add_argument('--budget', default=BUDGET_PATH, help='Path of the budget file')
+        parser.add_argument('--check', action='store_true', help='Fail if any view exceeds its budget')
+        parser.add_argument('--check-time', action='store_true', help='Also compare wall time with the budget')
+        parser.add_argument('--update-budget', action='store_true',
+                            help='Record the results in the budget; query budgets only come down')
+        parser.add_argument('--allow-increase', nargs='+', default=[], metavar='VIEW',
+                            help='Views (e.g. remove_member:student) whose query budget may go up with --update-budget')
+
+    def handle(self, *args, **options):
+        budget = None
+        try:
+            budget = load_budget(options['budget'])
+        except FileNotFoundError:
+            if options['check']:
+                raise CommandError(f"Budget file {options['budget']} not found")
+
+        # Seed the same dataset the budget was recorded with unless told otherwise
+        dataset = dict(budget['dataset'] if budget else DEFAULT_DATASET)
+        for key in dataset:
+            if options[key] is not None:
+                dataset[key] = options[key]
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with benchmark_environment():
+                fixtures = seed_dataset(**dataset)
+                results = run_benchmark(fixtures)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(f"Dataset: {', '.join(f'{key}={value}' for key, value in dataset.items())}")
+        self.stdout.write(format_report(results, budget))
+
+        if options['update_budget']:
+            errors = server_errors(results)
+            if errors:
+                raise CommandError('Views failing with a server error cannot be budgeted:\n' + '\n'.join(errors))
+            # A budget recorded on another dataset is not comparable
+            previous = budget if budget and budget['dataset'] == dataset else None
+            views, refused = merge_budget(results, previous, options['allow_increase'])
+            if refused:
+                raise CommandError(
+                    'Views got more expensive; fix them, or rerun with --allow-increase VIEW ... '
+                    'and explain why in the commit:\n' + '\n'.join(refused)
+                )
+            write_budget(views, dataset, options['budget'])
+            self.stdout.write(self.style.SUCCESS(f"Budget written to {options['budget']}"))
+
+        if options['check']:
+            failures = check_budget(results, budget, check_time=options['check_time'])
+            if failures:
+                raise CommandError('Benchmark regressions:\n' + '\n'.join(failures))
+            self.stdout.write(self.style.SUCCESS('All views within budget'))
@@ -0,0 +1,53 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import StudentProfile
+from projects.models import ProjectSubmission, StoredBlob
+from projects.storage import DedupFileSystemStorage
+
+
+# (model, file fields) whose stored names are moved into the blob store
+FILE_FIELDS = [
+    (ProjectSubmission, ('ppt_file', 'synopsis_report', 'srs_report')),
+    (StudentProfile, ('id_card_photo',)),
+]
+
+
+class Command(BaseCommand):
+    help = 'Convert existing uploaded files to content-addressed, deduplicated storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count the files that would be converted')
+        parser.add_argument('--keep-originals', action='store_true',
+                            help='Leave the original files in place after copying them')
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, DedupFileSystemStorage):
+            raise CommandError('The default storage is not DedupFileSystemStorage; check STORAGES in settings.')
+
+        names = set()
+        for model, fields in FILE_FIELDS:
+            for field in fields:
+                names.update(model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                             .values_list(field, flat=True))
+
+        if options['dry_run']:
+            pending = [name for name in sorted(names) if default_storage.digest(name) is None]
+            self.stdout.write(f'{len(pending)} of {len(names)} file(s) would be converted')
+            return
+
+        converted = missing = 0
+        for name in sorted(names):
+            if default_storage.digest(name) is not None:
+                continue
+            if default_storage.adopt(name, keep_original=options['keep_originals']) is None:
+                missing += 1
+                self.stderr.write(f'Missing on disk: {name}')
+            else:
+                converted += 1
+
+        blobs = StoredBlob.objects.count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Converted {converted} file(s), {missing} missing; {blobs} distinct blob(s) stored'
+        ))
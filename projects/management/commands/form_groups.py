@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import StudentProfile
+from projects.formation import form_groups
+
+
+class Command(BaseCommand):
+    help = 'Put every student who is not in a group into one, section by section'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--section', action='append', dest='sections',
+                            help='Section to process (repeatable; default: every section)')
+        parser.add_argument('--no-branch-balance', action='store_true',
+                            help='Keep students of a branch together instead of spreading branches evenly')
+        parser.add_argument('--no-fill-partial', action='store_true',
+                            help='Leave existing groups with free places alone')
+        parser.add_argument('--dry-run', action='store_true', help='Report the plan without writing it')
+
+    def handle(self, *args, **options):
+        sections = options['sections'] or list(
+            StudentProfile.objects.order_by('section').values_list('section', flat=True).distinct()
+        )
+        if not sections:
+            raise CommandError('There are no students to group.')
+
+        for section in sections:
+            start = time.perf_counter()
+            plan = form_groups(
+                section,
+                balance_branches=not options['no_branch_balance'],
+                fill_partial=not options['no_fill_partial'],
+                dry_run=options['dry_run'],
+            )
+            elapsed = time.perf_counter() - start
+            sizes = sorted({len(group) for group in plan.new_groups})
+            self.stdout.write(
+                f'Section {section}: {plan.students_placed} student(s) placed, '
+                f'{len(plan.fills)} existing group(s) topped up, {len(plan.new_groups)} new group(s)'
+                f'{" of size " + "/".join(map(str, sizes)) if sizes else ""} in {elapsed:.2f}s'
+            )
+
+        if options['dry_run']:
+            self.stdout.write('Dry run: nothing was written')
+        else:
+            self.stdout.write(self.style.SUCCESS('Done'))
@@ -0,0 +1,47 @@
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from projects.loadtest import run_enrollment_load_test
+
+
+class Command(BaseCommand):
+    help = 'Run concurrent group enrollments against a scratch database and check nothing was double-booked'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--enrollments', type=int, default=200, help='Number of parallel enrollments')
+        parser.add_argument('--groups', type=int, default=40, help='Number of groups to enroll into')
+        parser.add_argument('--students', type=int, default=160, help='Number of distinct students asking to join')
+
+    def handle(self, *args, **options):
+        scratch = None
+        if connection.vendor == 'sqlite':
+            # Threads cannot share the in-memory test database
+            scratch = tempfile.mkdtemp(prefix='apms-loadtest-')
+            connection.settings_dict['TEST']['NAME'] = os.path.join(scratch, 'loadtest.sqlite3')
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            result = run_enrollment_load_test(options['enrollments'], options['groups'], options['students'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            if scratch:
+                os.rmdir(scratch)
+
+        self.stdout.write(f"{result['enrollments']} parallel enrollments in {result['seconds']:.2f}s")
+        for outcome, count in result['outcomes'].most_common():
+            self.stdout.write(f'  {count:5d}  {outcome}')
+        self.stdout.write(
+            f"Throughput: {result['throughput']:.1f} enrollments/s, "
+            f"latency p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms"
+        )
+
+        errors = [outcome for outcome in result['outcomes'] if outcome.startswith('error:')]
+        if result['violations'] or errors:
+            raise CommandError('Enrollment is not safe under load:\n' + '\n'.join(result['violations'] + errors))
+        self.stdout.write(self.style.SUCCESS('No duplicate or over-full memberships'))
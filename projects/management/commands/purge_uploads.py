@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from projects.uploads import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = 'Discard chunked uploads that were abandoned before they completed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, default=None,
+                            help='Age in seconds after which an unfinished upload is discarded')
+
+    def handle(self, *args, **options):
+        count = purge_stale_uploads(options['max_age'])
+        self.stdout.write(self.style.SUCCESS(f'Discarded {count} stale upload(s)'))
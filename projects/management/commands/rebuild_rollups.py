@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from projects.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the group progress rollups from the groups, members and submissions'
+
+    def handle(self, *args, **options):
+        groups = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Progress rollups rebuilt from {groups} groups'))
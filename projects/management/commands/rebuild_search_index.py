@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.search import rebuild_search_index, search_available
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for students and groups'
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError('The search index needs SQLite with FTS5; run "migrate" first.')
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from projects.report_jobs import claim_next_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Process queued report generation jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to sleep when the queue is empty')
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs(settings.REPORT_JOB_TIMEOUT)
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale job(s)')
+
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+                continue
+
+            self.stdout.write(f'Rendering {job}')
+            try:
+                run_job(job)
+            except Exception as exc:
+                self.stderr.write(self.style.ERROR(f'{job} failed: {exc}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{job} finished'))
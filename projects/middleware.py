@@ -0,0 +1,50 @@
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.utils.functional import SimpleLazyObject
+
+from .principal import load_principal
+
+
+async def aprincipal(request):
+    """Async counterpart of ``request.principal``, built from ``request.auser()``.
+
+    Async views should use this: ``login_required`` has already loaded the
+    user through ``auser()``, which ``request.user`` does not share.
+    """
+    if not hasattr(request, '_aprincipal'):
+        request._aprincipal = await sync_to_async(load_principal)(await request.auser())
+    return request._aprincipal
+
+
+class PrincipalMiddleware:
+    """Attach the user's ``Principal`` to the request as ``request.principal``.
+
+    It is resolved lazily, so requests that never check permissions do not
+    pay for it. Must run after ``AuthenticationMiddleware``.
+
+    The middleware is async-capable so async views are not pushed onto a
+    thread under ASGI; those views await ``request.aprincipal()`` instead.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.attach(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.attach(request)
+        return await self.get_response(request)
+
+    def attach(self, request):
+        request.principal = SimpleLazyObject(lambda: load_principal(request.user))
+        request.aprincipal = partial(aprincipal, request)
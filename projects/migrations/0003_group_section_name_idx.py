@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_student_section_name_idx'),
+        ('projects', '0002_report_jobs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectgroup',
+            index=models.Index(fields=['section', 'name', 'id'], name='group_section_name_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+from django.db import migrations
+
+
+STUDENT_SEARCH = [
+    "CREATE VIRTUAL TABLE projects_student_search USING fts5("
+    "full_name, abc_id, email_id, tokenize='unicode61', prefix='2 3')",
+
+    "CREATE TRIGGER projects_student_search_ai AFTER INSERT ON accounts_studentprofile BEGIN "
+    "INSERT INTO projects_student_search(rowid, full_name, abc_id, email_id) "
+    "VALUES (new.user_id, new.full_name, new.abc_id, new.email_id); END",
+
+    "CREATE TRIGGER projects_student_search_ad AFTER DELETE ON accounts_studentprofile BEGIN "
+    "DELETE FROM projects_student_search WHERE rowid = old.user_id; END",
+
+    "CREATE TRIGGER projects_student_search_au AFTER UPDATE OF user_id, full_name, abc_id, email_id "
+    "ON accounts_studentprofile BEGIN "
+    "DELETE FROM projects_student_search WHERE rowid = old.user_id; "
+    "INSERT INTO projects_student_search(rowid, full_name, abc_id, email_id) "
+    "VALUES (new.user_id, new.full_name, new.abc_id, new.email_id); END",
+
+    "INSERT INTO projects_student_search(rowid, full_name, abc_id, email_id) "
+    "SELECT user_id, full_name, abc_id, email_id FROM accounts_studentprofile",
+]
+
+GROUP_SEARCH = [
+    "CREATE VIRTUAL TABLE projects_group_search USING fts5("
+    "name, project_title, tokenize='unicode61', prefix='2 3')",
+
+    "CREATE TRIGGER projects_group_search_ai AFTER INSERT ON projects_projectgroup BEGIN "
+    "INSERT INTO projects_group_search(rowid, name, project_title) "
+    "VALUES (new.id, new.name, new.project_title); END",
+
+    "CREATE TRIGGER projects_group_search_ad AFTER DELETE ON projects_projectgroup BEGIN "
+    "DELETE FROM projects_group_search WHERE rowid = old.id; END",
+
+    "CREATE TRIGGER projects_group_search_au AFTER UPDATE OF id, name, project_title "
+    "ON projects_projectgroup BEGIN "
+    "DELETE FROM projects_group_search WHERE rowid = old.id; "
+    "INSERT INTO projects_group_search(rowid, name, project_title) "
+    "VALUES (new.id, new.name, new.project_title); END",
+
+    "INSERT INTO projects_group_search(rowid, name, project_title) "
+    "SELECT id, name, project_title FROM projects_projectgroup",
+]
+
+DROP = [
+    "DROP TRIGGER IF EXISTS projects_student_search_ai",
+    "DROP TRIGGER IF EXISTS projects_student_search_ad",
+    "DROP TRIGGER IF EXISTS projects_student_search_au",
+    "DROP TABLE IF EXISTS projects_student_search",
+    "DROP TRIGGER IF EXISTS projects_group_search_ai",
+    "DROP TRIGGER IF EXISTS projects_group_search_ad",
+    "DROP TRIGGER IF EXISTS projects_group_search_au",
+    "DROP TABLE IF EXISTS projects_group_search",
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        # FTS5 is SQLite only; other backends fall back to icontains search
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_student_section_name_idx'),
+        ('projects', '0003_group_section_name_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(STUDENT_SEARCH + GROUP_SEARCH), run(DROP)),
+    ]
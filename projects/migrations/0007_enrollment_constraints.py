@@ -0,0 +1,95 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:25
+
+from django.db import migrations, models
+
+
+ROLES = ['lead', 'member1', 'member2', 'member3']
+
+
+def resolve_duplicates(apps, schema_editor):
+    """Make existing memberships satisfy the new constraints.
+
+    A student in several groups keeps the membership in the group they
+    lead, otherwise the earliest one. Within a group the earliest lead
+    stays lead; a member whose role clashes with another (or is not a known
+    role) moves to a free role, or is removed when the group has none left.
+    A lead row is never removed: a student leading two groups, or a group
+    with more leads than places, stops the migration to be sorted out by
+    hand. Every change is printed.
+    """
+    GroupMember = apps.get_model('projects', 'GroupMember')
+    members = list(GroupMember.objects.order_by('id'))
+
+    by_student = {}
+    for member in members:
+        by_student.setdefault(member.student_id, []).append(member)
+    kept = []
+    removed = []
+    for student_id, rows in by_student.items():
+        leads = [member for member in rows if member.role == 'lead']
+        if len(leads) > 1:
+            raise RuntimeError(
+                f'Student {student_id} leads groups {", ".join(str(member.group_id) for member in leads)}. '
+                'Remove them from all but one before migrating.'
+            )
+        keep = leads[0] if leads else rows[0]
+        kept.append(keep)
+        removed += [(member, f'student is also in group {keep.group_id}') for member in rows if member is not keep]
+
+    # Leads first, so they keep the lead role; then by age
+    kept.sort(key=lambda member: (member.role != 'lead', member.id))
+    taken = {}
+    moved = []
+    for member in kept:
+        roles = taken.setdefault(member.group_id, set())
+        if member.role in ROLES and member.role not in roles:
+            roles.add(member.role)
+            continue
+        free = [role for role in ROLES[1:] if role not in roles]
+        if not free:
+            if member.role == 'lead':
+                raise RuntimeError(
+                    f'Group {member.group_id} has more leads than places. Remove one before migrating.'
+                )
+            removed.append((member, 'group is full'))
+            continue
+        moved.append((member, member.role, free[0]))
+        member.role = free[0]
+        roles.add(member.role)
+
+    for member, old_role, new_role in moved:
+        member.save(update_fields=['role'])
+        print(f'\n  Membership {member.id} (student {member.student_id}, group {member.group_id}): '
+              f'role {old_role!r} -> {new_role!r}', end='')
+    for member, reason in removed:
+        print(f'\n  Removed membership {member.id} (student {member.student_id}, group {member.group_id}, '
+              f'role {member.role!r}): {reason}', end='')
+        member.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_teacher_mentor_capacity'),
+        ('projects', '0006_dedup_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_duplicates, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='groupmember',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='groupmember',
+            constraint=models.UniqueConstraint(fields=('student',), name='groupmember_one_group_per_student', violation_error_message='This student is already in a group.'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupmember',
+            constraint=models.UniqueConstraint(fields=('group', 'role'), name='groupmember_unique_role', violation_error_message='That role is already taken in this group.'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupmember',
+            constraint=models.CheckConstraint(condition=models.Q(('role__in', ['lead', 'member1', 'member2', 'member3'])), name='groupmember_role_valid'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_enrollment_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupRollupState',
+            fields=[
+                ('group_id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('section', models.CharField(max_length=10)),
+                ('branch', models.CharField(blank=True, max_length=50)),
+                ('passing_year', models.IntegerField(default=0)),
+                ('counts', models.JSONField(default=dict)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProgressRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=10)),
+                ('branch', models.CharField(blank=True, max_length=50)),
+                ('passing_year', models.IntegerField(default=0)),
+                ('groups', models.PositiveIntegerField(default=0)),
+                ('approved', models.PositiveIntegerField(default=0)),
+                ('mentored', models.PositiveIntegerField(default=0)),
+                ('submitted', models.PositiveIntegerField(default=0)),
+                ('ppt', models.PositiveIntegerField(default=0)),
+                ('synopsis', models.PositiveIntegerField(default=0)),
+                ('srs', models.PositiveIntegerField(default=0)),
+                ('github', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('section', 'branch', 'passing_year'), name='rollup_bucket_unique')],
+            },
+        ),
+    ]
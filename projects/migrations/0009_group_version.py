@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:40
+
+from django.db import migrations, models
+
+
+# SQLite cannot add a column with a default in place, so the AddFields below
+# rebuild projects_projectgroup and the rebuild drops the search triggers
+# 0004_search_index put on it. They are put back afterwards (and, going
+# backwards, after the RemoveFields rebuild the table again).
+GROUP_SEARCH_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS projects_group_search_ai AFTER INSERT ON projects_projectgroup BEGIN "
+    "INSERT INTO projects_group_search(rowid, name, project_title) "
+    "VALUES (new.id, new.name, new.project_title); END",
+
+    "CREATE TRIGGER IF NOT EXISTS projects_group_search_ad AFTER DELETE ON projects_projectgroup BEGIN "
+    "DELETE FROM projects_group_search WHERE rowid = old.id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS projects_group_search_au AFTER UPDATE OF id, name, project_title "
+    "ON projects_projectgroup BEGIN "
+    "DELETE FROM projects_group_search WHERE rowid = old.id; "
+    "INSERT INTO projects_group_search(rowid, name, project_title) "
+    "VALUES (new.id, new.name, new.project_title); END",
+
+    # Groups written while the triggers were missing
+    "DELETE FROM projects_group_search",
+
+    "INSERT INTO projects_group_search(rowid, name, project_title) "
+    "SELECT id, name, project_title FROM projects_projectgroup",
+]
+
+
+def restore_search_triggers(apps, schema_editor):
+    # FTS5 is SQLite only; other backends have no index to keep up
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in GROUP_SEARCH_TRIGGERS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_progress_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='projectgroup',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='projectgroup',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:44
+
+import hashlib
+import os
+
+import django.db.models.deletion
+import projects.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Submissions read per query, and how often progress is reported
+BATCH_SIZE = 500
+
+
+DOCUMENT_FIELDS = {
+    'ppt': 'ppt_file',
+    'synopsis': 'synopsis_report',
+    'srs': 'srs_report',
+}
+
+
+def record_current_files(apps, schema_editor):
+    """Make each document already submitted version 1 of its history."""
+    from django.core.files.storage import default_storage
+
+    BlobReference = apps.get_model('projects', 'BlobReference')
+    ProjectGroup = apps.get_model('projects', 'ProjectGroup')
+    ProjectSubmission = apps.get_model('projects', 'ProjectSubmission')
+    SubmissionVersion = apps.get_model('projects', 'SubmissionVersion')
+
+    total = ProjectSubmission.objects.count()
+    submissions = ProjectSubmission.objects.order_by('id').iterator(chunk_size=BATCH_SIZE)
+    for done, submission in enumerate(submissions, 1):
+        pointers = {}
+        for doc_type, field_name in DOCUMENT_FIELDS.items():
+            name = getattr(submission, field_name).name
+            if not name or not default_storage.exists(name):
+                continue
+            sha256 = BlobReference.objects.filter(name=name).values_list('blob_id', flat=True).first()
+            if sha256 is None:
+                hasher = hashlib.sha256()
+                with default_storage.open(name, 'rb') as source:
+                    for chunk in iter(lambda: source.read(64 * 1024), b''):
+                        hasher.update(chunk)
+                sha256 = hasher.hexdigest()
+            version = SubmissionVersion.objects.create(
+                group_id=submission.group_id, doc_type=doc_type, number=1, file=name,
+                filename=os.path.basename(name), sha256=sha256, size=default_storage.size(name),
+            )
+            pointers[f'current_{doc_type}'] = version
+        if pointers:
+            ProjectGroup.objects.filter(pk=submission.group_id).update(**pointers)
+        if done % BATCH_SIZE == 0 or done == total:
+            print(f'\n  Recorded the documents of {done}/{total} submissions', end='', flush=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0009_group_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('doc_type', models.CharField(choices=[('ppt', 'Presentation'), ('synopsis', 'Synopsis Report'), ('srs', 'SRS Report')], max_length=10)),
+                ('number', models.PositiveIntegerField()),
+                ('file', models.FileField(max_length=255, upload_to=projects.models.version_upload_to)),
+                ('filename', models.CharField(max_length=255)),
+                ('sha256', models.CharField(max_length=64)),
+                ('size', models.PositiveBigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submission_versions', to='projects.projectgroup')),
+                ('submitted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='projectgroup',
+            name='current_ppt',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='projects.submissionversion'),
+        ),
+        migrations.AddField(
+            model_name='projectgroup',
+            name='current_srs',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='projects.submissionversion'),
+        ),
+        migrations.AddField(
+            model_name='projectgroup',
+            name='current_synopsis',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='projects.submissionversion'),
+        ),
+        migrations.AddIndex(
+            model_name='submissionversion',
+            index=models.Index(fields=['group', 'doc_type', 'sha256'], name='submissionversion_hash_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='submissionversion',
+            constraint=models.UniqueConstraint(fields=('group', 'doc_type', 'number'), name='submissionversion_unique_number'),
+        ),
+        migrations.RunPython(record_current_files, migrations.RunPython.noop),
+    ]
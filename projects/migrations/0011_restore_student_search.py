@@ -0,0 +1,48 @@
+from django.db import migrations
+
+
+# accounts.0003_id_card_derivatives adds a column with a default, which
+# SQLite does by rebuilding accounts_studentprofile, and nothing orders it
+# before 0004_search_index: when it runs afterwards the rebuild drops the
+# student search triggers. Put them back once every accounts migration that
+# rebuilds the table has run, as 0009 does for the group triggers.
+STUDENT_SEARCH_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS projects_student_search_ai AFTER INSERT ON accounts_studentprofile BEGIN "
+    "INSERT INTO projects_student_search(rowid, full_name, abc_id, email_id) "
+    "VALUES (new.user_id, new.full_name, new.abc_id, new.email_id); END",
+
+    "CREATE TRIGGER IF NOT EXISTS projects_student_search_ad AFTER DELETE ON accounts_studentprofile BEGIN "
+    "DELETE FROM projects_student_search WHERE rowid = old.user_id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS projects_student_search_au AFTER UPDATE OF user_id, full_name, abc_id, email_id "
+    "ON accounts_studentprofile BEGIN "
+    "DELETE FROM projects_student_search WHERE rowid = old.user_id; "
+    "INSERT INTO projects_student_search(rowid, full_name, abc_id, email_id) "
+    "VALUES (new.user_id, new.full_name, new.abc_id, new.email_id); END",
+
+    # Profiles written while the triggers were missing
+    "DELETE FROM projects_student_search",
+
+    "INSERT INTO projects_student_search(rowid, full_name, abc_id, email_id) "
+    "SELECT user_id, full_name, abc_id, email_id FROM accounts_studentprofile",
+]
+
+
+def restore_search_triggers(apps, schema_editor):
+    # FTS5 is SQLite only; other backends have no index to keep up
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in STUDENT_SEARCH_TRIGGERS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_teacher_mentor_capacity'),
+        ('projects', '0010_submission_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
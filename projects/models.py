@@ -1,6 +1,38 @@
+import uuid
+
 from django.db import models
+from django.db.models import Count, F, Prefetch
+from django.utils import timezone
 from accounts.models import User, StudentProfile, TeacherProfile
 
+class ProjectGroupQuerySet(models.QuerySet):
+    def with_summary(self):
+        """Load everything a group listing row needs in a fixed number of queries."""
+        return self.select_related('mentor').annotate(
+            member_count=Count('members', distinct=True)
+        ).prefetch_related(
+            Prefetch('members', queryset=GroupMember.objects.select_related('student'))
+        )
+
+    def for_student(self, student_profile):
+        return self.filter(id__in=GroupMember.objects.filter(student=student_profile).values('group_id'))
+
+    def for_mentor(self, teacher_profile):
+        return self.filter(mentor=teacher_profile)
+
+    def touch(self, **changes):
+        """Update the groups, bumping their version for the fragment caches.
+
+        ``update()`` skips ``save()``, so bulk writes to groups, and writes to
+        anything a group page shows, go through here.
+        """
+        return self.update(version=F('version') + 1, updated_at=timezone.now(), **changes)
+
+    def versions(self):
+        """``[(id, version)]`` for the groups, to key a cached listing on."""
+        return list(self.order_by('id').values_list('id', 'version'))
+
+
 class ProjectGroup(models.Model):
     name = models.CharField(max_length=100)
     section = models.CharField(max_length=10)
@@ -10,9 +42,39 @@ class ProjectGroup(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_approved = models.BooleanField(default=False)
     mentor = models.ForeignKey(TeacherProfile, on_delete=models.SET_NULL, null=True, blank=True)
+    # Bumped by every change to the group or to what its pages show (members,
+    # submission, mentor); cached template fragments are keyed on it
+    version = models.PositiveIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Latest SubmissionVersion of each document, so group pages need no history lookup
+    current_ppt = models.ForeignKey('SubmissionVersion', on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='+', editable=False)
+    current_synopsis = models.ForeignKey('SubmissionVersion', on_delete=models.SET_NULL, null=True, blank=True,
+                                         related_name='+', editable=False)
+    current_srs = models.ForeignKey('SubmissionVersion', on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='+', editable=False)
+    
+    objects = ProjectGroupQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            # Keyset pagination order used by the teacher group list
+            models.Index(fields=['section', 'name', 'id'], name='group_section_name_idx'),
+        ]
     
     def __str__(self):
         return self.name
+    
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            # Incremented in the database so a concurrent touch() is not lost
+            self.version = F('version') + 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version', 'updated_at'}
+        super().save(*args, **kwargs)
+        if isinstance(self.__dict__.get('version'), models.Expression):
+            # Reloaded from the database on next access
+            del self.version
 
 class GroupMember(models.Model):
     ROLE_CHOICES = [
@@ -27,12 +89,28 @@ class GroupMember(models.Model):
     role = models.CharField(max_length=10, choices=ROLE_CHOICES)
     
     class Meta:
-        unique_together = ('group', 'student')
+        constraints = [
+            # A student belongs to one group; each role is held once, which
+            # caps a group at one member per role
+            models.UniqueConstraint(fields=['student'], name='groupmember_one_group_per_student',
+                                    violation_error_message='This student is already in a group.'),
+            models.UniqueConstraint(fields=['group', 'role'], name='groupmember_unique_role',
+                                    violation_error_message='That role is already taken in this group.'),
+            models.CheckConstraint(
+                condition=models.Q(role__in=['lead', 'member1', 'member2', 'member3']),
+                name='groupmember_role_valid',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.student.full_name} - {self.get_role_display()}"
 
 
+# One member per role: a lead and three members, as add_members allows
+MAX_GROUP_SIZE = len(GroupMember.ROLE_CHOICES)
+ROLES = [role for role, _ in GroupMember.ROLE_CHOICES]
+
+
 class ProjectSubmission(models.Model):
     group = models.OneToOneField(ProjectGroup, on_delete=models.CASCADE)
     ppt_file = models.FileField(upload_to='submissions/ppt/', null=True, blank=True)
@@ -43,4 +121,198 @@ class ProjectSubmission(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
-        return f"Submission for {self.group.name}"
\ No newline at end of file
+        return f"Submission for {self.group.name}"
+
+
+def version_upload_to(instance, filename):
+    return f'submissions/{instance.doc_type}/{filename}'
+
+
+class SubmissionVersion(models.Model):
+    """One uploaded revision of a group's document. Rows are only ever added.
+
+    ``ProjectSubmission`` mirrors the current version of each document and
+    the group points at it (``current_ppt`` and so on); the rows here keep
+    every earlier upload, numbered per group and document type.
+    """
+    DOC_TYPE_CHOICES = [
+        ('ppt', 'Presentation'),
+        ('synopsis', 'Synopsis Report'),
+        ('srs', 'SRS Report'),
+    ]
+
+    group = models.ForeignKey(ProjectGroup, on_delete=models.CASCADE, related_name='submission_versions')
+    doc_type = models.CharField(max_length=10, choices=DOC_TYPE_CHOICES)
+    number = models.PositiveIntegerField()
+    file = models.FileField(upload_to=version_upload_to, max_length=255)
+    filename = models.CharField(max_length=255)
+    sha256 = models.CharField(max_length=64)
+    size = models.PositiveBigIntegerField()
+    submitted_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Also the index the history pages seek through, newest first
+            models.UniqueConstraint(fields=['group', 'doc_type', 'number'], name='submissionversion_unique_number'),
+        ]
+        indexes = [
+            models.Index(fields=['group', 'doc_type', 'sha256'], name='submissionversion_hash_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.group.name} {self.get_doc_type_display()} v{self.number}"
+
+
+class DataVersion(models.Model):
+    """Counter bumped whenever a family of rows changes, used to key caches."""
+    STUDENTS = 'students'
+    GROUPS = 'groups'
+    TEACHERS = 'teachers'
+    MEMBERS = 'members'
+    SUBMISSIONS = 'submissions'
+
+    key = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
+
+    @classmethod
+    def current(cls, key):
+        return cls.objects.filter(key=key).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def current_many(cls, *keys):
+        """Return ``{key: version}`` for ``keys`` in one query."""
+        versions = dict(cls.objects.filter(key__in=keys).values_list('key', 'version'))
+        return {key: versions.get(key, 0) for key in keys}
+
+    @classmethod
+    def bump(cls, *keys):
+        """Increment ``keys`` with one UPDATE, creating the rows missing the first time."""
+        keys = set(keys)
+        if not keys or cls.objects.filter(key__in=keys).update(version=F('version') + 1) == len(keys):
+            return
+        # Bumping a row twice is harmless, so no need to find which were missing
+        cls.objects.bulk_create([cls(key=key) for key in keys], ignore_conflicts=True)
+        cls.objects.filter(key__in=keys).update(version=F('version') + 1)
+
+
+class ReportJob(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    report_type = models.CharField(max_length=20, default='students')
+    params = models.JSONField(default=dict)
+    params_key = models.CharField(max_length=64, db_index=True)
+    cache_key = models.CharField(max_length=64, db_index=True)
+    data_version = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.report_type} report #{self.pk} ({self.status})"
+
+
+
+class UploadSession(models.Model):
+    """A resumable upload of one submission document, received in byte-range chunks."""
+    DOC_TYPE_CHOICES = [
+        ('ppt', 'Presentation'),
+        ('synopsis', 'Synopsis Report'),
+        ('srs', 'SRS Report'),
+    ]
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('complete', 'Complete'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    group = models.ForeignKey(ProjectGroup, on_delete=models.CASCADE, related_name='upload_sessions')
+    doc_type = models.CharField(max_length=10, choices=DOC_TYPE_CHOICES)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active')
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} for {self.group_id} ({self.received}/{self.size})"
+
+
+class StoredBlob(models.Model):
+    """One stored file body, kept once per distinct SHA-256."""
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.refcount} refs)"
+
+
+class BlobReference(models.Model):
+    """A logical storage name (what a FileField holds) pointing at a blob."""
+    name = models.CharField(max_length=255, unique=True)
+    blob = models.ForeignKey(StoredBlob, on_delete=models.PROTECT, related_name='references')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+
+class ProgressRollup(models.Model):
+    """Group progress counts for one section / branch / passing year.
+
+    A group is counted under its section and its team lead's branch and
+    passing year (blank and 0 while it has no lead). Kept up to date from
+    ``GroupRollupState`` deltas; ``rebuild_rollups`` recomputes it.
+    """
+    section = models.CharField(max_length=10)
+    branch = models.CharField(max_length=50, blank=True)
+    passing_year = models.IntegerField(default=0)
+    groups = models.PositiveIntegerField(default=0)
+    approved = models.PositiveIntegerField(default=0)
+    mentored = models.PositiveIntegerField(default=0)
+    submitted = models.PositiveIntegerField(default=0)
+    ppt = models.PositiveIntegerField(default=0)
+    synopsis = models.PositiveIntegerField(default=0)
+    srs = models.PositiveIntegerField(default=0)
+    github = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['section', 'branch', 'passing_year'], name='rollup_bucket_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.section}/{self.branch or '-'}/{self.passing_year or '-'}: {self.groups} groups"
+
+
+class GroupRollupState(models.Model):
+    """What one group currently contributes to ``ProgressRollup``.
+
+    ``group_id`` is a plain integer rather than a foreign key so the row
+    outlives a deleted group until its counts have been taken back out.
+    """
+    group_id = models.PositiveIntegerField(primary_key=True)
+    section = models.CharField(max_length=10)
+    branch = models.CharField(max_length=50, blank=True)
+    passing_year = models.IntegerField(default=0)
+    counts = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f"group {self.group_id} in {self.section}/{self.branch or '-'}/{self.passing_year or '-'}"
@@ -0,0 +1,167 @@
+import base64
+import binascii
+import json
+from functools import reduce
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def encode_cursor(payload):
+    data = json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the cursor payload, or None if the cursor is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(data)
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(payload, dict) or not isinstance(payload.get('key'), list):
+        return None
+    # Cursors come back from the client, so anything we would not have written is refused
+    if not all(isinstance(value, (str, int, float)) and not isinstance(value, bool) for value in payload['key']):
+        return None
+    filters = payload.get('filters', {})
+    if not isinstance(filters, dict) or not all(isinstance(value, str) for value in filters.values()):
+        return None
+    return payload
+
+
+def _clean_key(queryset, ordering, key):
+    """Convert ``key`` to the types of the ``ordering`` columns, or return None if it does not fit."""
+    if len(key) != len(ordering):
+        return None
+    cleaned = []
+    for field_name, value in zip(ordering, key):
+        try:
+            field = queryset.model._meta.get_field(field_name.lstrip('-'))
+        except FieldDoesNotExist:
+            # An annotation, such as the search rank
+            if isinstance(value, str):
+                return None
+            cleaned.append(value)
+            continue
+        try:
+            cleaned.append(field.to_python(value))
+        except ValidationError:
+            return None
+    return cleaned
+
+
+def _lookup(field, forward, strict=True):
+    """The comparison that moves ``forward`` (or back) along ``field``; ``-field`` runs downwards."""
+    upwards = forward != field.startswith('-')
+    return f"{field.lstrip('-')}__{'gt' if upwards else 'lt'}{'' if strict else 'e'}"
+
+
+def _seek(ordering, key, forward):
+    """Build ``(a, b, c) > (x, y, z)`` as ``a >= x AND (a > x OR (a = x AND ...))``.
+
+    The leading ``>=`` on the first column lets the database seek straight
+    into the index instead of scanning from the start. With ``forward``
+    false the rows before the key are selected instead.
+    """
+    names = [field.lstrip('-') for field in ordering]
+    lookups = [
+        reduce(
+            lambda q, pair: q & Q(**{pair[0]: pair[1]}),
+            zip(names[:index], key[:index]),
+            Q(**{_lookup(ordering[index], forward): key[index]}),
+        )
+        for index in range(len(ordering))
+    ]
+    return Q(**{_lookup(ordering[0], forward, strict=False): key[0]}) & reduce(lambda a, b: a | b, lookups)
+
+
+def _after(ordering, key):
+    return _seek(ordering, key, forward=True)
+
+
+def _before(ordering, key):
+    return _seek(ordering, key, forward=False)
+
+
+def _reversed(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def paginate_keyset(queryset, ordering, filters=None, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """Return one page of ``queryset`` ordered by ``ordering``.
+
+    ``ordering`` is a list of field names, descending ones prefixed with
+    ``-``, whose last entry is unique, so every row has a distinct position. Pages are found with a
+    ``WHERE key > last_key`` seek instead of ``OFFSET``, so a deep page costs
+    the same as the first one. ``filters`` are stored in the cursors so the
+    next and previous links carry the filtered view with them.
+    """
+    payload = decode_cursor(cursor) if isinstance(cursor, str) else cursor
+    key = _clean_key(queryset, ordering, payload['key']) if payload else None
+    if key is None:
+        # A cursor that does not fit this listing starts again from the first page
+        payload = None
+    backwards = bool(payload) and payload.get('direction') == 'previous'
+
+    if payload:
+        condition = _before if backwards else _after
+        queryset = queryset.filter(condition(ordering, key))
+    if backwards:
+        queryset = queryset.order_by(*[_reversed(field) for field in ordering])
+    else:
+        queryset = queryset.order_by(*ordering)
+
+    rows = list(queryset[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    def cursor_for(row, direction):
+        key = [getattr(row, field.lstrip('-')) for field in ordering]
+        return encode_cursor({'filters': filters or {}, 'key': key, 'direction': direction})
+
+    next_cursor = previous_cursor = None
+    if rows:
+        if has_more or backwards:
+            next_cursor = cursor_for(rows[-1], 'next')
+        if payload and (has_more or not backwards):
+            previous_cursor = cursor_for(rows[0], 'previous')
+    return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+def cursor_filters(request, names):
+    """Read filters from the cursor if one was given, otherwise from the query string."""
+    payload = decode_cursor(request.GET.get('cursor'))
+    if payload and isinstance(payload.get('filters'), dict):
+        source = payload['filters']
+    else:
+        source = request.GET
+    return {name: str(source.get(name) or '') for name in names}
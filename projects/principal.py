@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from accounts.models import StudentProfile, TeacherProfile
+from .models import GroupMember
+
+
+PRINCIPAL_CACHE_TIMEOUT = 60
+
+
+def principal_cache_key(user_id):
+    return f'principal:{user_id}'
+
+
+class Principal:
+    """The signed-in user's profile and group memberships, loaded once per request."""
+
+    def __init__(self, user, student_profile=None, teacher_profile=None, memberships=None):
+        self.user = user
+        self.student_profile = student_profile
+        self.teacher_profile = teacher_profile
+        # group id -> role
+        self.memberships = memberships or {}
+
+    @property
+    def group_ids(self):
+        return list(self.memberships)
+
+    def role_in(self, group_id):
+        return self.memberships.get(group_id)
+
+    def is_member(self, group_id):
+        return group_id in self.memberships
+
+    def is_lead(self, group_id):
+        return self.memberships.get(group_id) == 'lead'
+
+
+def _load(user):
+    student_profile = teacher_profile = None
+    memberships = {}
+    if user.is_student:
+        student_profile = StudentProfile.objects.filter(user=user).first()
+        if student_profile is not None:
+            memberships = dict(
+                GroupMember.objects.filter(student=student_profile).values_list('group_id', 'role')
+            )
+    elif user.is_teacher:
+        teacher_profile = TeacherProfile.objects.filter(user=user).first()
+    return student_profile, teacher_profile, memberships
+
+
+def load_principal(user):
+    """Return the ``Principal`` for ``user``, served from cache when possible."""
+    if not user.is_authenticated:
+        return Principal(user)
+    key = principal_cache_key(user.pk)
+    data = cache.get(key)
+    if data is None:
+        data = _load(user)
+        cache.set(key, data, PRINCIPAL_CACHE_TIMEOUT)
+    return Principal(user, *data)
+
+
+def invalidate_principal(*user_ids):
+    keys = [principal_cache_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    # Again after commit, in case another request cached the old rows meanwhile
+    transaction.on_commit(lambda: cache.delete_many(keys))
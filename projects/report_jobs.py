@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from accounts.models import StudentProfile
+from .models import DataVersion, ReportJob
+from .reports import iter_student_report
+
+
+def _hash(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def report_path(job):
+    return os.path.join(settings.REPORT_CACHE_DIR, f'{job.cache_key}.pdf')
+
+
+def student_report_queryset(params):
+    students = StudentProfile.objects.all()
+    if params.get('section'):
+        students = students.filter(section=params['section'])
+    if params.get('branch'):
+        students = students.filter(branch=params['branch'])
+    return students
+
+
+def enqueue_student_report(section=None, branch=None, user=None):
+    """Return the job serving this filter, creating one if nothing is cached.
+
+    Jobs are keyed by the filter parameters and the current student data
+    version, so an unchanged report is served from disk instead of rendered
+    again.
+    """
+    params = {'section': section or '', 'branch': branch or ''}
+    version = DataVersion.current(DataVersion.STUDENTS)
+    params_key = _hash(['students', params])
+    cache_key = _hash(['students', params, version])
+
+    job = ReportJob.objects.filter(cache_key=cache_key).exclude(status='failed').order_by('-id').first()
+    if job and (job.status != 'done' or os.path.exists(report_path(job))):
+        return job
+
+    return ReportJob.objects.create(
+        report_type='students',
+        params=params,
+        params_key=params_key,
+        cache_key=cache_key,
+        data_version=version,
+        requested_by=user,
+    )
+
+
+def claim_next_job():
+    """Atomically move the oldest queued job to running and return it."""
+    queued = ReportJob.objects.filter(status='queued').order_by('created_at', 'id')
+    for job_id in queued.values_list('id', flat=True)[:10]:
+        claimed = ReportJob.objects.filter(id=job_id, status='queued').update(
+            status='running', started_at=timezone.now()
+        )
+        if claimed:
+            return ReportJob.objects.get(id=job_id)
+    return None
+
+
+def requeue_stale_jobs(timeout):
+    """Put back jobs whose worker died while rendering them."""
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return ReportJob.objects.filter(status='running', started_at__lt=cutoff).update(
+        status='queued', started_at=None
+    )
+
+
+def run_job(job):
+    """Render a claimed job to the report cache and record the outcome."""
+    os.makedirs(settings.REPORT_CACHE_DIR, exist_ok=True)
+    path = report_path(job)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+
+    try:
+        students = student_report_queryset(job.params)
+        with open(temp_path, 'wb') as output:
+            for chunk in iter_student_report(students, generated_at=timezone.now()):
+                output.write(chunk)
+        os.replace(temp_path, path)
+    except Exception as exc:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        job.status = 'failed'
+        job.error = str(exc)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+        raise
+
+    job.status = 'done'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'finished_at'])
+    prune_superseded(job)
+    return job
+
+
+def prune_superseded(job):
+    """Delete cached files for older data versions of the same report."""
+    superseded = ReportJob.objects.filter(params_key=job.params_key, status='done').exclude(cache_key=job.cache_key)
+    for old_job in superseded:
+        path = report_path(old_job)
+        if os.path.exists(path):
+            os.remove(path)
+    superseded.delete()
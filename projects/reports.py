@@ -0,0 +1,157 @@
+import zlib
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+
+
+# Columns printed in the student report: (x position, heading, model field)
+STUDENT_REPORT_COLUMNS = [
+    (1 * inch, 'Name', 'full_name'),
+    (3 * inch, 'ABC ID', 'abc_id'),
+    (4.5 * inch, 'Section', 'section'),
+    (5.5 * inch, 'Branch', 'branch'),
+]
+
+# Rows fetched from the database per round trip while streaming
+STUDENT_REPORT_CHUNK_SIZE = 2000
+
+
+class StreamingPDFWriter:
+    """Minimal PDF writer that hands back each page as soon as it is finished.
+
+    reportlab's canvas keeps every page in memory until ``save()``, so large
+    reports are written with this class instead. Only the two standard
+    Helvetica faces are supported, which is all the reports need.
+    """
+
+    FONTS = {
+        'Helvetica': 'F1',
+        'Helvetica-Bold': 'F2',
+    }
+
+    CATALOG_ID = 1
+    PAGES_ID = 2
+
+    def __init__(self, pagesize=letter):
+        self.width, self.height = pagesize
+        self._offsets = {}
+        self._position = 0
+        self._next_id = 3 + len(self.FONTS)
+        self._page_ids = []
+        self._operations = []
+        self._font = ('F1', 10)
+
+    def _object(self, object_id, body):
+        self._offsets[object_id] = self._position
+        data = b'%d 0 obj\n' % object_id + body + b'\nendobj\n'
+        self._position += len(data)
+        return data
+
+    def _allocate(self):
+        object_id = self._next_id
+        self._next_id += 1
+        return object_id
+
+    def begin(self):
+        """Return the file header and the shared font objects."""
+        data = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+        self._position = len(data)
+        for index, name in enumerate(self.FONTS):
+            data += self._object(3 + index, (
+                '<< /Type /Font /Subtype /Type1 /BaseFont /%s '
+                '/Encoding /WinAnsiEncoding >>' % name
+            ).encode('ascii'))
+        return data
+
+    def set_font(self, name, size):
+        self._font = (self.FONTS[name], size)
+
+    def draw_string(self, x, y, text):
+        text = str(text).encode('cp1252', 'replace')
+        text = text.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+        font, size = self._font
+        self._operations.append(
+            b'BT /%s %g Tf %.2f %.2f Td (' % (font.encode('ascii'), size, x, y) + text + b') Tj ET'
+        )
+
+    def show_page(self):
+        """Finish the current page and return its encoded objects."""
+        content = zlib.compress(b'\n'.join(self._operations))
+        self._operations = []
+
+        content_id = self._allocate()
+        page_id = self._allocate()
+        self._page_ids.append(page_id)
+
+        data = self._object(
+            content_id,
+            b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(content) + content + b'\nendstream',
+        )
+        fonts = ' '.join('/%s %d 0 R' % (key, 3 + index) for index, key in enumerate(self.FONTS.values()))
+        data += self._object(page_id, (
+            '<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %g %g] '
+            '/Resources << /Font << %s >> >> /Contents %d 0 R >>'
+            % (self.PAGES_ID, self.width, self.height, fonts, content_id)
+        ).encode('ascii'))
+        return data
+
+    def finish(self):
+        """Return the page tree, catalog and cross-reference table."""
+        kids = ' '.join('%d 0 R' % page_id for page_id in self._page_ids)
+        data = self._object(self.PAGES_ID, (
+            '<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self._page_ids))
+        ).encode('ascii'))
+        data += self._object(self.CATALOG_ID, b'<< /Type /Catalog /Pages %d 0 R >>' % self.PAGES_ID)
+
+        xref_position = self._position
+        size = self._next_id
+        lines = [b'xref', b'0 %d' % size, b'0000000000 65535 f ']
+        for object_id in range(1, size):
+            lines.append(b'%010d 00000 n ' % self._offsets[object_id])
+        data += b'\n'.join(lines) + b'\n'
+        data += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+            size, self.CATALOG_ID, xref_position
+        )
+        return data
+
+
+def iter_student_report(students, generated_at, chunk_size=STUDENT_REPORT_CHUNK_SIZE):
+    """Yield the student report PDF page by page.
+
+    ``students`` is a ``StudentProfile`` queryset; only the printed columns are
+    fetched and rows are read in chunks, so memory use does not grow with the
+    number of students.
+    """
+    writer = StreamingPDFWriter(pagesize=letter)
+    width, height = letter
+    yield writer.begin()
+
+    writer.set_font('Helvetica-Bold', 16)
+    writer.draw_string(1 * inch, height - 1 * inch, 'Student Report')
+    writer.set_font('Helvetica', 10)
+
+    y_position = height - 1.5 * inch
+    writer.draw_string(1 * inch, y_position, 'Generated on: {}'.format(generated_at.strftime('%Y-%m-%d %H:%M')))
+
+    # Add table headers
+    y_position -= 0.5 * inch
+    writer.set_font('Helvetica-Bold', 10)
+    for x_position, heading, _ in STUDENT_REPORT_COLUMNS:
+        writer.draw_string(x_position, y_position, heading)
+    writer.set_font('Helvetica', 10)
+
+    fields = [field for _, _, field in STUDENT_REPORT_COLUMNS]
+    rows = students.values_list(*fields).iterator(chunk_size=chunk_size)
+
+    y_position -= 0.3 * inch
+    for row in rows:
+        if y_position < 1 * inch:  # Check if we need a new page
+            yield writer.show_page()
+            y_position = height - 1 * inch
+
+        for (x_position, _, _), value in zip(STUDENT_REPORT_COLUMNS, row):
+            writer.draw_string(x_position, y_position, value)
+        y_position -= 0.3 * inch
+
+    yield writer.show_page()
+    yield writer.finish()
@@ -0,0 +1,162 @@
+import threading
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import GroupMember, GroupRollupState, ProgressRollup, ProjectGroup, ProjectSubmission
+
+
+# Counters on ProgressRollup, in display order
+COUNTERS = ('groups', 'approved', 'mentored', 'submitted', 'ppt', 'synopsis', 'srs', 'github')
+
+# ProjectSubmission field -> counter
+SUBMISSION_COUNTERS = {
+    'ppt_file': 'ppt',
+    'synopsis_report': 'synopsis',
+    'srs_report': 'srs',
+    'github_link': 'github',
+}
+
+_pending = threading.local()
+
+
+def _contribution(group, submission):
+    counts = {
+        'groups': 1,
+        'approved': int(group['is_approved']),
+        'mentored': int(group['mentor_id'] is not None),
+        'submitted': int(submission is not None),
+    }
+    for field, counter in SUBMISSION_COUNTERS.items():
+        counts[counter] = int(bool(submission and submission[field]))
+    return counts
+
+
+def _describe(group_ids):
+    """Return ``{group id: (section, branch, passing year, counts)}`` for existing groups."""
+    groups = ProjectGroup.objects.filter(id__in=group_ids).values('id', 'section', 'is_approved', 'mentor_id')
+    leads = dict(
+        (group_id, (branch, year)) for group_id, branch, year in
+        GroupMember.objects.filter(group_id__in=group_ids, role='lead')
+        .values_list('group_id', 'student__branch', 'student__passing_year')
+    )
+    submissions = {
+        row['group_id']: row for row in
+        ProjectSubmission.objects.filter(group_id__in=group_ids).values('group_id', *SUBMISSION_COUNTERS)
+    }
+    described = {}
+    for group in groups:
+        branch, year = leads.get(group['id'], ('', 0))
+        described[group['id']] = (group['section'], branch, year, _contribution(group, submissions.get(group['id'])))
+    return described
+
+
+def _apply(bucket, counts, sign):
+    changes = {counter: F(counter) + sign * value for counter, value in counts.items() if value}
+    if not changes:
+        return
+    rows = ProgressRollup.objects.filter(section=bucket[0], branch=bucket[1], passing_year=bucket[2])
+    if rows.update(**changes) or sign < 0:
+        return
+    # First group in this bucket
+    ProgressRollup.objects.bulk_create(
+        [ProgressRollup(section=bucket[0], branch=bucket[1], passing_year=bucket[2])], ignore_conflicts=True
+    )
+    rows.update(**changes)
+
+
+def refresh_groups(group_ids):
+    """Bring the rollup up to date for ``group_ids`` by applying deltas.
+
+    Each group's ``GroupRollupState`` row is locked, its contribution is
+    recomputed from the source tables, and only the difference is applied:
+    the old counts leave their bucket and the new counts join theirs. A
+    group that no longer exists is taken out entirely.
+    """
+    group_ids = sorted(set(group_ids))
+    if not group_ids:
+        return
+    with transaction.atomic():
+        states = {
+            state.group_id: state
+            for state in GroupRollupState.objects.select_for_update().filter(group_id__in=group_ids)
+        }
+        missing = [group_id for group_id in group_ids if group_id not in states]
+        if missing:
+            # Empty placeholders give new groups a row to lock, so two refreshes
+            # of the same new group cannot both add it
+            GroupRollupState.objects.bulk_create(
+                [GroupRollupState(group_id=group_id) for group_id in missing], ignore_conflicts=True
+            )
+            states.update(
+                (state.group_id, state)
+                for state in GroupRollupState.objects.select_for_update().filter(group_id__in=missing)
+            )
+        described = _describe(group_ids)
+        for group_id in group_ids:
+            state = states[group_id]
+            current = described.get(group_id)
+            old_bucket = (state.section, state.branch, state.passing_year)
+            new_bucket = current[:3] if current else None
+            old_counts = state.counts
+            new_counts = current[3] if current else {}
+            if current is None:
+                _apply(old_bucket, old_counts, -1)
+                state.delete()
+                continue
+            if old_bucket == new_bucket and old_counts == new_counts:
+                continue
+
+            if old_bucket == new_bucket:
+                delta = {counter: new_counts.get(counter, 0) - old_counts.get(counter, 0) for counter in COUNTERS}
+                _apply(new_bucket, delta, 1)
+            else:
+                _apply(old_bucket, old_counts, -1)
+                _apply(new_bucket, new_counts, 1)
+
+            state.section, state.branch, state.passing_year = new_bucket
+            state.counts = new_counts
+            state.save(update_fields=['section', 'branch', 'passing_year', 'counts'])
+
+
+def _flush():
+    group_ids, _pending.group_ids = getattr(_pending, 'group_ids', set()), set()
+    refresh_groups(group_ids)
+
+
+def schedule_refresh(*group_ids):
+    """Refresh the rollup for ``group_ids`` once the current transaction commits.
+
+    Several writes to the same group in one transaction (a new group and
+    its lead, say) are folded into one refresh.
+    """
+    if not group_ids:
+        return
+    if not hasattr(_pending, 'group_ids'):
+        _pending.group_ids = set()
+    _pending.group_ids.update(group_ids)
+    transaction.on_commit(_flush)
+
+
+def rebuild_rollups(batch_size=1000):
+    """Recompute every rollup row and group state from scratch; return the number of groups."""
+    group_ids = list(ProjectGroup.objects.order_by('id').values_list('id', flat=True))
+    buckets = {}
+    states = []
+    for start in range(0, len(group_ids), batch_size):
+        for group_id, (section, branch, year, counts) in _describe(group_ids[start:start + batch_size]).items():
+            buckets.setdefault((section, branch, year), Counter()).update(counts)
+            states.append(GroupRollupState(group_id=group_id, section=section, branch=branch,
+                                           passing_year=year, counts=counts))
+
+    with transaction.atomic():
+        GroupRollupState.objects.all().delete()
+        ProgressRollup.objects.all().delete()
+        GroupRollupState.objects.bulk_create(states, batch_size=batch_size)
+        ProgressRollup.objects.bulk_create([
+            ProgressRollup(section=section, branch=branch, passing_year=year,
+                           **{counter: counts[counter] for counter in COUNTERS})
+            for (section, branch, year), counts in sorted(buckets.items())
+        ], batch_size=batch_size)
+    return len(states)
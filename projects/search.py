@@ -0,0 +1,100 @@
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+
+STUDENT_INDEX = 'projects_student_search'
+GROUP_INDEX = 'projects_group_search'
+
+# bm25() column weights, in the order the columns were declared
+STUDENT_WEIGHTS = (3.0, 2.0, 1.0)  # full_name, abc_id, email_id
+GROUP_WEIGHTS = (2.0, 1.0)  # name, project_title
+
+REBUILD = {
+    STUDENT_INDEX: (
+        "INSERT INTO projects_student_search(rowid, full_name, abc_id, email_id) "
+        "SELECT user_id, full_name, abc_id, email_id FROM accounts_studentprofile"
+    ),
+    GROUP_INDEX: (
+        "INSERT INTO projects_group_search(rowid, name, project_title) "
+        "SELECT id, name, project_title FROM projects_projectgroup"
+    ),
+}
+
+_available = {}
+
+
+def search_available():
+    """Return True if the FTS5 index tables exist on the current database."""
+    if connection.vendor != 'sqlite':
+        return False
+    name = connection.settings_dict['NAME']
+    if name not in _available:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN (%s, %s)",
+                [STUDENT_INDEX, GROUP_INDEX],
+            )
+            _available[name] = cursor.fetchone()[0] == 2
+    return _available[name]
+
+
+def match_expression(text):
+    """Turn free text into an FTS5 query matching every word as a prefix."""
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def _search(queryset, table, weights, text):
+    """Join ``queryset`` to its index and keep the rows matching ``text``.
+
+    The index is joined on rowid, so the queryset's own filters apply in
+    the same query as the match and every matching row is reachable; the
+    caller pages through them. Each row is annotated with its bm25() score
+    as ``search_rank``, lower being a better match. The score is read from
+    the index's ``rank`` column, with the weights set through ``rank MATCH``,
+    because bm25() itself cannot be called in a grouped query such as
+    ``with_summary()``.
+    """
+    expression = match_expression(text)
+    if not expression:
+        return queryset.none()
+    meta = queryset.model._meta
+    rank = 'bm25({})'.format(', '.join(str(weight) for weight in weights))
+    return queryset.extra(
+        tables=[table],
+        where=[
+            f'{table}.rowid = {meta.db_table}.{meta.pk.column}',
+            f'{table} MATCH %s',
+            f'{table}.rank MATCH %s',
+        ],
+        params=[expression, rank],
+    ).annotate(search_rank=RawSQL(f'{table}.rank', ()))
+
+
+def search_students(students, text):
+    """Restrict a ``StudentProfile`` queryset to matches, annotated with ``search_rank``.
+
+    Returns None when the index is unavailable so callers can fall back to
+    a plain ``icontains`` filter.
+    """
+    if not search_available():
+        return None
+    return _search(students, STUDENT_INDEX, STUDENT_WEIGHTS, text)
+
+
+def search_groups(groups, text):
+    """Restrict a ``ProjectGroup`` queryset to matches, annotated with ``search_rank``, or None."""
+    if not search_available():
+        return None
+    return _search(groups, GROUP_INDEX, GROUP_WEIGHTS, text)
+
+
+def rebuild_search_index():
+    """Repopulate both index tables from the source rows."""
+    with connection.cursor() as cursor:
+        for table, populate in REBUILD.items():
+            cursor.execute(f'DELETE FROM {table}')
+            cursor.execute(populate)
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
@@ -0,0 +1,105 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import StudentProfile, TeacherProfile
+from .availability import bump_sections
+from .models import DataVersion, GroupMember, ProjectGroup, ProjectSubmission, SubmissionVersion
+from .principal import invalidate_principal
+from .rollups import schedule_refresh
+
+
+@receiver([post_save, post_delete], sender=StudentProfile)
+def student_profile_changed(sender, instance, **kwargs):
+    DataVersion.bump(DataVersion.STUDENTS)
+
+
+@receiver([post_save, post_delete], sender=TeacherProfile)
+def teacher_profile_changed(sender, instance, **kwargs):
+    DataVersion.bump(DataVersion.TEACHERS)
+
+
+@receiver([post_save, post_delete], sender=ProjectGroup)
+def group_changed(sender, instance, **kwargs):
+    DataVersion.bump(DataVersion.GROUPS)
+
+
+@receiver([post_save, post_delete], sender=StudentProfile)
+@receiver([post_save, post_delete], sender=TeacherProfile)
+def profile_principal_changed(sender, instance, **kwargs):
+    invalidate_principal(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=GroupMember)
+def membership_changed(sender, instance, **kwargs):
+    DataVersion.bump(DataVersion.MEMBERS)
+    invalidate_principal(instance.student_id)
+
+
+@receiver([post_save, post_delete], sender=ProjectSubmission)
+def submission_changed(sender, instance, **kwargs):
+    DataVersion.bump(DataVersion.SUBMISSIONS)
+
+
+@receiver([post_save, post_delete], sender=GroupMember)
+def membership_availability_changed(sender, instance, **kwargs):
+    if GroupMember.group.is_cached(instance):
+        section = instance.group.section
+    else:
+        section = ProjectGroup.objects.filter(pk=instance.group_id).values_list('section', flat=True).first()
+    if section is not None:
+        bump_sections(section)
+
+
+@receiver([post_save, post_delete], sender=ProjectGroup)
+def group_progress_changed(sender, instance, **kwargs):
+    schedule_refresh(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=ProjectSubmission)
+def group_part_progress_changed(sender, instance, **kwargs):
+    schedule_refresh(instance.group_id)
+
+
+@receiver([post_save, post_delete], sender=GroupMember)
+def member_progress_changed(sender, instance, created=None, **kwargs):
+    # Only the lead decides the group's bucket, so other members joining or
+    # leaving cannot move its counts; an edited row might have been the lead
+    if instance.role == 'lead' or created is False:
+        schedule_refresh(instance.group_id)
+
+
+@receiver(post_save, sender=StudentProfile)
+def lead_progress_changed(sender, instance, created, **kwargs):
+    # A lead's branch or passing year decides their group's rollup bucket
+    if not created:
+        schedule_refresh(*GroupMember.objects.filter(student=instance, role='lead').values_list('group_id', flat=True))
+
+
+@receiver([post_save, post_delete], sender=GroupMember)
+@receiver([post_save, post_delete], sender=ProjectSubmission)
+def group_part_changed(sender, instance, **kwargs):
+    # The group's own saves bump its version in ProjectGroup.save()
+    ProjectGroup.objects.filter(pk=instance.group_id).touch()
+
+
+@receiver(post_save, sender=StudentProfile)
+def member_details_changed(sender, instance, created, **kwargs):
+    # Member names and ABC ids appear in the cached group fragments
+    if not created:
+        ProjectGroup.objects.filter(members__student=instance).touch()
+
+
+@receiver(post_save, sender=TeacherProfile)
+def mentor_details_changed(sender, instance, created, **kwargs):
+    if not created:
+        ProjectGroup.objects.filter(mentor=instance).touch()
+
+
+@receiver(post_delete, sender=SubmissionVersion)
+def version_file_released(sender, instance, **kwargs):
+    # Deleting a group cascades to its history; each version holds a
+    # reference to its blob, freed with the last one. Versions saved before
+    # reverts took their own reference may still share a name.
+    name = instance.file.name
+    if name and not SubmissionVersion.objects.filter(file=name).exists():
+        instance.file.storage.delete(name)
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+from .models import BlobReference, StoredBlob
+
+
+BLOB_DIR = 'blobs'
+
+
+class DedupFileSystemStorage(FileSystemStorage):
+    """File system storage that keeps each distinct file body once.
+
+    Saved files are written to ``blobs/ab/cd/<sha256>`` under the storage
+    location and the logical name Django hands us (``submissions/ppt/x.pdf``)
+    is recorded as a ``BlobReference``. Identical uploads share one blob,
+    and a blob is removed when the last name pointing at it is deleted.
+
+    Names saved before this backend was enabled have no reference row and
+    keep resolving to their original path until ``dedup_media`` converts
+    them.
+    """
+
+    def blob_name(self, sha256):
+        return '/'.join((BLOB_DIR, sha256[:2], sha256[2:4], sha256))
+
+    def digest(self, name):
+        """Return the SHA-256 of ``name``, or None for an unconverted legacy file."""
+        return BlobReference.objects.filter(name=name).values_list('blob_id', flat=True).first()
+
+    def digests(self, names):
+        """Return ``{name: sha256}`` for the converted names among ``names``, in one query."""
+        return dict(BlobReference.objects.filter(name__in=names).values_list('name', 'blob_id'))
+
+    def resolve(self, name):
+        """Return the relative path actually holding ``name`` on disk."""
+        sha256 = self.digest(name)
+        return self.blob_name(sha256) if sha256 else name
+
+    def _spool(self, content):
+        """Copy ``content`` to a temporary file next to the blobs, hashing as it goes."""
+        directory = os.path.join(self.location, BLOB_DIR)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.incoming-')
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    hasher.update(chunk)
+                    temp.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return hasher.hexdigest(), size, temp_path
+
+    def _save(self, name, content):
+        sha256, size, temp_path = self._spool(content)
+        try:
+            with transaction.atomic():
+                blob, _ = StoredBlob.objects.select_for_update().get_or_create(
+                    sha256=sha256, defaults={'size': size}
+                )
+                path = super().path(self.blob_name(sha256))
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(temp_path, path)
+                    temp_path = None
+                    if self.file_permissions_mode is not None:
+                        os.chmod(path, self.file_permissions_mode)
+                StoredBlob.objects.filter(pk=sha256).update(refcount=F('refcount') + 1)
+                BlobReference.objects.create(name=name, blob=blob)
+        finally:
+            if temp_path is not None:
+                os.remove(temp_path)
+        return name
+
+    def delete(self, name):
+        if not name:
+            raise ValueError('The name must be given to delete().')
+        with transaction.atomic():
+            reference = BlobReference.objects.select_for_update().filter(name=name).first()
+            if reference is None:
+                return super().delete(name)
+            reference.delete()
+            sha256 = reference.blob_id
+            blob = StoredBlob.objects.select_for_update().get(pk=sha256)
+            if blob.refcount > 1:
+                StoredBlob.objects.filter(pk=sha256).update(refcount=F('refcount') - 1)
+                return
+            blob.delete()
+            transaction.on_commit(lambda: self._remove_blob(sha256))
+
+    def _remove_blob(self, sha256):
+        # A save that landed after our commit may have brought the blob back
+        if not StoredBlob.objects.filter(pk=sha256).exists():
+            super().delete(self.blob_name(sha256))
+
+    def exists(self, name):
+        if BlobReference.objects.filter(name=name).exists():
+            return True
+        return os.path.lexists(super().path(name))
+
+    def path(self, name):
+        return super().path(self.resolve(name))
+
+    def adopt(self, name, keep_original=False):
+        """Move a file saved before deduplication into the blob store, keeping its name.
+
+        Returns the blob's SHA-256, or None if ``name`` is already converted
+        or missing on disk.
+        """
+        if BlobReference.objects.filter(name=name).exists():
+            return None
+        original = super().path(name)
+        if not os.path.isfile(original):
+            return None
+        with open(original, 'rb') as legacy:
+            self._save(name, File(legacy, name=name))
+        if not keep_original:
+            os.remove(original)
+        return self.digest(name)
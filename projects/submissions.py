@@ -0,0 +1,100 @@
+import hashlib
+import os
+
+from django.db import transaction
+from django.db.models import Max
+
+from .models import ProjectGroup, ProjectSubmission, SubmissionVersion
+
+
+# Document type -> ProjectSubmission file field
+DOCUMENT_FIELDS = {
+    'ppt': 'ppt_file',
+    'synopsis': 'synopsis_report',
+    'srs': 'srs_report',
+}
+
+# Document type -> ProjectGroup pointer at its current SubmissionVersion
+CURRENT_FIELDS = {doc_type: f'current_{doc_type}' for doc_type in DOCUMENT_FIELDS}
+
+HISTORY_PAGE_SIZE = 20
+
+
+def content_digest(file):
+    """Return ``(sha256, size)`` of a Django ``File``, leaving it rewound."""
+    hasher = hashlib.sha256()
+    size = 0
+    for chunk in file.chunks():
+        hasher.update(chunk)
+        size += len(chunk)
+    file.seek(0)
+    return hasher.hexdigest(), size
+
+
+def _add_version(group, doc_type, file, digest, current, submitted_by):
+    """Append ``file`` to the document's history, or return None if it is the current version."""
+    sha256, size = digest
+    if current is not None and current.sha256 == sha256:
+        return None
+
+    versions = SubmissionVersion.objects.filter(group=group, doc_type=doc_type)
+    if current is not None:
+        number = current.number + 1
+    else:
+        # The document was withdrawn, so the pointer is empty but history may not be
+        number = (versions.aggregate(last=Max('number'))['last'] or 0) + 1
+
+    version = SubmissionVersion(group=group, doc_type=doc_type, number=number, sha256=sha256, size=size,
+                                filename=os.path.basename(file.name), submitted_by=submitted_by)
+    # Going back to an earlier upload stores no new bytes: the dedup storage
+    # gives the name its own reference to the existing blob, which the
+    # version releases when it is deleted
+    version.file.save(version.filename, file, save=False)
+    version.save()
+    return version
+
+
+def attach_files(group, files, github_link=None, submitted_by=None, digests=None):
+    """Add uploaded documents to the group's history and make them current.
+
+    ``files`` maps a document type from ``DOCUMENT_FIELDS`` to a Django
+    ``File``; ``digests`` may give ``(sha256, size)`` for ones the caller
+    has already hashed. Each upload becomes a new ``SubmissionVersion``
+    unless it is identical to the current one; an upload identical to an
+    earlier version shares its blob in the dedup storage. Superseded files
+    stay in storage for the history.
+
+    The submission row, which mirrors the current files for downloads and
+    listings, is locked while it is updated so two uploads finishing
+    together cannot overwrite each other's fields.
+    """
+    digests = dict(digests or {})
+    for doc_type, file in files.items():
+        if doc_type not in digests:
+            digests[doc_type] = content_digest(file)
+
+    with transaction.atomic():
+        submission, _ = ProjectSubmission.objects.select_for_update().get_or_create(group=group)
+        current = ProjectGroup.objects.select_related(*CURRENT_FIELDS.values()).get(pk=group.pk)
+        pointers = {}
+        for doc_type, file in files.items():
+            version = _add_version(group, doc_type, file, digests[doc_type],
+                                   getattr(current, CURRENT_FIELDS[doc_type]), submitted_by)
+            if version is not None:
+                pointers[CURRENT_FIELDS[doc_type]] = version
+                setattr(submission, DOCUMENT_FIELDS[doc_type], version.file.name)
+        if pointers:
+            ProjectGroup.objects.filter(pk=group.pk).touch(**pointers)
+        if github_link:
+            submission.github_link = github_link
+        if pointers or github_link:
+            submission.save()
+    return submission
+
+
+def withdraw_document(submission, doc_type):
+    """Take a document off the submission; its versions stay in the history."""
+    with transaction.atomic():
+        setattr(submission, DOCUMENT_FIELDS[doc_type], None)
+        submission.save()
+        ProjectGroup.objects.filter(pk=submission.group_id).touch(**{CURRENT_FIELDS[doc_type]: None})
@@ -1,3 +1,1017 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import shutil
+import zipfile
+from collections import Counter
+from datetime import timedelta
+from importlib.util import find_spec
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts import urls as accounts_urls
+from accounts.models import StudentProfile, TeacherProfile, User
+from projects import api_urls, urls as projects_urls
+from .allocation import apply_allocation, plan_allocation
+from .availability import available_students
+from .benchmark import (
+    ROUTES, benchmark_environment, check_budget, format_report, load_budget, run_benchmark, seed_dataset,
+)
+from .bundles import BUNDLE_BLOCK_SIZE
+from .listings import GROUP_FILTERS, STUDENT_FILTERS, filter_groups, filter_students
+from .enrollment import EnrollmentError, create_group as create_group_with_lead, enroll, withdraw
+from .formation import form_groups
+from .models import (
+    MAX_GROUP_SIZE, ROLES, DataVersion, GroupMember, GroupRollupState, ProgressRollup, ProjectGroup, ProjectSubmission,
+    StoredBlob, SubmissionVersion, UploadSession,
+)
+from .pagination import encode_cursor, paginate_keyset
+from .principal import load_principal
+from .reports import iter_student_report
+from .rollups import COUNTERS as ROLLUP_COUNTERS, rebuild_rollups
+from .submissions import attach_files, withdraw_document
+from . import uploads
+
+
+class ScratchFilesTestCase(TestCase):
+    """Runs with media, uploads and reports in a scratch directory."""
+
+    @classmethod
+    def setUpClass(cls):
+        environment = benchmark_environment()
+        environment.__enter__()
+        cls.addClassCleanup(environment.__exit__, None, None, None)
+        super().setUpClass()
+
+
+class ViewBenchmarkTests(ScratchFilesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.budget = load_budget()
+        cls.fixtures = seed_dataset(**cls.budget['dataset'])
+
+    def test_every_url_is_benchmarked(self):
+        benchmarked = {name for name, _, _, _ in ROUTES}
+        for urlconf in (accounts_urls, projects_urls, api_urls):
+            for pattern in urlconf.urlpatterns:
+                self.assertIn(pattern.name, benchmarked)
+
+    def test_views_stay_within_query_budget(self):
+        results = run_benchmark(self.fixtures)
+        failures = check_budget(results, self.budget)
+        self.assertFalse(failures, '\n'.join(failures) + '\n\n' + format_report(results, self.budget))
+
+
+def create_student(name, abc_id, branch='CSE', section='A'):
+    user = User.objects.create_user(username=abc_id.lower(), is_student=True)
+    return StudentProfile.objects.create(
+        user=user, full_name=name, section=section, passing_year=2026, branch=branch, degree='B.Tech',
+        mobile_no='9000000000', email_id=f'{abc_id.lower()}@example.com', abc_id=abc_id,
+    )
+
+
+class SearchIndexTests(TestCase):
+    def search_groups(self, text):
+        groups, _ = filter_groups(ProjectGroup.objects.all(), dict.fromkeys(GROUP_FILTERS, '') | {'search': text})
+        return list(groups)
+
+    def search_students(self, text):
+        students, _ = filter_students(StudentProfile.objects.all(),
+                                      dict.fromkeys(STUDENT_FILTERS, '') | {'search': text})
+        return list(students)
+
+    def test_students_written_after_migrating_are_indexed(self):
+        student = create_student('Ada Lovelace', 'ABC7654321')
+        self.assertEqual(self.search_students('lovelace'), [student])
+
+        student.full_name = 'Ada King'
+        student.save()
+        self.assertEqual(self.search_students('king'), [student])
+        self.assertEqual(self.search_students('lovelace'), [])
+
+    def test_groups_written_after_migrating_are_indexed(self):
+        # The test database is built by the migrations, so this fails if a
+        # table rebuild left the index triggers behind
+        group = ProjectGroup.objects.create(name='Nebula', section='A', project_title='Star catalogue',
+                                            problem_statement='-', project_explanation='-')
+        self.assertEqual(self.search_groups('nebula'), [group])
+
+        group.name = 'Quasar'
+        group.save()
+        self.assertEqual(self.search_groups('quasar'), [group])
+        self.assertEqual(self.search_groups('nebula'), [])
+
+        group.delete()
+        self.assertEqual(self.search_groups('quasar'), [])
+
+
+class SearchMigrationOrderTests(TransactionTestCase):
+    def test_student_index_survives_a_later_profile_table_rebuild(self):
+        # accounts.0003 rebuilds the profile table; when it runs after the
+        # search index was created, the triggers have to be put back
+        executor = MigrationExecutor(connection)
+        executor.migrate([('projects', '0003_group_section_name_idx'), ('accounts', '0002_student_section_name_idx')])
+        executor.loader.build_graph()
+        executor.migrate([('projects', '0004_search_index')])
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+        student = create_student('Grace Hopper', 'ABC1234567')
+        student.full_name = 'Grace Murray'
+        student.save()
+        students, _ = filter_students(StudentProfile.objects.all(),
+                                      dict.fromkeys(STUDENT_FILTERS, '') | {'search': 'murray'})
+        self.assertEqual(list(students), [student])
+
+
+class EnrollmentMigrationTests(TransactionTestCase):
+    BEFORE = [('accounts', '0004_teacher_mentor_capacity'), ('projects', '0006_dedup_storage')]
+
+    def setUp(self):
+        self.executor = MigrationExecutor(connection)
+        self.executor.migrate(self.BEFORE)
+        self.apps = self.executor.loader.project_state(self.BEFORE).apps
+        self.addCleanup(self.migrate_to_latest)
+
+    def migrate_to_latest(self):
+        self.apps.get_model('projects', 'GroupMember').objects.all().delete()
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.executor.loader.graph.leaf_nodes())
+
+    def migrate(self):
+        self.executor.loader.build_graph()
+        output = io.StringIO()
+        with mock.patch('sys.stdout', output):
+            self.executor.migrate([('projects', '0007_enrollment_constraints')])
+        return output.getvalue()
+
+    def add(self, group, student, role):
+        return self.apps.get_model('projects', 'GroupMember').objects.create(group=group, student=student, role=role)
+
+    def make(self, students, groups):
+        User = self.apps.get_model('accounts', 'User')
+        StudentProfile = self.apps.get_model('accounts', 'StudentProfile')
+        ProjectGroup = self.apps.get_model('projects', 'ProjectGroup')
+        profiles = [
+            StudentProfile.objects.create(
+                user=User.objects.create(username=f'migrating{i}'), full_name=f'Student {i}', section='A',
+                passing_year=2026, branch='CSE', degree='B.Tech', mobile_no='-', email_id='-', abc_id=f'M{i}',
+            )
+            for i in range(students)
+        ]
+        return profiles, [
+            ProjectGroup.objects.create(name=f'Group {i}', section='A', project_title='-', problem_statement='-',
+                                        project_explanation='-')
+            for i in range(groups)
+        ]
+
+    def test_duplicates_are_resolved_without_losing_a_lead(self):
+        students, groups = self.make(students=10, groups=3)
+        dropped = self.add(groups[0], students[0], 'member1')
+        self.add(groups[1], students[0], 'lead')
+        self.add(groups[0], students[1], 'lead')
+        self.add(groups[0], students[2], 'member2')
+        self.add(groups[0], students[3], 'member2')
+        for student, role in zip(students[4:], ROLES):
+            self.add(groups[2], student, role)
+        overflow = self.add(groups[2], students[8], 'captain')
+
+        output = self.migrate()
+
+        GroupMember = self.executor.loader.project_state(
+            [('projects', '0007_enrollment_constraints')]
+        ).apps.get_model('projects', 'GroupMember')
+        roles = {(member.group_id, member.student_id): member.role for member in GroupMember.objects.all()}
+        self.assertEqual(roles, {
+            (groups[1].pk, students[0].pk): 'lead',
+            (groups[0].pk, students[1].pk): 'lead',
+            (groups[0].pk, students[2].pk): 'member2',
+            (groups[0].pk, students[3].pk): 'member1',
+            **{(groups[2].pk, student.pk): role for student, role in zip(students[4:], ROLES)},
+        })
+        self.assertIn(f'Removed membership {dropped.pk} (student {students[0].pk}, group {groups[0].pk}', output)
+        self.assertIn(f'Removed membership {overflow.pk}', output)
+        self.assertIn("role 'member2' -> 'member1'", output)
+
+    def test_a_student_leading_two_groups_stops_the_migration(self):
+        students, groups = self.make(students=1, groups=2)
+        self.add(groups[0], students[0], 'lead')
+        self.add(groups[1], students[0], 'lead')
+        with self.assertRaisesMessage(RuntimeError, f'Student {students[0].pk} leads groups'):
+            self.migrate()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        users = User.objects.bulk_create([
+            User(username=f'search_{i}', is_student=True) for i in range(1501)
+        ])
+        StudentProfile.objects.bulk_create([
+            StudentProfile(
+                user=user, full_name=f'Rahul {i:04d}', section='B' if i % 5 == 0 else 'A', passing_year=2026,
+                branch='CSE', degree='B.Tech', mobile_no='9000000000', email_id=f'student{i}@example.com',
+                abc_id=f'ABC{i:07d}',
+            )
+            for i, user in enumerate(users[:1500])
+        ] + [
+            # Matches "rahul" only through the email address
+            StudentProfile(user=users[1500], full_name='Priya Sharma', section='B', passing_year=2026,
+                           branch='CSE', degree='B.Tech', mobile_no='9000000000', email_id='rahul@example.com',
+                           abc_id='ABC9999999'),
+        ])
+        ProjectGroup.objects.bulk_create([
+            ProjectGroup(name=f'Rover {i:03d}', section='AB'[i % 2], project_title='Mars rover',
+                         problem_statement='-', project_explanation='-', is_approved=i % 3 == 0)
+            for i in range(300)
+        ])
+
+    def search(self, filter_rows, queryset, names, **filters):
+        """Page through every result of a filtered search; return the rows in order."""
+        filters = {name: filters.get(name, '') for name in names}
+        rows, ordering = filter_rows(queryset, filters)
+        found = []
+        page = paginate_keyset(rows, ordering, filters)
+        found.extend(page)
+        while page.has_next:
+            page = paginate_keyset(rows, ordering, filters, page.next_cursor)
+            found.extend(page)
+        return found
+
+    def test_filters_apply_to_every_match(self):
+        found = self.search(filter_students, StudentProfile.objects.all(), STUDENT_FILTERS,
+                            section='B', search='Rahul')
+        self.assertEqual(len(found), 301)
+        self.assertEqual({student.section for student in found}, {'B'})
+
+    def test_broad_search_reaches_every_match(self):
+        found = self.search(filter_students, StudentProfile.objects.all(), STUDENT_FILTERS, search='Rahul')
+        self.assertEqual(len({student.user_id for student in found}), 1501)
+
+    def test_name_matches_rank_above_email_matches(self):
+        found = self.search(filter_students, StudentProfile.objects.all(), STUDENT_FILTERS,
+                            section='B', search='rahul')
+        self.assertEqual(found[-1].full_name, 'Priya Sharma')
+
+    def test_group_search_with_filters(self):
+        found = self.search(filter_groups, ProjectGroup.objects.with_summary(), GROUP_FILTERS,
+                            section='A', status='approved', search='rover')
+        expected = [i for i in range(300) if i % 2 == 0 and i % 3 == 0]
+        self.assertEqual(sorted(group.name for group in found), [f'Rover {i:03d}' for i in expected])
+
+
+class TamperedCursorTests(TestCase):
+    CURSORS = [
+        {'key': [{'nested': 1}, 1], 'direction': 'next'},
+        {'key': [True, 1], 'direction': 'next'},
+        {'key': ['not a date', 'not a number'], 'direction': 'next'},
+        {'key': [1, 2, 3, 4, 5], 'direction': 'previous'},
+        {'filters': {'section': ['A'], 'mentor': 5, 'status': None}, 'key': [1, 1]},
+        {'filters': 'section=A', 'key': [1, 1]},
+        ['not', 'an', 'object'],
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixtures = seed_dataset(students=30, groups=6, submissions=4)
+
+    def test_tampered_cursors_restart_from_the_first_page(self):
+        self.client.force_login(self.fixtures['users']['teacher'])
+        for name in ('view_students', 'view_all_groups', 'teacher_all_submissions',
+                     'api_group_list', 'api_student_list', 'api_submission_list'):
+            first = self.client.get(reverse(name))
+            for payload in self.CURSORS:
+                with self.subTest(view=name, cursor=payload):
+                    response = self.client.get(reverse(name), {'cursor': encode_cursor(payload)})
+                    self.assertEqual(response.status_code, 200)
+                    if name.startswith('api_'):
+                        self.assertEqual(response.json()['results'], first.json()['results'])
+
+    def test_valid_cursor_still_pages(self):
+        groups = ProjectGroup.objects.all()
+        first = paginate_keyset(groups, ['-updated_at', '-id'], page_size=2)
+        second = paginate_keyset(groups, ['-updated_at', '-id'], cursor=first.next_cursor, page_size=2)
+        self.assertTrue(second.object_list)
+        self.assertFalse(set(first.object_list) & set(second.object_list))
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixtures = seed_dataset(students=12, groups=3, submissions=2)
+
+    def setUp(self):
+        self.client.force_login(self.fixtures['users']['teacher'])
+        self.detail = reverse('api_group_detail', args=[self.fixtures['group_id']])
+
+    def test_sparse_fields(self):
+        response = self.client.get(reverse('api_group_list'), {'fields': 'id,name'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertTrue(results)
+        self.assertTrue(all(list(row) == ['id', 'name'] for row in results))
+
+        group = self.client.get(self.detail, {'fields': 'members,id'}).json()
+        self.assertEqual(list(group), ['members', 'id'])
+        self.assertEqual(group['id'], self.fixtures['group_id'])
+
+        students = self.client.get(reverse('api_student_list'), {'fields': 'full_name'}).json()['results']
+        self.assertTrue(all(list(row) == ['full_name'] for row in students))
+
+    def test_unknown_fields_are_refused(self):
+        for name in ('api_group_list', 'api_student_list', 'api_submission_list'):
+            with self.subTest(view=name):
+                response = self.client.get(reverse(name), {'fields': 'id,password'})
+                self.assertEqual(response.status_code, 400)
+                error = response.json()['error']
+                self.assertIn('password', error)
+                self.assertIn('Available: id,', error)
+        response = self.client.get(self.detail, {'fields': 'secret'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('project_title', response.json()['error'])
+
+    def test_etag_changes_after_a_write(self):
+        first = self.client.get(self.detail)
+        self.assertEqual(self.client.get(self.detail)['ETag'], first['ETag'])
+        self.assertNotEqual(self.client.get(self.detail, {'fields': 'id'})['ETag'], first['ETag'])
+
+        group = ProjectGroup.objects.get(id=self.fixtures['group_id'])
+        group.project_title = 'Renamed rover'
+        group.save()
+        second = self.client.get(self.detail)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.json()['project_title'], 'Renamed rover')
+
+        listing = self.client.get(reverse('api_group_list'))
+        GroupMember.objects.get(id=self.fixtures['member_id']).delete()
+        self.assertNotEqual(self.client.get(reverse('api_group_list'))['ETag'], listing['ETag'])
+
+    def test_matching_if_none_match_is_not_modified(self):
+        for url in (self.detail, reverse('api_group_list'), reverse('api_submission_list')):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+                self.assertEqual(response['ETag'], etag)
+                stale = self.client.get(url, HTTP_IF_NONE_MATCH='"stale"')
+                self.assertEqual(stale.status_code, 200)
+
+
+class ChunkedUploadTests(ScratchFilesTestCase):
+    BODY = os.urandom(300 * 1024)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixtures = seed_dataset(students=8, groups=2, submissions=0)
+
+    def setUp(self):
+        # Partial files are not rolled back with the database
+        shutil.rmtree(settings.UPLOAD_TEMP_DIR, ignore_errors=True)
+        uploads._hashers.clear()
+        self.client.force_login(self.fixtures['users']['student'])
+
+    def start(self, body=BODY, **extra):
+        response = self.client.post(reverse('start_upload', args=[self.fixtures['group_id']]),
+                                    dict({'doc_type': 'srs', 'filename': 'srs.pdf', 'size': len(body)}, **extra))
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def put(self, status, start, end, body=BODY):
+        return self.client.put(status['url'], body[start:end], content_type='application/octet-stream',
+                               headers={'Content-Range': f'bytes {start}-{end - 1}/{len(body)}'})
+
+    def assertAttached(self, body=BODY):
+        version = SubmissionVersion.objects.get(group_id=self.fixtures['group_id'], doc_type='srs')
+        self.assertEqual(version.sha256, hashlib.sha256(body).hexdigest())
+        with version.file.open('rb') as stored:
+            self.assertEqual(stored.read(), body)
+
+    def test_upload_in_chunks(self):
+        status = self.start()
+        for start in range(0, len(self.BODY), 128 * 1024):
+            response = self.put(status, start, min(start + 128 * 1024, len(self.BODY)))
+            self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertTrue(result['complete'])
+        self.assertEqual(result['sha256'], hashlib.sha256(self.BODY).hexdigest())
+        self.assertAttached()
+        self.assertFalse(os.path.exists(uploads.partial_path(UploadSession.objects.get(pk=status['upload_id']))))
+
+    def test_resume_on_another_worker(self):
+        status = self.start()
+        self.put(status, 0, 100 * 1024)
+
+        # Starting the same file again picks the session up where it stopped
+        resumed = self.start()
+        self.assertEqual(resumed['upload_id'], status['upload_id'])
+        self.assertEqual(resumed['offset'], 100 * 1024)
+        self.assertEqual(self.client.get(status['url']).json()['offset'], 100 * 1024)
+
+        # A worker that did not see the first chunk rebuilds the running hash from disk
+        uploads._hashers.clear()
+        result = self.put(status, 100 * 1024, len(self.BODY)).json()
+        self.assertEqual(result['sha256'], hashlib.sha256(self.BODY).hexdigest())
+        self.assertAttached()
+
+    def test_resume_after_a_partial_chunk(self):
+        status = self.start()
+        self.put(status, 0, 100 * 1024)
+        session = UploadSession.objects.get(pk=status['upload_id'])
+
+        # The connection drops 10 KiB into a 100 KiB chunk
+        with self.assertRaises(uploads.UploadError):
+            uploads.store_chunk(session, 100 * 1024, 100 * 1024, io.BytesIO(self.BODY[100 * 1024:110 * 1024]))
+        session.refresh_from_db()
+        self.assertEqual(session.received, 100 * 1024)
+        self.assertEqual(os.path.getsize(uploads.partial_path(session)), 100 * 1024)
+
+        self.put(status, 100 * 1024, len(self.BODY))
+        self.assertAttached()
+
+    def test_out_of_order_chunk_is_refused(self):
+        status = self.start()
+        response = self.put(status, 100 * 1024, 200 * 1024)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 0)
+        response = self.put(status, 0, 100 * 1024)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['offset'], 100 * 1024)
+
+    def test_a_retried_chunk_cannot_overwrite_a_stored_one(self):
+        status = self.start()
+        stale = UploadSession.objects.get(pk=status['upload_id'])
+        self.put(status, 0, 100 * 1024)
+
+        # A retry of the first chunk with other bytes, seen by a worker that
+        # still thinks the upload is at offset 0
+        with self.assertRaises(uploads.UploadError) as refused:
+            uploads.store_chunk(stale, 0, 100 * 1024, io.BytesIO(bytes(100 * 1024)))
+        self.assertEqual(refused.exception.status, 409)
+        self.assertEqual(stale.received, 100 * 1024)
+
+        self.put(status, 100 * 1024, len(self.BODY))
+        self.assertAttached()
+
+    def test_upload_size_limit_follows_the_settings(self):
+        with self.settings(UPLOAD_MAX_SIZE=len(self.BODY) - 1):
+            response = self.client.post(reverse('start_upload', args=[self.fixtures['group_id']]),
+                                        {'doc_type': 'srs', 'filename': 'srs.pdf', 'size': len(self.BODY)})
+        self.assertEqual(response.status_code, 413)
+
+    def test_checksum_mismatch_discards_the_upload(self):
+        status = self.start(sha256='0' * 64)
+        response = self.put(status, 0, len(self.BODY))
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(UploadSession.objects.filter(pk=status['upload_id']).exists())
+        self.assertFalse(os.listdir(settings.UPLOAD_TEMP_DIR))
+        self.assertFalse(SubmissionVersion.objects.filter(group_id=self.fixtures['group_id'], doc_type='srs').exists())
+
+    def test_purge_discards_only_abandoned_uploads(self):
+        abandoned = self.start()
+        self.put(abandoned, 0, 100 * 1024)
+        active = self.start(body=self.BODY[:200 * 1024], filename='other.pdf')
+        long_ago = timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_MAX_AGE + 60)
+        UploadSession.objects.filter(pk__in=[abandoned['upload_id'], active['upload_id']]).update(
+            created_at=long_ago, updated_at=long_ago
+        )
+
+        # A chunk arriving now keeps the older session alive
+        self.put(active, 0, 100 * 1024, body=self.BODY[:200 * 1024])
+
+        self.assertEqual(uploads.purge_stale_uploads(), 1)
+        self.assertFalse(UploadSession.objects.filter(pk=abandoned['upload_id']).exists())
+        self.assertEqual(os.listdir(settings.UPLOAD_TEMP_DIR), [f"{active['upload_id']}.part"])
+
+
+class DownloadTests(ScratchFilesTestCase):
+    BODY = b'%PDF-1.4\n0123456789'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixtures = seed_dataset(students=8, groups=2, submissions=0)
+        group = ProjectGroup.objects.get(pk=cls.fixtures['group_id'])
+        attach_files(group, {'srs': ContentFile(cls.BODY, name='srs.pdf'), 'ppt': ContentFile(b'', name='ppt.pdf')})
+        group.refresh_from_db()
+        cls.url = reverse('download_submission_version', args=[group.current_srs_id])
+        cls.empty_url = reverse('download_submission_version', args=[group.current_ppt_id])
+
+    def setUp(self):
+        self.client.force_login(self.fixtures['users']['student'])
+
+    def get(self, url=None, **headers):
+        response = self.client.get(url or self.url, headers=headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_whole_file(self):
+        response, body = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.BODY)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['ETag'], f'"{hashlib.sha256(self.BODY).hexdigest()}"')
+
+    def test_ranges(self):
+        size = len(self.BODY)
+        for header, start, end in (('bytes=2-5', 2, 5), ('bytes=-3', size - 3, size - 1),
+                                   ('bytes=4-', 4, size - 1), ('bytes=0-999', 0, size - 1)):
+            with self.subTest(range=header):
+                response, body = self.get(Range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{size}')
+                self.assertEqual(body, self.BODY[start:end + 1])
+
+    def test_unsatisfiable_ranges(self):
+        size = len(self.BODY)
+        for url, header, size in ((None, f'bytes={size}-', size), (None, 'bytes=-0', size),
+                                  (self.empty_url, 'bytes=-5', 0), (self.empty_url, 'bytes=0-', 0)):
+            with self.subTest(range=header, size=size):
+                response, _ = self.get(url, Range=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], f'bytes */{size}')
+
+    def test_if_range(self):
+        etag = self.get()[0]['ETag']
+        response, body = self.get(Range='bytes=2-5', **{'If-Range': etag})
+        self.assertEqual((response.status_code, body), (206, self.BODY[2:6]))
+        # The client's partial copy is of another version: send it all again
+        response, body = self.get(Range='bytes=2-5', **{'If-Range': '"stale"'})
+        self.assertEqual((response.status_code, body), (200, self.BODY))
+
+    def test_not_modified(self):
+        etag = self.get()[0]['ETag']
+        response, body = self.get(**{'If-None-Match': etag})
+        self.assertEqual((response.status_code, body), (304, b''))
+        self.assertEqual(response['ETag'], etag)
+
+    def test_front_end_server_backends(self):
+        sha256 = hashlib.sha256(self.BODY).hexdigest()
+        blob = default_storage.blob_name(sha256)
+        with self.settings(SENDFILE_BACKEND='nginx'):
+            response, body = self.get()
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected/{blob}')
+        self.assertEqual(body, b'')
+        with self.settings(SENDFILE_BACKEND='xsendfile'):
+            response, body = self.get()
+        self.assertEqual(response['X-Sendfile'], os.path.join(settings.MEDIA_ROOT, blob))
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+
+
+@skipUnless(find_spec('pypdf'), 'reading the report back needs pypdf')
+class StudentReportTests(TestCase):
+    NAMES = ['Anne (Annie) Smith', 'C:\\Users\\backslash', 'Unbalanced ) paren', 'Open ( only', 'José Müller']
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_dataset(students=100, groups=2, submissions=0)
+        students = list(StudentProfile.objects.order_by('pk')[:len(cls.NAMES)])
+        for student, name in zip(students, cls.NAMES):
+            student.full_name = name
+        StudentProfile.objects.bulk_update(students, ['full_name'])
+
+    def test_report_is_a_valid_pdf(self):
+        from pypdf import PdfReader
+
+        students = StudentProfile.objects.order_by('pk')
+        data = b''.join(iter_student_report(students, timezone.now(), chunk_size=7))
+
+        # Every cross-reference entry points at the start of its object
+        xref = data[data.rindex(b'startxref'):].split()[1]
+        entries = data[int(xref):].split(b'trailer')[0].splitlines()[3:]
+        for object_id, entry in enumerate(entries, 1):
+            self.assertTrue(data[int(entry[:10]):].startswith(b'%d 0 obj' % object_id))
+
+        reader = PdfReader(io.BytesIO(data), strict=True)
+        self.assertGreater(len(reader.pages), 1)
+        text = '\n'.join(page.extract_text() for page in reader.pages)
+        for name in self.NAMES:
+            self.assertIn(name, text)
+        self.assertEqual(text.count('ABC'), students.count() + 1)
+
+
+class DedupStorageTests(ScratchFilesTestCase):
+    def test_blob_is_kept_until_its_last_name_is_deleted(self):
+        body = b'%PDF-1.4\nsame report'
+        first = default_storage.save('submissions/srs/first.pdf', ContentFile(body))
+        second = default_storage.save('submissions/srs/second.pdf', ContentFile(body))
+        blob = StoredBlob.objects.get()
+        self.assertEqual(blob.refcount, 2)
+        path = default_storage.path(first)
+        self.assertEqual(path, default_storage.path(second))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            default_storage.delete(first)
+        self.assertEqual(StoredBlob.objects.get().refcount, 1)
+        self.assertTrue(os.path.exists(path))
+        with default_storage.open(second) as stored:
+            self.assertEqual(stored.read(), body)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            default_storage.delete(second)
+        self.assertFalse(StoredBlob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+
+class BatchActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixtures = seed_dataset(students=8, groups=4, submissions=0)
+
+    def setUp(self):
+        self.client.force_login(self.fixtures['users']['teacher'])
+
+    def post_json(self, body):
+        return self.client.post(reverse('batch_approve_groups'), body, content_type='application/json')
+
+    def test_malformed_json_bodies_are_refused(self):
+        group_ids = self.fixtures['mentored_group_ids']
+        self.assertTrue(group_ids)
+        for body in ('[1, 2]', '"approve"', '7', 'null', '{"group_ids": "1,2"}',
+                     '{"group_ids": ["1", "2"]}', '{"group_ids": [true]}', '{"group_ids": [1.5]}', '{'):
+            with self.subTest(body=body):
+                self.assertEqual(self.post_json(body).status_code, 400)
+        response = self.post_json({'group_ids': group_ids, 'action': 'reject'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.json()['updated'] + response.json()['unchanged']), sorted(group_ids))
+
+    def test_form_posts_take_digit_strings(self):
+        group_ids = self.fixtures['mentored_group_ids']
+        response = self.client.post(reverse('batch_approve_groups'), {'group_ids': group_ids, 'action': 'approve'})
+        self.assertEqual(response.status_code, 302)
+        response = self.client.post(reverse('batch_approve_groups'), {'group_ids': ['1x'], 'action': 'approve'})
+        self.assertEqual(response.status_code, 400)
+
+
+class RollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixtures = seed_dataset(students=30, groups=6, submissions=3)
+
+    def snapshot(self):
+        buckets = {
+            (row['section'], row['branch'], row['passing_year']): {counter: row[counter] for counter in ROLLUP_COUNTERS}
+            for row in ProgressRollup.objects.values()
+        }
+        # Buckets emptied by deltas keep a row of zeros; a rebuild has none
+        buckets = {bucket: counts for bucket, counts in buckets.items() if any(counts.values())}
+        states = {state.group_id: (state.section, state.branch, state.passing_year, state.counts)
+                  for state in GroupRollupState.objects.all()}
+        return buckets, states
+
+    def event(self, write):
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+
+    def test_incremental_updates_match_a_rebuild(self):
+        rebuild_rollups()
+        group = ProjectGroup.objects.get(pk=self.fixtures['group_id'])
+        member = GroupMember.objects.exclude(role='lead').filter(group=group).first()
+        free = StudentProfile.objects.filter(section=group.section, groupmember__isnull=True)
+        lead = GroupMember.objects.get(group=group, role='lead').student
+
+        self.event(lambda: withdraw(member))
+        self.event(lambda: enroll(group, free[0]))
+        self.event(lambda: create_group_with_lead(
+            ProjectGroup(name='Late', project_title='Late', problem_statement='-', project_explanation='-'), free[0]
+        ))
+        self.event(lambda: ProjectSubmission.objects.update_or_create(
+            group=group, defaults={'github_link': 'https://github.com/example/late'}
+        ))
+        self.event(lambda: ProjectSubmission.objects.filter(group=group).delete())
+        group.is_approved = not group.is_approved
+        self.event(group.save)
+        lead.branch, lead.passing_year = 'Rollup', 2031
+        # The seeded photo has no file to render thumbnails from
+        lead.id_card_derivatives = {'source': lead.id_card_photo.name}
+        self.event(lead.save)
+        self.event(ProjectGroup.objects.exclude(pk=group.pk).first().delete)
+
+        incremental = self.snapshot()
+        rebuild_rollups()
+        self.assertEqual(incremental, self.snapshot())
+        self.assertIn(('A', 'Rollup', 2031), incremental[0])
+
+
+class SubmissionVersionTests(ScratchFilesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixtures = seed_dataset(students=12, groups=3, submissions=0)
+        cls.group = ProjectGroup.objects.get(pk=cls.fixtures['group_id'])
+        cls.lead = cls.fixtures['users']['student']
+
+    def attach(self, body):
+        return attach_files(self.group, {'srs': ContentFile(body, name='srs.pdf')}, submitted_by=self.lead)
+
+    def history(self):
+        return list(SubmissionVersion.objects.filter(group=self.group, doc_type='srs').order_by('number'))
+
+    def test_uploads_are_numbered_and_made_current(self):
+        self.attach(b'first')
+        submission = self.attach(b'second')
+        first, second = self.history()
+        self.assertEqual((first.number, second.number), (1, 2))
+        self.assertEqual(ProjectGroup.objects.get(pk=self.group.pk).current_srs, second)
+        self.assertEqual(submission.srs_report.name, second.file.name)
+        self.assertEqual(second.sha256, hashlib.sha256(b'second').hexdigest())
+        self.assertEqual(second.submitted_by, self.lead)
+
+    def test_identical_uploads_are_not_stored_twice(self):
+        self.attach(b'first')
+        self.attach(b'first')
+        self.assertEqual(len(self.history()), 1)
+
+        # Going back to an earlier upload is a new version sharing its file
+        self.attach(b'second')
+        self.attach(b'first')
+        first, second, third = self.history()
+        self.assertEqual(third.number, 3)
+        self.assertEqual(default_storage.path(third.file.name), default_storage.path(first.file.name))
+        self.assertEqual(StoredBlob.objects.get(pk=first.sha256).refcount, 2)
+        self.assertEqual(StoredBlob.objects.count(), 2)
+
+    def test_deleting_the_group_frees_its_files(self):
+        self.attach(b'first')
+        self.attach(b'second')
+        self.attach(b'first')
+        paths = {default_storage.path(version.file.name) for version in self.history()}
+        self.assertEqual(len(paths), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.delete()
+        self.assertFalse(StoredBlob.objects.exists())
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+
+    def test_withdrawing_keeps_the_history(self):
+        self.attach(b'first')
+        submission = self.attach(b'second')
+        withdraw_document(submission, 'srs')
+
+        group = ProjectGroup.objects.get(pk=self.group.pk)
+        self.assertIsNone(group.current_srs)
+        self.assertFalse(ProjectSubmission.objects.get(pk=submission.pk).srs_report)
+        self.assertEqual(len(self.history()), 2)
+
+        # Numbering carries on from the history, even re-sending the last version
+        self.attach(b'second')
+        self.assertEqual([version.number for version in self.history()], [1, 2, 3])
+        self.assertEqual(ProjectGroup.objects.get(pk=self.group.pk).current_srs.number, 3)
+
+    def test_history_is_only_shown_to_members_and_teachers(self):
+        self.attach(b'first')
+        version, = self.history()
+        history_url = reverse('submission_history', args=[self.group.pk, 'srs'])
+        download_url = reverse('download_submission_version', args=[version.pk])
+        outsider = GroupMember.objects.filter(role='lead').exclude(group=self.group).first().student.user
+
+        for user in (self.lead, self.fixtures['users']['teacher']):
+            with self.subTest(user=user.username):
+                self.client.force_login(user)
+                self.assertContains(self.client.get(history_url), 'v1')
+                response = self.client.get(download_url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(b''.join(response.streaming_content), b'first')
+
+        self.client.force_login(outsider)
+        self.assertRedirects(self.client.get(history_url), reverse('dashboard'), fetch_redirect_response=False)
+        self.assertEqual(self.client.get(download_url).status_code, 404)
+
+
+class EnrollmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_dataset(students=40, groups=2, submissions=0)
+        cls.free = list(StudentProfile.objects.filter(section='A', groupmember__isnull=True).order_by('pk'))
+        cls.group, cls.other = [
+            create_group_with_lead(
+                ProjectGroup(name=name, project_title=name, problem_statement='-', project_explanation='-'), lead
+            )
+            for name, lead in (('Full', cls.free[0]), ('Open', cls.free[-1]))
+        ]
+        for student in cls.free[1:MAX_GROUP_SIZE]:
+            enroll(cls.group, student)
+
+    def assertRefused(self, message, *args, **kwargs):
+        with self.assertRaisesMessage(EnrollmentError, message):
+            enroll(*args, **kwargs)
+
+    def test_full_group(self):
+        self.assertRefused('This group is already full.', self.group, self.free[MAX_GROUP_SIZE])
+        # The last place was taken between reading the free roles and the insert
+        with mock.patch('projects.enrollment._free_roles', return_value=['member3']):
+            self.assertRefused('This group is already full.', self.group, self.free[MAX_GROUP_SIZE])
+        self.assertEqual(self.group.members.count(), MAX_GROUP_SIZE)
+
+    def test_student_already_in_a_group(self):
+        self.assertRefused('This student is already in a group.', self.other, self.free[1])
+        self.assertRefused('This student is already in a group.', self.other, self.free[1], role='member3')
+
+    def test_role_taken(self):
+        self.assertRefused('That role is already taken in this group.', self.group, self.free[MAX_GROUP_SIZE],
+                           role='member1')
+
+
+class AllocationTests(TestCase):
+    def create_teacher(self, name, department, capacity):
+        user = User.objects.create_user(username=name.lower(), is_teacher=True)
+        return TeacherProfile.objects.create(user=user, full_name=name, mobile_no='9000000000',
+                                             email_id=f'{name.lower()}@example.com', department=department,
+                                             mentor_capacity=capacity)
+
+    def create_groups(self, branch, count, mentor=None):
+        groups = []
+        for _ in range(count):
+            number = StudentProfile.objects.count()
+            lead = create_student(f'Student {number}', f'ALC{number:07d}', branch=branch)
+            groups.append(create_group_with_lead(
+                ProjectGroup(name=f'{branch} {number}', project_title='-', problem_statement='-',
+                             project_explanation='-', mentor=mentor), lead
+            ))
+        return groups
+
+    def mentors(self, plan):
+        return {assignment.group_id: assignment.teacher for assignment in plan.assignments}
+
+    def test_teachers_are_never_given_more_than_their_capacity(self):
+        busy = self.create_teacher('Busy', 'CSE', 2)
+        spare = self.create_teacher('Spare', 'CSE', 1)
+        self.create_teacher('Away', 'CSE', 0)
+        self.create_groups('CSE', 1, mentor=busy)
+        pending = self.create_groups('CSE', 4)
+
+        plan = plan_allocation()
+        self.assertEqual(plan.loads_before, {busy.pk: 1})
+        self.assertEqual(plan.loads_after, {busy.pk: 2, spare.pk: 1})
+        self.assertEqual(len(plan.assignments), 2)
+        self.assertEqual(sorted(group_id for group_id, _, _ in plan.unassigned),
+                         sorted(set(group.id for group in pending) - set(self.mentors(plan))))
+
+        self.assertEqual(apply_allocation(plan), 2)
+        loads = Counter(ProjectGroup.objects.filter(mentor__isnull=False).values_list('mentor_id', flat=True))
+        self.assertEqual(loads, {busy.pk: 2, spare.pk: 1})
+
+    def test_matching_department_first_then_least_loaded(self):
+        cse = [self.create_teacher(f'Cse{i}', 'CSE', 3) for i in range(2)]
+        ece = self.create_teacher('Ece', 'ECE', 3)
+        cse_groups = self.create_groups('CSE', 4)
+        ece_groups = self.create_groups('ECE', 2)
+
+        mentors = self.mentors(plan_allocation())
+        self.assertEqual({mentors[group.id] for group in ece_groups}, {ece})
+        # Two each rather than filling the first teacher to capacity
+        self.assertEqual(Counter(mentors[group.id] for group in cse_groups), {cse[0]: 2, cse[1]: 2})
+
+        # Affinity is only given up once every matching teacher is full
+        more = self.create_groups('CSE', 3)
+        plan = plan_allocation()
+        mentors = self.mentors(plan)
+        self.assertEqual(Counter(mentors[group.id].department for group in cse_groups + more),
+                         {'CSE': 6, 'ECE': 1})
+        self.assertEqual(sum(not assignment.affinity for assignment in plan.assignments), 1)
+        self.assertFalse(plan.unassigned)
+
+    def test_more_groups_than_places(self):
+        pending = self.create_groups('CSE', 3)
+        plan = plan_allocation()
+        self.assertEqual(plan.assignments, [])
+        self.assertEqual(sorted(group_id for group_id, _, _ in plan.unassigned), [group.id for group in pending])
+        versions = DataVersion.current(DataVersion.GROUPS)
+        self.assertEqual(apply_allocation(plan), 0)
+        self.assertEqual(DataVersion.current(DataVersion.GROUPS), versions)
+
+        teacher = self.create_teacher('Solo', 'ECE', 2)
+        plan = plan_allocation()
+        self.assertEqual(len(plan.assignments), 2)
+        self.assertEqual(len(plan.unassigned), 1)
+        # A group assigned by hand since the plan was made is left alone
+        other = self.create_teacher('Other', 'CSE', 1)
+        ProjectGroup.objects.filter(id=plan.assignments[0].group_id).update(mentor=other)
+        self.assertEqual(apply_allocation(plan), 1)
+        self.assertEqual(ProjectGroup.objects.filter(mentor=teacher).count(), 1)
+        self.assertGreater(DataVersion.current(DataVersion.GROUPS), versions)
+
+
+class FormationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        branches = ['CSE'] * 9 + ['ECE'] * 5 + ['ME'] * 3
+        cls.students = [create_student(f'Student {i:02d}', f'FRM{i:07d}', branch=branch)
+                        for i, branch in enumerate(branches)]
+        cls.other_section = create_student('Student B', 'FRMB000000', section='B')
+        cls.partial = create_group_with_lead(
+            ProjectGroup(name='Partial', project_title='-', problem_statement='-', project_explanation='-'),
+            cls.students[0],
+        )
+        enroll(cls.partial, cls.students[1])
+
+    def test_every_student_in_the_section_is_placed(self):
+        form_groups('A')
+        members = GroupMember.objects.select_related('group', 'student')
+        self.assertEqual(sorted(member.student_id for member in members),
+                         sorted(student.pk for student in self.students))
+        self.assertFalse(GroupMember.objects.filter(student=self.other_section).exists())
+        self.assertTrue(all(member.group.section == member.student.section == 'A' for member in members))
+
+        sizes = Counter(member.group_id for member in members)
+        self.assertEqual(sizes.pop(self.partial.id), MAX_GROUP_SIZE)
+        self.assertTrue(all(size <= MAX_GROUP_SIZE for size in sizes.values()))
+        self.assertLessEqual(max(sizes.values()) - min(sizes.values()), 1)
+        self.assertEqual(len(sizes), -(-(len(self.students) - MAX_GROUP_SIZE) // MAX_GROUP_SIZE))
+        for group_id in sizes:
+            roles = list(GroupMember.objects.filter(group_id=group_id).values_list('role', flat=True))
+            self.assertIn('lead', roles)
+            self.assertEqual(len(set(roles)), len(roles))
+
+        # Already placed: a second run has nothing to do
+        self.assertEqual(form_groups('A').students_placed, 0)
+
+    def test_dry_run_writes_nothing(self):
+        plan = form_groups('A', dry_run=True)
+        self.assertEqual(plan.students_placed, len(self.students) - 2)
+        self.assertEqual(GroupMember.objects.count(), 2)
+        self.assertEqual(ProjectGroup.objects.count(), 1)
+
+    def test_caches_are_invalidated(self):
+        # Warm the caches bulk_create goes around
+        user = self.students[-1].user
+        self.assertEqual(load_principal(user).group_ids, [])
+        self.assertEqual(len(available_students('A')), len(self.students) - 2)
+        versions = DataVersion.current_many(DataVersion.MEMBERS, DataVersion.GROUPS)
+        partial_version = self.partial.version
+
+        with self.captureOnCommitCallbacks(execute=True):
+            form_groups('A')
+
+        group_id = GroupMember.objects.get(student=self.students[-1]).group_id
+        self.assertEqual(load_principal(user).group_ids, [group_id])
+        self.assertEqual(available_students('A'), [])
+        after = DataVersion.current_many(DataVersion.MEMBERS, DataVersion.GROUPS)
+        self.assertGreater(after[DataVersion.MEMBERS], versions[DataVersion.MEMBERS])
+        self.assertGreater(after[DataVersion.GROUPS], versions[DataVersion.GROUPS])
+        self.partial.refresh_from_db()
+        self.assertGreater(self.partial.version, partial_version)
+
+
+class BundleTests(ScratchFilesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create_user(username='bundler', is_teacher=True)
+        cls.contents = {}
+        for name, files in (
+            ('Rover/One', {'ppt': 'slides.pptx', 'srs': 'srs.txt'}),
+            ('Twin', {'synopsis': 'synopsis.PDF'}),
+            ('Twin', {'srs': 'srs.txt'}),
+        ):
+            group = ProjectGroup.objects.create(name=name, section='A', project_title='-', problem_statement='-',
+                                                project_explanation='-')
+            documents = {}
+            for doc_type, filename in files.items():
+                # Big enough that the archive is streamed in several blocks
+                data = os.urandom(BUNDLE_BLOCK_SIZE + 1000) if doc_type == 'ppt' else (f'{name} ' * 5000).encode()
+                documents[doc_type] = ContentFile(data, name=filename)
+                cls.contents[group.id, doc_type] = data
+            attach_files(group, documents)
+        cls.twins = list(ProjectGroup.objects.filter(name='Twin').order_by('id').values_list('id', flat=True))
+
+    def test_streamed_archive_holds_every_document(self):
+        self.client.force_login(self.teacher)
+        response = self.client.get(reverse('download_submission_bundle'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertTrue(response.streaming)
+        blocks = list(response.streaming_content)
+        self.assertGreater(len(blocks), 1)
+
+        rover = ProjectGroup.objects.get(name='Rover/One').id
+        expected = {
+            'Rover_One/ppt.pptx': (rover, 'ppt', zipfile.ZIP_STORED),
+            'Rover_One/srs.txt': (rover, 'srs', zipfile.ZIP_DEFLATED),
+            'Twin/synopsis.pdf': (self.twins[0], 'synopsis', zipfile.ZIP_STORED),
+            f'Twin ({self.twins[1]})/srs.txt': (self.twins[1], 'srs', zipfile.ZIP_DEFLATED),
+        }
+        with zipfile.ZipFile(io.BytesIO(b''.join(blocks))) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(sorted(archive.namelist()), sorted(expected))
+            for info in archive.infolist():
+                group_id, doc_type, compress_type = expected[info.filename]
+                with self.subTest(member=info.filename):
+                    self.assertEqual(info.compress_type, compress_type)
+                    self.assertEqual(archive.read(info), self.contents[group_id, doc_type])
+                    if compress_type == zipfile.ZIP_DEFLATED:
+                        self.assertLess(info.compress_size, info.file_size)
+
+    def test_filters_narrow_the_archive(self):
+        self.client.force_login(self.teacher)
+        response = self.client.get(reverse('download_submission_bundle'), {'search': 'rover'})
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(sorted(archive.namelist()), ['Rover_One/ppt.pptx', 'Rover_One/srs.txt'])
+
+        response = self.client.get(reverse('download_submission_bundle'), {'section': 'B'})
+        self.assertRedirects(response, reverse('view_all_groups') + '?section=B', fetch_redirect_response=False)
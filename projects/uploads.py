@@ -0,0 +1,192 @@
+import hashlib
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import UploadSession
+from .submissions import attach_files
+
+
+READ_BLOCK_SIZE = 64 * 1024
+
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+# Running SHA-256 state per session: id -> (offset hashed so far, hasher).
+# hashlib objects cannot be stored in the database, so a worker that did
+# not see the previous chunk rebuilds the state from the partial file once.
+_hashers = OrderedDict()
+_MAX_HASHERS = 256
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def partial_path(session):
+    return os.path.join(settings.UPLOAD_TEMP_DIR, f'{session.pk}.part')
+
+
+def parse_content_range(header):
+    """Return ``(start, end, total)`` from a ``Content-Range`` header."""
+    match = CONTENT_RANGE.match(header or '')
+    if not match:
+        raise UploadError('A "Content-Range: bytes start-end/total" header is required.')
+    start, end, total = (int(value) for value in match.groups())
+    if end < start:
+        raise UploadError('Invalid Content-Range.')
+    return start, end, total
+
+
+def _hasher_for(session, offset):
+    cached = _hashers.pop(session.pk, None)
+    if cached and cached[0] == offset:
+        hasher = cached[1]
+    else:
+        hasher = hashlib.sha256()
+        with open(partial_path(session), 'rb') as partial:
+            remaining = offset
+            while remaining:
+                block = partial.read(min(READ_BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                hasher.update(block)
+                remaining -= len(block)
+    return hasher
+
+
+def _remember_hasher(session, offset, hasher):
+    _hashers[session.pk] = (offset, hasher)
+    while len(_hashers) > _MAX_HASHERS:
+        _hashers.popitem(last=False)
+
+
+def _spool_chunk(stream, length):
+    """Read exactly ``length`` bytes of ``stream`` into a temporary file, or raise."""
+    spooled = tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_CHUNK_SIZE, dir=settings.UPLOAD_TEMP_DIR)
+    received = 0
+    while received < length:
+        block = stream.read(min(READ_BLOCK_SIZE, length - received))
+        if not block:
+            break
+        spooled.write(block)
+        received += len(block)
+    if received != length:
+        # The client disconnected mid-chunk; the partial file is untouched
+        spooled.close()
+        raise UploadError('Incomplete chunk received.')
+    spooled.seek(0)
+    return spooled
+
+
+def append_chunk(session, start, length, stream):
+    """Write ``length`` bytes from ``stream`` at ``start`` and return the new offset.
+
+    Chunks must arrive in order: a chunk that does not start at the current
+    offset is rejected with 409 so the client can ask where to resume from.
+    The chunk is received into a spool file first; only then is the range
+    claimed on the session row and the bytes copied into the partial file,
+    so two requests for the same offset (a client retry, say) cannot both
+    write and the loser never touches the file.
+    """
+    if session.status != 'active':
+        raise UploadError('This upload is already complete.', status=409)
+    if start != session.received:
+        raise UploadError(f'Expected a chunk starting at byte {session.received}.', status=409)
+    if length > settings.UPLOAD_CHUNK_MAX_SIZE:
+        raise UploadError('Chunk too large.', status=413)
+    if start + length > session.size:
+        raise UploadError('Chunk runs past the declared file size.')
+
+    os.makedirs(settings.UPLOAD_TEMP_DIR, exist_ok=True)
+    path = partial_path(session)
+    offset = start + length
+    with _spool_chunk(stream, length) as chunk, transaction.atomic():
+        # Claim the range before writing: the UPDATE holds the row (the whole
+        # database on SQLite) until the bytes are in, and a failed write
+        # rolls the claim back. update() skips auto_now; updated_at is what
+        # purge_stale_uploads() ages by.
+        claimed = UploadSession.objects.filter(pk=session.pk, received=start, status='active').update(
+            received=offset, updated_at=timezone.now()
+        )
+        if not claimed:
+            _hashers.pop(session.pk, None)
+            current = UploadSession.objects.filter(pk=session.pk).values('status', 'received').first()
+            if current is None or current['status'] != 'active':
+                raise UploadError('This upload is already complete.', status=409)
+            session.received = current['received']
+            raise UploadError(f'Expected a chunk starting at byte {session.received}.', status=409)
+
+        hasher = _hasher_for(session, start) if start else hashlib.sha256()
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as partial:
+            partial.seek(start)
+            for block in iter(lambda: chunk.read(READ_BLOCK_SIZE), b''):
+                partial.write(block)
+                hasher.update(block)
+            partial.truncate()
+    session.received = offset
+    _remember_hasher(session, offset, hasher)
+    return offset
+
+
+def complete_upload(session):
+    """Verify the assembled file and attach it to the group's submission."""
+    hasher = _hasher_for(session, session.received)
+    digest = hasher.hexdigest()
+    if session.sha256 and session.sha256.lower() != digest:
+        discard_upload(session)
+        raise UploadError('Checksum mismatch; the upload has been discarded.', status=422)
+
+    path = partial_path(session)
+    with transaction.atomic():
+        locked = UploadSession.objects.select_for_update().select_related('group', 'created_by').get(pk=session.pk)
+        if locked.status != 'active':
+            raise UploadError('This upload is already complete.', status=409)
+        with open(path, 'rb') as assembled:
+            attach_files(locked.group, {locked.doc_type: File(assembled, name=locked.filename)},
+                         submitted_by=locked.created_by, digests={locked.doc_type: (digest, locked.size)})
+        locked.status = 'complete'
+        locked.sha256 = digest
+        locked.save(update_fields=['status', 'sha256', 'updated_at'])
+
+    _hashers.pop(session.pk, None)
+    os.remove(path)
+    session.status = 'complete'
+    session.sha256 = digest
+    return session
+
+
+def store_chunk(session, start, length, stream):
+    """Append one chunk and, once the last byte is in, complete the upload."""
+    append_chunk(session, start, length, stream)
+    if session.received == session.size:
+        complete_upload(session)
+    return session
+
+
+def discard_upload(session):
+    _hashers.pop(session.pk, None)
+    path = partial_path(session)
+    if os.path.exists(path):
+        os.remove(path)
+    session.delete()
+
+
+def purge_stale_uploads(max_age=None):
+    """Discard unfinished sessions not touched for ``max_age`` seconds; return how many."""
+    if max_age is None:
+        max_age = settings.UPLOAD_SESSION_MAX_AGE
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    stale = list(UploadSession.objects.filter(status='active', updated_at__lt=cutoff))
+    for session in stale:
+        discard_upload(session)
+    UploadSession.objects.filter(status='complete', updated_at__lt=cutoff).delete()
+    return len(stale)
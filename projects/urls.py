@@ -13,6 +13,8 @@ urlpatterns = [
     path('groups/<int:group_id>/delete/', views.delete_group, name='delete_group'),
 
     path('groups/<int:group_id>/submit/<str:doc_type>/', views.submit_document, name='submit_document'),
+    path('groups/<int:group_id>/uploads/', views.start_upload, name='start_upload'),
+    path('uploads/<uuid:upload_id>/', views.upload_chunk, name='upload_chunk'),
 
     
     
@@ -22,8 +24,15 @@ urlpatterns = [
     path('teacher/students/', views.view_students, name='view_students'),
     path('teacher/groups/', views.view_all_groups, name='view_all_groups'),
     path('teacher/download/', views.download_student_data, name='download_student_data'),
+    path('teacher/reports/<int:job_id>/status/', views.report_status, name='report_status'),
+    path('teacher/reports/<int:job_id>/download/', views.download_report, name='download_report'),
     path('teacher/group/<int:group_id>/approve/', views.approve_group, name='approve_group'),
     path('teacher/group/<int:group_id>/assign-mentor/', views.assign_mentor, name='assign_mentor'),
+    path('teacher/groups/approve/', views.batch_approve_groups, name='batch_approve_groups'),
+    path('teacher/groups/assign-mentor/', views.batch_assign_mentor, name='batch_assign_mentor'),
+    path('teacher/groups/allocate-mentors/', views.allocate_mentors, name='allocate_mentors'),
+    path('teacher/groups/submissions.zip', views.download_submission_bundle, name='download_submission_bundle'),
+    path('teacher/analytics/', views.teacher_analytics, name='teacher_analytics'),
     
     path('teacher/group/<int:group_id>/', views.teacher_group_view, name='teacher_group_view'),
     path('teacher/submissions/', views.teacher_all_submissions, name='teacher_all_submissions'),
@@ -35,6 +44,8 @@ urlpatterns = [
     # path('download/srs/<int:submission_id>/', views.download_srs, name='download_srs'),
     path('groups/<int:group_id>/', views.group_detail, name='group_detail'),
     path('submission/download/<int:submission_id>/<str:file_type>/', views.download_submission, name='download_submission'),
+    path('groups/<int:group_id>/history/<str:file_type>/', views.submission_history, name='submission_history'),
+    path('submission/version/<int:version_id>/download/', views.download_submission_version, name='download_submission_version'),
     path('submission/delete/<int:submission_id>/<str:file_type>/', views.delete_submission, name='delete_submission'),
 
 
@@ -1,17 +1,39 @@
-from datetime import timezone
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse, FileResponse
+from django.http import HttpResponse, JsonResponse, FileResponse, StreamingHttpResponse, Http404
 from django.template.loader import render_to_string
-from django.db.models import Q
+from django.db import transaction
+from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.core.files.storage import default_storage
+from django.views.static import serve
 
+import json
 import tempfile
 import os
 
-from project_portal import settings
-from .models import ProjectGroup, GroupMember, ProjectSubmission
+from .models import (
+    MAX_GROUP_SIZE, DataVersion, ProgressRollup, ProjectGroup, GroupMember, ProjectSubmission, ReportJob,
+    SubmissionVersion, UploadSession,
+)
 from .forms import GitHubSubmissionForm, PresentationSubmissionForm, ProjectGroupForm, GroupMemberForm, ProjectSubmissionForm, ReportSubmissionForm
+from .pagination import cursor_filters, paginate_keyset
+from .rollups import COUNTERS as ROLLUP_COUNTERS, schedule_refresh
+from .allocation import apply_allocation, plan_allocation
+from .bundles import bundle_entries, iter_bundle
+from .availability import available_students as available_students_in
+from .downloads import serve_file
+from .enrollment import EnrollmentError, create_group as create_group_with_lead, enroll, withdraw
+from .facets import group_facets, student_facets
+from .listings import GROUP_FILTERS, STUDENT_FILTERS, filter_groups, filter_students
+from .report_jobs import enqueue_student_report, report_path, student_report_queryset
+from .reports import iter_student_report
+from .submissions import CURRENT_FIELDS, DOCUMENT_FIELDS, HISTORY_PAGE_SIZE, attach_files, withdraw_document
+from .uploads import UploadError, discard_upload, parse_content_range, store_chunk
 from accounts.models import StudentProfile, TeacherProfile
 
 
@@ -23,30 +45,25 @@ def create_group(request):
     if not request.user.is_student:
         return redirect('dashboard')
     
-    try:
-        student_profile = StudentProfile.objects.get(user=request.user)
-    except StudentProfile.DoesNotExist:
+    student_profile = request.principal.student_profile
+    if student_profile is None:
         messages.error(request, 'Please complete your profile first.')
         return redirect('complete_student_profile')
     
     # Check if student is already in a group
-    if GroupMember.objects.filter(student=student_profile).exists():
+    if request.principal.memberships:
         messages.error(request, 'You are already a member of a group.')
         return redirect('my_groups')
     
     if request.method == 'POST':
         group_form = ProjectGroupForm(request.POST)
         if group_form.is_valid():
-            group = group_form.save(commit=False)
-            group.section = student_profile.section
-            group.save()
-            
-            # Add the current user as team lead
-            GroupMember.objects.create(
-                group=group,
-                student=student_profile,
-                role='lead'
-            )
+            try:
+                # Saves the group and adds the current user as team lead
+                group = create_group_with_lead(group_form.save(commit=False), student_profile)
+            except EnrollmentError as exc:
+                messages.error(request, str(exc))
+                return redirect('my_groups')
             
             messages.success(request, 'Group created successfully! Now add members to your group.')
             return redirect('add_members', group_id=group.id)
@@ -60,16 +77,18 @@ def my_groups(request):
     if not request.user.is_student:
         return redirect('dashboard')
     
-    try:
-        student_profile = StudentProfile.objects.get(user=request.user)
-    except StudentProfile.DoesNotExist:
+    student_profile = request.principal.student_profile
+    if student_profile is None:
         messages.error(request, 'Please complete your profile first.')
         return redirect('complete_student_profile')
     
-    groups = ProjectGroup.objects.filter(members__student=student_profile)
+    groups = ProjectGroup.objects.for_student(student_profile)
     
+    # The table is a cached fragment keyed on these versions; the summary
+    # query only runs when it has to be rendered
     return render(request, 'projects/my_groups.html', {
-        'groups': groups
+        'groups': groups.with_summary(),
+        'group_versions': groups.versions()
     })
 
 @login_required
@@ -79,54 +98,39 @@ def add_members(request, group_id):
     
     group = get_object_or_404(ProjectGroup, id=group_id)
     
-    try:
-        student_profile = StudentProfile.objects.get(user=request.user)
-    except StudentProfile.DoesNotExist:
+    student_profile = request.principal.student_profile
+    if student_profile is None:
         messages.error(request, 'Please complete your profile first.')
         return redirect('complete_student_profile')
     
     # Check if the current user is the team lead of this group
-    if not GroupMember.objects.filter(group=group, student=student_profile, role='lead').exists():
+    if not request.principal.is_lead(group.id):
         messages.error(request, 'You are not authorized to add members to this group.')
         return redirect('dashboard')
     
-    # Get students from the same section excluding those already in a group
-    # FIX: Use 'student__user_id' instead of 'student_id'
-    existing_members = GroupMember.objects.filter(group__section=group.section).values_list('student__user_id', flat=True)
-    
-    available_students = StudentProfile.objects.filter(
-        section=group.section
-    ).exclude(
-        user_id__in=existing_members  # FIX: Use user_id instead of id
-    ).exclude(
-        user=request.user  # Exclude current user (already added as lead)
-    )
-    
     if request.method == 'POST':
         member_form = GroupMemberForm(request.POST, section=group.section)
         if member_form.is_valid():
-            member = member_form.save(commit=False)
-            member.group = group
-            
-            # Check if student is already in a group
-            if GroupMember.objects.filter(student=member.student).exists():
-                messages.error(request, 'This student is already in a group.')
+            try:
+                enroll(group, member_form.cleaned_data['student'], member_form.cleaned_data['role'])
+            except EnrollmentError as exc:
+                messages.error(request, str(exc))
             else:
-                member.save()
                 messages.success(request, 'Member added successfully!')
                 return redirect('add_members', group_id=group.id)
     else:
         member_form = GroupMemberForm(section=group.section)
-        member_form.fields['student'].queryset = available_students
     
-    # Get current members
-    current_members = GroupMember.objects.filter(group=group)
+    # Students from the same section not yet in a group, from the cached index
+    available_students = available_students_in(group.section)
+    current_members = list(GroupMember.objects.filter(group=group).select_related('student'))
     
     return render(request, 'projects/add_members.html', {
         'form': member_form,
         'group': group,
+        'available_students': available_students,
         'current_members': current_members,
-        'max_members': 4 - current_members.count()  # Including lead
+        'max_members': MAX_GROUP_SIZE - len(current_members)  # Including lead
     })
 @login_required
 def remove_member(request, group_id, member_id):
@@ -134,25 +138,24 @@ def remove_member(request, group_id, member_id):
         return redirect('dashboard')
     
     group = get_object_or_404(ProjectGroup, id=group_id)
-    member = get_object_or_404(GroupMember, id=member_id, group=group)
+    member = get_object_or_404(GroupMember.objects.select_related('group'), id=member_id, group=group)
     
-    try:
-        student_profile = StudentProfile.objects.get(user=request.user)
-    except StudentProfile.DoesNotExist:
+    student_profile = request.principal.student_profile
+    if student_profile is None:
         messages.error(request, 'Please complete your profile first.')
         return redirect('complete_student_profile')
     
     # Check if the current user is the team lead of this group
-    if not GroupMember.objects.filter(group=group, student=student_profile, role='lead').exists():
+    if not request.principal.is_lead(group.id):
         messages.error(request, 'You are not authorized to remove members from this group.')
         return redirect('dashboard')
     
-    # Cannot remove the team lead
-    if member.role == 'lead':
-        messages.error(request, 'Cannot remove the team lead from the group.')
+    try:
+        withdraw(member)
+    except EnrollmentError as exc:
+        messages.error(request, str(exc))
         return redirect('add_members', group_id=group.id)
     
-    member.delete()
     messages.success(request, 'Member removed successfully!')
     return redirect('add_members', group_id=group.id)
 @login_required
@@ -162,23 +165,18 @@ def submit_project(request, group_id):
     
     group = get_object_or_404(ProjectGroup, id=group_id)
     
-    try:
-        student_profile = StudentProfile.objects.get(user=request.user)
-    except StudentProfile.DoesNotExist:
+    student_profile = request.principal.student_profile
+    if student_profile is None:
         messages.error(request, 'Please complete your profile first.')
         return redirect('complete_student_profile')
     
     # Check if the current user is a member of this group
-    if not GroupMember.objects.filter(group=group, student=student_profile).exists():
+    if not request.principal.is_member(group.id):
         messages.error(request, 'You are not authorized to submit for this group.')
         return redirect('dashboard')
     
     # Check if user is team lead
-    is_team_lead = GroupMember.objects.filter(
-        group=group, 
-        student=student_profile, 
-        role='lead'
-    ).exists()
+    is_team_lead = request.principal.is_lead(group.id)
     
     if not is_team_lead:
         messages.error(request, 'Only team leads can submit project documents.')
@@ -196,26 +194,9 @@ def submit_project(request, group_id):
         srs_report = request.FILES.get('srs_report')
         github_link = request.POST.get('github_link')
         
-        if submission:
-            # Update existing submission
-            if ppt_file:
-                submission.ppt_file = ppt_file
-            if synopsis_report:
-                submission.synopsis_report = synopsis_report
-            if srs_report:
-                submission.srs_report = srs_report
-            if github_link:
-                submission.github_link = github_link
-            submission.save()
-        else:
-            # Create new submission
-            submission = ProjectSubmission.objects.create(
-                group=group,
-                ppt_file=ppt_file,
-                synopsis_report=synopsis_report,
-                srs_report=srs_report,
-                github_link=github_link
-            )
+        files = {'ppt': ppt_file, 'synopsis': synopsis_report, 'srs': srs_report}
+        attach_files(group, {doc_type: f for doc_type, f in files.items() if f}, github_link=github_link,
+                     submitted_by=request.user)
         
         messages.success(request, 'Project submitted successfully!')
         return redirect('group_detail', group_id=group.id)
@@ -229,24 +210,21 @@ def teacher_dashboard(request):
     if not request.user.is_teacher:
         return redirect('dashboard')
     
-    try:
-        teacher_profile = TeacherProfile.objects.get(user=request.user)
-    except TeacherProfile.DoesNotExist:
+    teacher_profile = request.principal.teacher_profile
+    if teacher_profile is None:
         messages.error(request, 'Please complete your profile first.')
         return redirect('complete_teacher_profile')
     
-    groups = ProjectGroup.objects.filter(mentor=teacher_profile)
+    groups = ProjectGroup.objects.for_mentor(teacher_profile)
     
-    # Get all students for filtering
-    all_students = StudentProfile.objects.all()
-    sections = StudentProfile.objects.values_list('section', flat=True).distinct()
-    branches = StudentProfile.objects.values_list('branch', flat=True).distinct()
+    # Sections and branches for filtering, served from the facet cache
+    facets = student_facets()
     
     return render(request, 'projects/teacher_dashboard.html', {
-        'groups': groups,
-        'all_students': all_students,
-        'sections': sections,
-        'branches': branches
+        'groups': groups.with_summary(),
+        'group_versions': groups.versions(),
+        'sections': facets['sections'],
+        'branches': facets['branches']
     })
 
 @login_required
@@ -254,33 +232,22 @@ def view_students(request):
     if not request.user.is_teacher:
         return redirect('dashboard')
     
-    students = StudentProfile.objects.all()
-    sections = StudentProfile.objects.values_list('section', flat=True).distinct()
-    branches = StudentProfile.objects.values_list('branch', flat=True).distinct()
-    
-    # Apply filters if provided
-    section_filter = request.GET.get('section')
-    branch_filter = request.GET.get('branch')
-    search_query = request.GET.get('search')
-    
-    if section_filter:
-        students = students.filter(section=section_filter)
-    if branch_filter:
-        students = students.filter(branch=branch_filter)
-    if search_query:
-        students = students.filter(
-            Q(full_name__icontains=search_query) |
-            Q(abc_id__icontains=search_query) |
-            Q(email_id__icontains=search_query)
-        )
+    facets = student_facets()
+    
+    # Apply filters if provided (carried in the cursor when paging)
+    filters = cursor_filters(request, STUDENT_FILTERS)
+    students, ordering = filter_students(StudentProfile.objects.all(), filters)
+    
+    page = paginate_keyset(students, ordering, filters, request.GET.get('cursor'))
     
     return render(request, 'projects/view_students.html', {
-        'students': students,
-        'sections': sections,
-        'branches': branches,
-        'current_section': section_filter,
-        'current_branch': branch_filter,
-        'search_query': search_query
+        'students': page.object_list,
+        'page': page,
+        'sections': facets['sections'],
+        'branches': facets['branches'],
+        'current_section': filters['section'],
+        'current_branch': filters['branch'],
+        'search_query': filters['search']
     })
 
 @login_required
@@ -288,41 +255,45 @@ def view_all_groups(request):
     if not request.user.is_teacher:
         return redirect('dashboard')
     
-    groups = ProjectGroup.objects.all()
-    sections = ProjectGroup.objects.values_list('section', flat=True).distinct()
-    teachers = TeacherProfile.objects.all()
-    
-    # Apply filters if provided
-    section_filter = request.GET.get('section')
-    status_filter = request.GET.get('status')
-    mentor_filter = request.GET.get('mentor')
-    search_query = request.GET.get('search')
-    
-    if section_filter:
-        groups = groups.filter(section=section_filter)
-    if status_filter:
-        if status_filter == 'approved':
-            groups = groups.filter(is_approved=True)
-        elif status_filter == 'pending':
-            groups = groups.filter(is_approved=False)
-    if mentor_filter:
-        groups = groups.filter(mentor__id=mentor_filter)
-    if search_query:
-        groups = groups.filter(
-            Q(name__icontains=search_query) |
-            Q(project_title__icontains=search_query)
-        )
+    facets = group_facets()
+    
+    # Apply filters if provided (carried in the cursor when paging)
+    filters = cursor_filters(request, GROUP_FILTERS)
+    groups, ordering = filter_groups(ProjectGroup.objects.with_summary(), filters)
+    
+    page = paginate_keyset(groups, ordering, filters, request.GET.get('cursor'))
     
     return render(request, 'projects/view_all_groups.html', {
-        'groups': groups,
-        'sections': sections,
-        'teachers': teachers,
-        'current_section': section_filter,
-        'current_status': status_filter,
-        'current_mentor': mentor_filter,
-        'search_query': search_query
+        'groups': page.object_list,
+        'page': page,
+        'sections': facets['sections'],
+        'status_counts': facets['status'],
+        'teachers': facets['mentors'],
+        'current_section': filters['section'],
+        'current_status': filters['status'],
+        'current_mentor': filters['mentor'],
+        'search_query': filters['search']
     })
 
+@login_required
+def download_submission_bundle(request):
+    """Stream a ZIP of every submitted document for the ``view_all_groups`` filters."""
+    if not request.user.is_teacher:
+        return redirect('dashboard')
+    
+    filters = cursor_filters(request, GROUP_FILTERS)
+    groups, _ = filter_groups(ProjectGroup.objects.all(), filters)
+    entries = bundle_entries(groups)
+    if not entries:
+        messages.info(request, 'No submitted documents match these filters.')
+        return redirect(f"{reverse('view_all_groups')}?{request.GET.urlencode()}")
+    
+    name = '-'.join(filter(None, ['submissions', filters['section'], filters['mentor'] and f"mentor{filters['mentor']}"]))
+    response = StreamingHttpResponse(iter_bundle(entries), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{name}.zip"'
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
 # @login_required
 # def group_detail(request, group_id):
 #     group = get_object_or_404(ProjectGroup, id=group_id)
@@ -353,12 +324,6 @@ def view_all_groups(request):
 
 # CHANGED HERE
 
-# Add these utility functions at the top of projects/views.py
-from django.shortcuts import render, get_object_or_404, redirect
-from django.contrib.auth.decorators import login_required
-from django.contrib import messages
-from .models import ProjectGroup, ProjectSubmission, GroupMember, StudentProfile, TeacherProfile
-from .forms import PresentationSubmissionForm, ReportSubmissionForm, GitHubSubmissionForm
 
 
 
@@ -371,84 +336,69 @@ def teacher_group_view(request, group_id):
     if not request.user.is_teacher:
         return redirect('dashboard')
     
-    group = get_object_or_404(ProjectGroup, id=group_id)
+    group = get_object_or_404(
+        ProjectGroup.objects.select_related('mentor', 'projectsubmission', *CURRENT_FIELDS.values()), id=group_id
+    )
+    
+    members = GroupMember.objects.filter(group=group).select_related('student')
     
-    members = GroupMember.objects.filter(group=group)
-    submissions = ProjectSubmission.objects.filter(group=group)
+    try:
+        submission = group.projectsubmission
+    except ProjectSubmission.DoesNotExist:
+        submission = None
     
-    # Group submissions by type
-    presentation_submissions = submissions.filter(submission_type='ppt').order_by('-submitted_at')
-    synopsis_submissions = submissions.filter(submission_type='synopsis').order_by('-submitted_at')
-    synopsis_submissions = submissions.filter(submission_type='srs').order_by('-submitted_at')
-    github_links = submissions.filter(submission_type='github').order_by('-submitted_at')
+    # Current version of each document, from the group's pointers
+    documents = [
+        (doc_type, label, getattr(group, CURRENT_FIELDS[doc_type]))
+        for doc_type, label in SubmissionVersion.DOC_TYPE_CHOICES
+    ]
     
     # Check if current teacher is the mentor
-    is_mentor = False
-    try:
-        teacher_profile = TeacherProfile.objects.get(user=request.user)
-        is_mentor = (group.mentor == teacher_profile)
-    except TeacherProfile.DoesNotExist:
-        pass
+    teacher_profile = request.principal.teacher_profile
+    is_mentor = teacher_profile is not None and group.mentor_id == teacher_profile.pk
     
     return render(request, 'projects/teacher_group_detail.html', {
         'group': group,
         'members': members,
-        'presentation_submissions': presentation_submissions,
-        'synopsis_submissions': synopsis_submissions,
-        'srs_submissions': srs_submissions,
-        'github_links': github_links,
+        'documents': documents,
+        'github_link': submission.github_link if submission else None,
         'is_mentor': is_mentor
     })
 
+# Document types a teacher can filter all submissions by
+SUBMISSION_TYPES = SubmissionVersion.DOC_TYPE_CHOICES + [('github', 'GitHub Link')]
+
 @login_required
 def teacher_all_submissions(request):
     """View for teachers to see all submissions across all groups"""
     if not request.user.is_teacher:
         return redirect('dashboard')
     
-    # Get filter parameters
-    section_filter = request.GET.get('section')
-    submission_type_filter = request.GET.get('type')
+    # Get filter parameters (carried in the cursor when paging)
+    filters = cursor_filters(request, ['section', 'type'])
     
-    submissions = ProjectSubmission.objects.all().order_by('-submitted_at')
+    submissions = ProjectSubmission.objects.select_related('group')
     
     # Apply filters
-    if section_filter:
-        submissions = submissions.filter(group__section=section_filter)
-    if submission_type_filter:
-        submissions = submissions.filter(submission_type=submission_type_filter)
+    if filters['section']:
+        submissions = submissions.filter(group__section=filters['section'])
+    field = 'github_link' if filters['type'] == 'github' else DOCUMENT_FIELDS.get(filters['type'])
+    if field:
+        submissions = submissions.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
     
-    # Get unique sections and submission types for filter dropdowns
-    sections = ProjectGroup.objects.values_list('section', flat=True).distinct()
-    submission_types = ProjectSubmission.SUBMISSION_TYPES
+    page = paginate_keyset(submissions, ['-updated_at', '-id'], filters, request.GET.get('cursor'))
     
     return render(request, 'projects/teacher_all_submissions.html', {
-        'submissions': submissions,
-        'sections': sections,
-        'submission_types': submission_types,
-        'current_section': section_filter,
-        'current_type': submission_type_filter
+        'submissions': page.object_list,
+        'page': page,
+        'sections': group_facets()['sections'],
+        'submission_types': SUBMISSION_TYPES,
+        'current_section': filters['section'],
+        'current_type': filters['type']
     })
 
 
 
-from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.decorators import login_required
-from django.contrib import messages
-from django.http import HttpResponse, JsonResponse, FileResponse
-from django.template.loader import render_to_string
-from django.db.models import Q
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
-from io import BytesIO
-import tempfile
-import os
-from .models import ProjectGroup, GroupMember, ProjectSubmission
-from .forms import ProjectGroupForm, GroupMemberForm, ProjectSubmissionForm
-from accounts.models import StudentProfile, TeacherProfile
-
-# ... (other imports and views)
 
 @login_required
 def download_student_data(request):
@@ -459,63 +409,51 @@ def download_student_data(request):
     section = request.GET.get('section')
     branch = request.GET.get('branch')
     
-    # Filter students
-    students = StudentProfile.objects.all()
-    if section:
-        students = students.filter(section=section)
-    if branch:
-        students = students.filter(branch=branch)
-    
-    # Create a BytesIO buffer for the PDF
-    buffer = BytesIO()
-    
-    # Create the PDF object
-    p = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
-    
-    # Set up PDF content
-    p.setFont("Helvetica-Bold", 16)
-    p.drawString(1 * inch, height - 1 * inch, "Student Report")
-    p.setFont("Helvetica", 10)
-    
-    y_position = height - 1.5 * inch
-    p.drawString(1 * inch, y_position, "Generated on: {}".format(timezone.now().strftime("%Y-%m-%d %H:%M")))
-    
-    # Add table headers
-    y_position -= 0.5 * inch
-    p.setFont("Helvetica-Bold", 10)
-    p.drawString(1 * inch, y_position, "Name")
-    p.drawString(3 * inch, y_position, "ABC ID")
-    p.drawString(4.5 * inch, y_position, "Section")
-    p.drawString(5.5 * inch, y_position, "Branch")
-    p.setFont("Helvetica", 10)
-    
-    # Add student data
-    y_position -= 0.3 * inch
-    for student in students:
-        if y_position < 1 * inch:  # Check if we need a new page
-            p.showPage()
-            p.setFont("Helvetica", 10)
-            y_position = height - 1 * inch
-            
-        p.drawString(1 * inch, y_position, student.full_name)
-        p.drawString(3 * inch, y_position, student.abc_id)
-        p.drawString(4.5 * inch, y_position, student.section)
-        p.drawString(5.5 * inch, y_position, student.branch)
-        y_position -= 0.3 * inch
-    
-    # Finish the PDF
-    p.showPage()
-    p.save()
-    
-    # Get the value of the BytesIO buffer
-    pdf = buffer.getvalue()
-    buffer.close()
-    
-    # Create HTTP response
-    response = HttpResponse(pdf, content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename=student_report.pdf'
-    return response
+    if request.GET.get('mode') == 'stream':
+        # Stream the PDF page by page so memory stays flat for large cohorts
+        students = student_report_queryset({'section': section, 'branch': branch})
+        response = StreamingHttpResponse(
+            iter_student_report(students, generated_at=timezone.now()),
+            content_type='application/pdf'
+        )
+        response['Content-Disposition'] = 'attachment; filename=student_report.pdf'
+        return response
+    
+    # Serve the cached report if the data has not changed, otherwise queue it
+    job = enqueue_student_report(section, branch, user=request.user)
+    if job.status == 'done':
+        return download_report(request, job.id)
+    
+    return render(request, 'projects/report_status.html', {
+        'job': job,
+        'section': section,
+        'branch': branch
+    })
+
+@login_required
+def report_status(request, job_id):
+    if not request.user.is_teacher:
+        return JsonResponse({'error': 'Not authorized'}, status=403)
+    
+    job = get_object_or_404(ReportJob, id=job_id)
+    data = {'id': job.id, 'status': job.status}
+    if job.status == 'done':
+        data['download_url'] = reverse('download_report', args=[job.id])
+    elif job.status == 'failed':
+        data['error'] = job.error
+    return JsonResponse(data)
+
+@login_required
+def download_report(request, job_id):
+    if not request.user.is_teacher:
+        return redirect('dashboard')
+    
+    job = get_object_or_404(ReportJob, id=job_id, status='done')
+    path = report_path(job)
+    if not os.path.exists(path):
+        raise Http404("Report file not found")
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename='student_report.pdf',
+                        content_type='application/pdf')
 
 @login_required
 def approve_group(request, group_id):
@@ -524,14 +462,13 @@ def approve_group(request, group_id):
     
     group = get_object_or_404(ProjectGroup, id=group_id)
     
-    try:
-        teacher_profile = TeacherProfile.objects.get(user=request.user)
-    except TeacherProfile.DoesNotExist:
+    teacher_profile = request.principal.teacher_profile
+    if teacher_profile is None:
         messages.error(request, 'Please complete your profile first.')
         return redirect('complete_teacher_profile')
     
     # Check if the teacher is the mentor of this group
-    if group.mentor != teacher_profile:
+    if group.mentor_id != teacher_profile.pk:
         messages.error(request, 'You are not the mentor of this group.')
         return redirect('teacher_dashboard')
     
@@ -551,7 +488,7 @@ def assign_mentor(request, group_id):
         mentor_id = request.POST.get('mentor')
         if mentor_id:
             try:
-                mentor = TeacherProfile.objects.get(id=mentor_id)
+                mentor = TeacherProfile.objects.get(pk=mentor_id)
                 group.mentor = mentor
                 group.save()
                 messages.success(request, f'Mentor assigned successfully to {mentor.full_name}!')
@@ -560,6 +497,212 @@ def assign_mentor(request, group_id):
     
     return redirect('view_all_groups')
 
+# Largest number of groups one batch request may touch
+BATCH_ACTION_LIMIT = 1000
+
+def _batch_group_ids(request):
+    """Read the ``group_ids`` list from a form post or a JSON body."""
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return None, {}
+        if not isinstance(payload, dict):
+            return None, {}
+        values = payload.get('group_ids', [])
+        # JSON carries real numbers; bool is an int subclass but not an id
+        if not isinstance(values, list) or not all(
+            isinstance(value, int) and not isinstance(value, bool) for value in values
+        ):
+            return None, payload
+        return list(dict.fromkeys(values)), payload
+    payload = request.POST
+    ids = []
+    for value in request.POST.getlist('group_ids'):
+        if not value.isdecimal():
+            return None, payload
+        ids.append(int(value))
+    return list(dict.fromkeys(ids)), payload
+
+def _batch_response(request, summary, message):
+    """JSON summary for API callers; messages and a redirect for the teacher pages."""
+    if request.content_type == 'application/json' or 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse(summary)
+    
+    if summary['updated']:
+        messages.success(request, message)
+    else:
+        messages.info(request, message)
+    if summary['refused']:
+        messages.warning(request, f"{len(summary['refused'])} group(s) were refused: " + ', '.join(
+            f"#{item['id']} ({item['reason']})" for item in summary['refused'][:20]
+        ))
+    next_url = request.POST.get('next')
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect('teacher_dashboard')
+
+@login_required
+def batch_approve_groups(request):
+    """Approve or un-approve many groups at once with a single UPDATE.
+
+    As with ``approve_group``, a teacher can only change groups they mentor;
+    the others are reported back as refused.
+    """
+    if not request.user.is_teacher:
+        return redirect('dashboard')
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+    
+    teacher_profile = request.principal.teacher_profile
+    if teacher_profile is None:
+        messages.error(request, 'Please complete your profile first.')
+        return redirect('complete_teacher_profile')
+    
+    group_ids, payload = _batch_group_ids(request)
+    action = payload.get('action', 'approve')
+    if group_ids is None or action not in ('approve', 'reject'):
+        return JsonResponse({'error': 'Send "group_ids" as a list of ids and "action" as approve or reject.'}, status=400)
+    if len(group_ids) > BATCH_ACTION_LIMIT:
+        return JsonResponse({'error': f'At most {BATCH_ACTION_LIMIT} groups per request.'}, status=400)
+    
+    approved = action == 'approve'
+    with transaction.atomic():
+        found = dict(
+            ProjectGroup.objects.select_for_update().filter(id__in=group_ids).values_list('id', 'mentor_id')
+        )
+        refused = [
+            {'id': group_id, 'reason': 'not found' if group_id not in found else 'not your group'}
+            for group_id in group_ids if found.get(group_id) != teacher_profile.pk
+        ]
+        owned = [group_id for group_id in group_ids if found.get(group_id) == teacher_profile.pk]
+        changed = list(
+            ProjectGroup.objects.filter(id__in=owned).exclude(is_approved=approved).values_list('id', flat=True)
+        )
+        if changed:
+            ProjectGroup.objects.filter(id__in=changed).touch(is_approved=approved)
+            # touch() skips the signals that invalidate cached facets and
+            # refresh the progress rollup
+            DataVersion.bump(DataVersion.GROUPS)
+            schedule_refresh(*changed)
+    
+    summary = {
+        'action': action,
+        'updated': changed,
+        'unchanged': sorted(set(owned) - set(changed)),
+        'refused': refused,
+    }
+    verb = 'approved' if approved else 'marked pending'
+    return _batch_response(request, summary, f'{len(changed)} group(s) {verb}.')
+
+@login_required
+def batch_assign_mentor(request):
+    """Assign one mentor to many groups with a single UPDATE."""
+    if not request.user.is_teacher:
+        return redirect('dashboard')
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+    
+    group_ids, payload = _batch_group_ids(request)
+    mentor_id = str(payload.get('mentor', ''))
+    if group_ids is None or not mentor_id.isdigit():
+        return JsonResponse({'error': 'Send "group_ids" as a list of ids and "mentor" as a teacher id.'}, status=400)
+    if len(group_ids) > BATCH_ACTION_LIMIT:
+        return JsonResponse({'error': f'At most {BATCH_ACTION_LIMIT} groups per request.'}, status=400)
+    
+    mentor = TeacherProfile.objects.filter(pk=mentor_id).only('pk', 'full_name').first()
+    if mentor is None:
+        return JsonResponse({'error': 'Invalid mentor selected.'}, status=400)
+    
+    with transaction.atomic():
+        found = dict(
+            ProjectGroup.objects.select_for_update().filter(id__in=group_ids).values_list('id', 'mentor_id')
+        )
+        changed = [group_id for group_id in group_ids if group_id in found and found[group_id] != mentor.pk]
+        if changed:
+            ProjectGroup.objects.filter(id__in=changed).touch(mentor=mentor)
+            # touch() skips the signals that invalidate cached facets and
+            # refresh the progress rollup
+            DataVersion.bump(DataVersion.GROUPS)
+            schedule_refresh(*changed)
+    
+    summary = {
+        'mentor': mentor.pk,
+        'updated': changed,
+        'unchanged': [group_id for group_id in group_ids if found.get(group_id) == mentor.pk],
+        'refused': [{'id': group_id, 'reason': 'not found'} for group_id in group_ids if group_id not in found],
+    }
+    return _batch_response(request, summary, f'{mentor.full_name} assigned to {len(changed)} group(s).')
+
+@login_required
+def allocate_mentors(request):
+    """Preview the automatic mentor allocation (GET) and apply it (POST)."""
+    if not request.user.is_teacher:
+        return redirect('dashboard')
+    
+    groups = ProjectGroup.objects.all()
+    section = request.POST.get('section') or request.GET.get('section') or ''
+    if section:
+        groups = groups.filter(section=section)
+    
+    plan = plan_allocation(groups)
+    
+    if request.method == 'POST':
+        assigned = apply_allocation(plan)
+        messages.success(request, f'Mentors assigned to {assigned} group(s).')
+        if plan.unassigned:
+            messages.warning(request, f'{len(plan.unassigned)} group(s) still need a mentor; no teacher has capacity left.')
+        return redirect('view_all_groups')
+    
+    loads_after = plan.loads_after
+    loads = [
+        (teacher, plan.loads_before.get(teacher.pk, 0), loads_after.get(teacher.pk, 0))
+        for teacher in plan.teachers
+    ]
+    return render(request, 'projects/allocate_mentors.html', {
+        'plan': plan,
+        'loads': loads,
+        'matched': sum(1 for assignment in plan.assignments if assignment.affinity),
+        'sections': group_facets()['sections'],
+        'current_section': section,
+    })
+
+@login_required
+def teacher_analytics(request):
+    """Group progress by section, branch and passing year, read only from the rollup table."""
+    if not request.user.is_teacher:
+        return redirect('dashboard')
+    
+    rows = list(ProgressRollup.objects.filter(groups__gt=0).order_by('section', 'branch', 'passing_year'))
+    section = request.GET.get('section', '')
+    branch = request.GET.get('branch', '')
+    passing_year = request.GET.get('passing_year', '')
+    
+    # Filter options come from the same rows, so the page costs one query
+    sections = sorted({row.section for row in rows})
+    branches = sorted({row.branch for row in rows if row.branch})
+    years = sorted({row.passing_year for row in rows if row.passing_year})
+    
+    if section:
+        rows = [row for row in rows if row.section == section]
+    if branch:
+        rows = [row for row in rows if row.branch == branch]
+    if passing_year.isdigit():
+        rows = [row for row in rows if row.passing_year == int(passing_year)]
+    
+    totals = {counter: sum(getattr(row, counter) for row in rows) for counter in ROLLUP_COUNTERS}
+    
+    return render(request, 'projects/teacher_analytics.html', {
+        'rows': rows,
+        'totals': totals,
+        'sections': sections,
+        'branches': branches,
+        'years': years,
+        'current_section': section,
+        'current_branch': branch,
+        'current_year': passing_year,
+    })
+
 @login_required
 def edit_group(request, group_id):
     if not request.user.is_student:
@@ -567,14 +710,13 @@ def edit_group(request, group_id):
     
     group = get_object_or_404(ProjectGroup, id=group_id)
     
-    try:
-        student_profile = StudentProfile.objects.get(user=request.user)
-    except StudentProfile.DoesNotExist:
+    student_profile = request.principal.student_profile
+    if student_profile is None:
         messages.error(request, 'Please complete your profile first.')
         return redirect('complete_student_profile')
     
     # Check if the current user is the team lead of this group
-    if not GroupMember.objects.filter(group=group, student=student_profile, role='lead').exists():
+    if not request.principal.is_lead(group.id):
         messages.error(request, 'You are not authorized to edit this group.')
         return redirect('dashboard')
     
@@ -600,14 +742,13 @@ def delete_group(request, group_id):
     
     group = get_object_or_404(ProjectGroup, id=group_id)
     
-    try:
-        student_profile = StudentProfile.objects.get(user=request.user)
-    except StudentProfile.DoesNotExist:
+    student_profile = request.principal.student_profile
+    if student_profile is None:
         messages.error(request, 'Please complete your profile first.')
         return redirect('complete_student_profile')
     
     # Check if the current user is the team lead of this group
-    if not GroupMember.objects.filter(group=group, student=student_profile, role='lead').exists():
+    if not request.principal.is_lead(group.id):
         messages.error(request, 'You are not authorized to delete this group.')
         return redirect('dashboard')
     
@@ -737,7 +878,7 @@ def download_file(request, submission_id):
     submission = get_object_or_404(ProjectSubmission, id=submission_id)
     
     # Check if user has permission to download
-    if not can_view_submissions(request.user, submission.group):
+    if not can_view_submissions(request.principal, submission.group):
         messages.error(request, 'You are not authorized to download this file.')
         return redirect('dashboard')
     
@@ -750,38 +891,84 @@ def download_file(request, submission_id):
         return redirect('group_detail', group_id=submission.group.id)
 
 
-@login_required
-def download_submission(request, submission_id, file_type):
-    submission = get_object_or_404(submission, id=submission_id)
-    file_field = None
-
-    if file_type == 'ppt':
-        file_field = submission.ppt_file
-    elif file_type == 'synopsis':
-        file_field = submission.synopsis_report
-    elif file_type == 'srs':
-        file_field = submission.srs_report
-    else:
+def _submission_document(principal, submission_id, file_type):
+    submission = get_object_or_404(ProjectSubmission.objects.select_related('group'), id=submission_id)
+    
+    if not can_view_submissions(principal, submission.group):
+        raise Http404("File not found")
+    
+    if file_type not in DOCUMENT_FIELDS:
         raise Http404("File type not found")
-
+    
+    file_field = getattr(submission, DOCUMENT_FIELDS[file_type])
     if not file_field:
         raise Http404("File not found")
+    return file_field
 
-    file_path = os.path.join(settings.MEDIA_ROOT, file_field.name)
-    return FileResponse(open(file_path, 'rb'), as_attachment=True, filename=os.path.basename(file_field.name))
+
+@login_required
+async def download_submission(request, submission_id, file_type):
+    """Async so that under ASGI a slow client holds no worker thread.
+
+    The lookup and permission checks run in ``sync_to_async``; the file is
+    then read in bounded blocks off the event loop while the client drains it.
+    """
+    principal = await request.aprincipal()
+    file_field = await sync_to_async(_submission_document)(principal, submission_id, file_type)
+    # Only ASGI requests carry a scope; under WSGI stream the file synchronously
+    return await sync_to_async(serve_file)(request, file_field.storage, file_field.name,
+                                           asynchronous=hasattr(request, 'scope'))
+
+
+@login_required
+def submission_history(request, group_id, file_type):
+    """Every uploaded version of one document, newest first."""
+    group = get_object_or_404(ProjectGroup, id=group_id)
+    
+    if not can_view_submissions(request.principal, group):
+        messages.error(request, 'You are not authorized to view this group.')
+        return redirect('dashboard')
+    
+    if file_type not in DOCUMENT_FIELDS:
+        raise Http404("File type not found")
+    
+    versions = SubmissionVersion.objects.filter(group=group, doc_type=file_type).select_related('submitted_by')
+    page = paginate_keyset(versions, ['-number'], cursor=request.GET.get('cursor'), page_size=HISTORY_PAGE_SIZE)
+    
+    return render(request, 'projects/submission_history.html', {
+        'group': group,
+        'file_type': file_type,
+        'label': dict(SubmissionVersion.DOC_TYPE_CHOICES)[file_type],
+        'versions': page.object_list,
+        'page': page,
+        'current_id': getattr(group, f'{CURRENT_FIELDS[file_type]}_id'),
+    })
+
+
+@login_required
+def download_submission_version(request, version_id):
+    version = get_object_or_404(SubmissionVersion.objects.select_related('group'), id=version_id)
+    
+    if not can_view_submissions(request.principal, version.group):
+        raise Http404("File not found")
+    
+    extension = os.path.splitext(version.file.name)[1]
+    filename = f'{version.group.name} {version.doc_type} v{version.number}{extension}'
+    return serve_file(request, version.file.storage, version.file.name, filename=filename)
 
 
 @login_required
 def delete_submission(request, submission_id, file_type):
-    submission = get_object_or_404(submission, id=submission_id)
+    submission = get_object_or_404(ProjectSubmission.objects.select_related('group'), id=submission_id)
+    
+    if not can_edit_submissions(request.principal, submission.group):
+        messages.error(request, 'Only team leads can delete submitted documents.')
+        return redirect('group_detail', group_id=submission.group_id)
     
     if request.method == 'POST':
-        if file_type == 'ppt' and submission.ppt_file:
-            submission.ppt_file.delete()
-        elif file_type == 'synopsis' and submission.synopsis_report:
-            submission.synopsis_report.delete()
-        elif file_type == 'srs' and submission.srs_report:
-            submission.srs_report.delete()
+        if file_type in DOCUMENT_FIELDS and getattr(submission, DOCUMENT_FIELDS[file_type]):
+            # The file stays in the version history; only the current pointer goes
+            withdraw_document(submission, file_type)
         elif file_type == 'github':
             submission.github_link = ''
             submission.save()
@@ -790,14 +977,18 @@ def delete_submission(request, submission_id, file_type):
 
         return redirect('group_detail', group_id=submission.group.id)
 
-    return render(request, 'projects/confirm_delete.html', {'submission': submission, 'file_type': file_type})
+    if file_type != 'github' and file_type not in DOCUMENT_FIELDS:
+        raise Http404("File type not found")
+    
+    return render(request, 'projects/delete_submission.html', {'submission': submission, 'file_type': file_type})
 
 
 # DEEPSEEK FINAL 
 
 # Add these utility functions at the top of projects/views.py
-def can_view_submissions(user, group):
+def can_view_submissions(principal, group):
     """Check if user can view submissions for a group"""
+    user = principal.user
     if user.is_superuser:
         return True
     
@@ -806,50 +997,42 @@ def can_view_submissions(user, group):
         return True
     
     if user.is_student:
-        try:
-            student_profile = StudentProfile.objects.get(user=user)
-            # Team members can view submissions
-            return GroupMember.objects.filter(group=group, student=student_profile).exists()
-        except StudentProfile.DoesNotExist:
-            return False
+        # Team members can view submissions
+        return principal.is_member(group.id)
     
     return False
 
-def can_edit_submissions(user, group):
+def can_edit_submissions(principal, group):
     """Check if user can edit/submit documents for a group"""
+    user = principal.user
     if user.is_superuser:
         return True
     
     if user.is_student:
-        try:
-            student_profile = StudentProfile.objects.get(user=user)
-            # Only team leads can edit submissions
-            return GroupMember.objects.filter(
-                group=group, 
-                student=student_profile, 
-                role='lead'
-            ).exists()
-        except StudentProfile.DoesNotExist:
-            return False
+        # Only team leads can edit submissions
+        return principal.is_lead(group.id)
     
     return False
 
 # Update the group_detail view
 @login_required
 def group_detail(request, group_id):
-    group = get_object_or_404(ProjectGroup, id=group_id)
+    group = get_object_or_404(
+        ProjectGroup.objects.select_related('mentor', 'projectsubmission', *CURRENT_FIELDS.values()), id=group_id
+    )
     
-    if not can_view_submissions(request.user, group):
+    if not can_view_submissions(request.principal, group):
         messages.error(request, 'You are not authorized to view this group.')
         return redirect('dashboard')
     
-    can_edit = can_edit_submissions(request.user, group)
+    can_edit = can_edit_submissions(request.principal, group)
     
-    members = GroupMember.objects.filter(group=group)
+    # Only evaluated when the cached member table has to be rendered
+    members = GroupMember.objects.filter(group=group).select_related('student')
     
     # Get submissions based on your current model structure
     try:
-        submission = ProjectSubmission.objects.get(group=group)
+        submission = group.projectsubmission
         has_submission = True
     except ProjectSubmission.DoesNotExist:
         submission = None
@@ -871,26 +1054,25 @@ def submit_document(request, group_id, doc_type):
     group = get_object_or_404(ProjectGroup, id=group_id)
     
     # Check if user has permission to submit documents
-    if not can_edit_submissions(request.user, group):
+    if not can_edit_submissions(request.principal, group):
         messages.error(request, 'Only team leads can submit documents.')
         return redirect('group_detail', group_id=group.id)
     
-    try:
-        student_profile = StudentProfile.objects.get(user=request.user)
-    except StudentProfile.DoesNotExist:
+    student_profile = request.principal.student_profile
+    if student_profile is None:
         messages.error(request, 'Please complete your profile first.')
         return redirect('complete_student_profile')
     
     # Determine which form to use based on document type
     if doc_type == 'presentation':
         form_class = PresentationSubmissionForm
-        submission_type = 'ppt'
+        doc_types = ['ppt']
     elif doc_type == 'report':
         form_class = ReportSubmissionForm
-        submission_type = None
+        doc_types = ['synopsis', 'srs']
     elif doc_type == 'github':
         form_class = GitHubSubmissionForm
-        submission_type = 'github'
+        doc_types = []
     else:
         messages.error(request, 'Invalid document type.')
         return redirect('group_detail', group_id=group.id)
@@ -898,36 +1080,132 @@ def submit_document(request, group_id, doc_type):
     if request.method == 'POST':
         form = form_class(request.POST, request.FILES)
         if form.is_valid():
-            submission = form.save(commit=False)
-            submission.group = group
-            submission.submitted_by = student_profile
-            
-            if doc_type == 'report':
-                submission.submission_type = form.cleaned_data['report_type']
+            if doc_type == 'github':
+                attach_files(group, {}, github_link=form.cleaned_data['github_link'], submitted_by=request.user)
+                label = 'GitHub link'
             else:
-                submission.submission_type = submission_type
-            
-            submission.save()
-            messages.success(request, f'{submission.get_submission_type_display()} submitted successfully!')
-            return redirect('group_detail', group_id=group.id)
+                submitted = form.cleaned_data.get('report_type') or 'ppt'
+                uploaded = form.cleaned_data.get(DOCUMENT_FIELDS[submitted])
+                if uploaded:
+                    # A new version of the document; earlier ones stay in its history
+                    attach_files(group, {submitted: uploaded}, submitted_by=request.user)
+                    label = dict(SubmissionVersion.DOC_TYPE_CHOICES)[submitted]
+                else:
+                    form.add_error(DOCUMENT_FIELDS[submitted], 'Choose a file to upload.')
+            if not form.errors:
+                messages.success(request, f'{label} submitted successfully!')
+                return redirect('group_detail', group_id=group.id)
     else:
         form = form_class()
     
-    # Get existing submissions of this type
-    if doc_type == 'report':
-        existing_submissions = ProjectSubmission.objects.filter(
-            group=group, 
-            submission_type__in=['synopsis', 'srs']
-        ).order_by('-submitted_at')
-    else:
-        existing_submissions = ProjectSubmission.objects.filter(
-            group=group, 
-            submission_type=submission_type
-        ).order_by('-submitted_at')
+    # Earlier uploads of these documents, newest first
+    existing_submissions = SubmissionVersion.objects.filter(
+        group=group, doc_type__in=doc_types
+    ).select_related('submitted_by').order_by('-created_at', '-id')[:HISTORY_PAGE_SIZE]
+    github_link = None
+    if doc_type == 'github':
+        github_link = ProjectSubmission.objects.filter(group=group).values_list('github_link', flat=True).first()
     
     return render(request, 'projects/submit_document.html', {
         'form': form,
         'group': group,
         'doc_type': doc_type,
-        'existing_submissions': existing_submissions
-    })
\ No newline at end of file
+        'existing_submissions': existing_submissions,
+        'github_link': github_link
+    })
+
+
+# Chunked, resumable uploads
+@login_required
+def start_upload(request, group_id):
+    """Open (or resume) an upload session for one submission document."""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+    
+    group = get_object_or_404(ProjectGroup, id=group_id)
+    if not can_edit_submissions(request.principal, group):
+        return JsonResponse({'error': 'Only team leads can submit documents.'}, status=403)
+    
+    doc_type = request.POST.get('doc_type')
+    filename = os.path.basename(request.POST.get('filename', ''))
+    try:
+        size = int(request.POST.get('size', ''))
+    except ValueError:
+        size = -1
+    
+    if doc_type not in DOCUMENT_FIELDS or not filename or size < 0:
+        return JsonResponse({'error': 'doc_type, filename and size are required.'}, status=400)
+    if size > settings.UPLOAD_MAX_SIZE:
+        return JsonResponse({'error': 'File too large.'}, status=413)
+    
+    # Picking up the same file again resumes the earlier session
+    session = UploadSession.objects.filter(
+        group=group, doc_type=doc_type, filename=filename, size=size,
+        created_by=request.user, status='active'
+    ).order_by('-created_at').first()
+    if session is None:
+        session = UploadSession.objects.create(
+            group=group, doc_type=doc_type, filename=filename, size=size,
+            sha256=request.POST.get('sha256', ''), created_by=request.user
+        )
+    
+    return JsonResponse(upload_status(session), status=201)
+
+@login_required
+async def upload_chunk(request, upload_id):
+    """GET reports the resume offset; PUT stores one byte range of the file.
+    
+    Under ASGI the chunk is received on the event loop before the view runs,
+    so a slow uploader holds no worker thread; the ORM work and the copy to
+    disk, in bounded blocks, run in ``sync_to_async``.
+    """
+    user = await request.auser()
+    session = await sync_to_async(get_object_or_404)(
+        UploadSession.objects.select_related('group'), id=upload_id, created_by=user
+    )
+    
+    if request.method == 'GET':
+        return JsonResponse(upload_status(session))
+    if request.method == 'DELETE':
+        await sync_to_async(discard_upload)(session)
+        return JsonResponse({'deleted': True})
+    if request.method not in ('PUT', 'POST'):
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    
+    principal = await request.aprincipal()
+    if not await sync_to_async(can_edit_submissions)(principal, session.group):
+        return JsonResponse({'error': 'Only team leads can submit documents.'}, status=403)
+    
+    try:
+        start, end, total = parse_content_range(request.headers.get('Content-Range'))
+        if total != session.size:
+            raise UploadError('Content-Range total does not match the upload size.')
+        await sync_to_async(store_chunk)(session, start, end - start + 1, request)
+    except UploadError as exc:
+        # A discarded upload (failed checksum) has no status left to report
+        data = upload_status(session) if session.pk is not None else {'discarded': True}
+        return JsonResponse(dict(data, error=str(exc)), status=exc.status)
+    
+    return JsonResponse(upload_status(session))
+
+def upload_status(session):
+    data = {
+        'upload_id': str(session.id),
+        'url': reverse('upload_chunk', args=[session.id]),
+        'offset': session.received,
+        'size': session.size,
+        'chunk_size': settings.UPLOAD_CHUNK_SIZE,
+        'complete': session.status == 'complete',
+    }
+    if session.status == 'complete':
+        data['sha256'] = session.sha256
+        data['redirect'] = reverse('group_detail', args=[session.group_id])
+    return data
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """Development media server that follows deduplicated names to their blob."""
+    resolve = getattr(default_storage, 'resolve', None)
+    if resolve is not None:
+        path = resolve(path)
+    return serve(request, path, document_root=document_root, show_indexes=show_indexes)